@@ -0,0 +1,42 @@
+# app/autentikasi/principal_cache.py
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+from app.core.config import settings
+from app.core.generation_cache import GenerationCache
+
+@dataclass(frozen=True)
+class PrincipalRole:
+    id: int
+    name: str
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Snapshot immutable dari pengguna yang sedang login.
+    Berisi hanya field yang dibutuhkan untuk otorisasi di router.
+    """
+    uid: str
+    status: str
+    jabatan: Optional[str]
+    tanggalAkhirCuti: Optional[date]
+    role: Optional[PrincipalRole]
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        role = PrincipalRole(id=user.role.id, name=user.role.name) if user.role else None
+        return cls(
+            uid=user.uid,
+            status=user.status,
+            jabatan=user.jabatan,
+            tanggalAkhirCuti=user.tanggalAkhirCuti,
+            role=role,
+        )
+
+# Snapshot principal per uid agar request terautentikasi tidak perlu query user + role setiap kali
+# Penulisan data user/role memanggil `evict`/`clear` agar perubahan langsung terlihat
+principal_cache = GenerationCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
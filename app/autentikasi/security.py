@@ -4,9 +4,14 @@ import firebase_admin
 from firebase_admin import auth
 from fastapi import HTTPException, status, Depends, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.collection_cache import bump_collection_version
 from app.users.models import User
+from app.autentikasi.token_cache import FirebaseTokenCache
+from app.autentikasi.principal_cache import Principal, principal_cache
 import datetime
 import logging
 
@@ -15,14 +20,21 @@ logger = logging.getLogger(__name__)
 # Kita akan menggunakan skema HTTPBearer untuk mengambil token dari header
 security_scheme = HTTPBearer()
 
+# Klaim token yang sudah diverifikasi disimpan hingga `exp`, sehingga request berulang
+# dengan token yang sama tidak perlu verifikasi tanda tangan RSA lagi.
+firebase_token_cache = FirebaseTokenCache(maxsize=settings.FIREBASE_TOKEN_CACHE_MAXSIZE)
+
 def verify_firebase_token(credentials: HTTPAuthorizationCredentials = Security(security_scheme)):
     """
     Dependensi untuk memverifikasi token Firebase ID dari header 'Authorization'.
     """
     token = credentials.credentials
     try:
-        # Panggil fungsi verifikasi Firebase Admin SDK
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = firebase_token_cache.get(token)
+        if decoded_token is None:
+            # Panggil fungsi verifikasi Firebase Admin SDK
+            decoded_token = auth.verify_id_token(token)
+            firebase_token_cache.set(token, decoded_token)
         uid = decoded_token.get('uid')
         if not uid:
             raise ValueError("UID not found in token.")
@@ -43,45 +55,54 @@ def verify_firebase_token(credentials: HTTPAuthorizationCredentials = Security(s
 
 async def get_current_active_user(
     token_data: dict = Depends(verify_firebase_token), # Gunakan Depends di sini
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     """
-    Mengambil pengguna dari database berdasarkan UID yang diverifikasi, dan memeriksa statusnya.
+    Mengambil snapshot pengguna berdasarkan UID yang diverifikasi, dan memeriksa statusnya.
+    Snapshot diambil dari principal_cache; database hanya diakses saat cache kosong atau kedaluwarsa.
     """
     user_uid = token_data.get('uid')
     if not user_uid:
         raise HTTPException(status_code=400, detail="UID not found in token data.")
     
-    user_in_db = db.query(User).filter(User.uid == user_uid).first()
-    
-    if not user_in_db:
-        logger.warning(f"User with UID {user_uid} not found in database.")
-        raise HTTPException(status_code=404, detail="User not found in database.")
+    principal, generation = principal_cache.lookup(user_uid)
+    if principal is None:
+        user_in_db = (await db.execute(select(User).where(User.uid == user_uid))).scalars().first()
+
+        if not user_in_db:
+            logger.warning(f"User with UID {user_uid} not found in database.")
+            raise HTTPException(status_code=404, detail="User not found in database.")
+
+        principal = Principal.from_user(user_in_db)
+        principal_cache.set(user_uid, principal, generation)
     
     # Logika pemeriksaan status pengguna
-    if user_in_db.status == "Nonaktif":
+    if principal.status == "Nonaktif":
         raise HTTPException(status_code=403, detail="Akun Anda nonaktif.")
 
-    if user_in_db.status == "Cuti":
+    if principal.status == "Cuti":
         # Perbaiki cara mengonversi tanggal
-        if not user_in_db.tanggalAkhirCuti:
+        if not principal.tanggalAkhirCuti:
             raise HTTPException(status_code=403, detail="Status cuti tidak lengkap.")
         
         try:
-            cuti_end_date_obj = datetime.datetime.strptime(str(user_in_db.tanggalAkhirCuti), '%Y-%m-%d').date()
+            cuti_end_date_obj = datetime.datetime.strptime(str(principal.tanggalAkhirCuti), '%Y-%m-%d').date()
         except ValueError:
             raise HTTPException(status_code=500, detail="Format tanggal cuti tidak valid.")
 
         today_date = datetime.date.today()
         if today_date <= cuti_end_date_obj:
-            login_possible_date = cuti_end_date_obj + datetime.timedelta(days=1)
             raise HTTPException(status_code=403, detail=f"Anda sedang cuti sampai {cuti_end_date_obj.strftime('%Y-%m-%d')}.")
         else:
+            user_in_db = (await db.execute(select(User).where(User.uid == user_uid))).scalars().first()
             user_in_db.status = "Aktif"
             user_in_db.tanggalAkhirCuti = None
             db.add(user_in_db)
-            db.commit()
-            db.refresh(user_in_db)
+            await db.run_sync(bump_collection_version, User.__tablename__)
+            await db.commit()
+            await db.refresh(user_in_db)
+            principal_cache.evict(user_uid)
+            principal = Principal.from_user(user_in_db)
             logger.info(f"Status user {user_uid} diubah menjadi Aktif.")
 
-    return user_in_db
\ No newline at end of file
+    return principal
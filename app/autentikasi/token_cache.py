@@ -0,0 +1,52 @@
+# app/autentikasi/token_cache.py
+
+import hashlib
+import threading
+import time
+from typing import Optional
+from cachetools import TLRUCache
+
+class FirebaseTokenCache:
+    """
+    Cache LRU thread-safe untuk klaim token Firebase ID yang sudah diverifikasi.
+    Kunci berupa hash SHA-256 dari token, dan setiap entri kedaluwarsa tepat pada klaim `exp` token.
+    """
+
+    def __init__(self, maxsize: int):
+        self._cache = TLRUCache(maxsize=maxsize, ttu=lambda key, claims, now: claims["exp"], timer=time.time)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            claims = self._cache.get(key)
+            # TLRUCache sudah membuang entri kedaluwarsa, pemeriksaan ini sebagai pengaman tambahan
+            if claims is not None and claims["exp"] > time.time():
+                self.hits += 1
+                return claims
+            self.misses += 1
+            return None
+
+    def set(self, token: str, claims: dict):
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= time.time():
+            return
+        with self._lock:
+            self._cache[self._key(token)] = claims
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
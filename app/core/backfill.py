@@ -0,0 +1,142 @@
+# backend/app/core/backfill.py
+#
+# Mengisi kolom numerik (dataIzin.duration_seconds, dataTelat.lewat_waktu_seconds/denda_amount)
+# untuk baris lama yang dibuat sebelum kolom tersebut ada (lihat app.core.migrations.MANAGED_COLUMNS),
+# lalu membangun rekap izin_daily_stats untuk seluruh riwayat (per bulan).
+# Baris diproses per rentang primary key dan di-commit per batch, sehingga kunci baris singkat
+# dan job bisa dihentikan lalu dijalankan ulang kapan saja (hanya baris yang masih NULL yang diisi).
+#
+#   python -m app.core.backfill
+#   python -m app.core.backfill --batch-size 2000
+
+import logging
+from datetime import date
+from typing import Callable
+
+from sqlalchemy import Integer, Numeric, case, cast, extract, func, update
+from sqlalchemy.orm import Session
+
+from app.dataizin.archive import izin_models_all
+from app.dataizin.crud import rebuild_izin_daily_stats
+from app.datatelat.models import DataTelat
+from app.utils.date_range import WIB_TIMEZONE, wib_today
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Sumber lewat waktu untuk data lama: keterangan otomatis "Melebihi batas izin selama N detik."
+# Keterangan yang sudah diganti admin (mis. "Done Sanksi") tidak bisa dipulihkan dan dibiarkan NULL.
+LEWAT_WAKTU_PATTERN = r'selama ([0-9]+) detik'
+DENDA_PATTERN = r'^[0-9]+(\.[0-9]+)?$'
+
+def _izin_duration_update(model, start: int, end: int):
+    # Teks durasi dibentuk dari selisih jamKembali - jamKeluar yang sama, jadi timestamp dipakai langsung
+    elapsed = extract('epoch', model.jamKembali - model.jamKeluar)
+    return (
+        update(model)
+        .where(
+            model.no >= start,
+            model.no < end,
+            model.duration_seconds.is_(None),
+            model.jamKeluar.isnot(None),
+            model.jamKembali.isnot(None),
+        )
+        .values(
+            duration_seconds=cast(func.floor(elapsed), Integer),
+            # Backfill bukan perubahan data; modifiedOn tidak ikut diperbarui oleh onupdate
+            modifiedOn=model.modifiedOn,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def _datatelat_update(start: int, end: int):
+    denda = func.trim(DataTelat.denda)
+    return (
+        update(DataTelat)
+        .where(
+            DataTelat.no >= start,
+            DataTelat.no < end,
+            (DataTelat.lewat_waktu_seconds.is_(None) | DataTelat.denda_amount.is_(None)),
+        )
+        .values(
+            lewat_waktu_seconds=func.coalesce(
+                DataTelat.lewat_waktu_seconds,
+                cast(func.substring(DataTelat.keterangan, LEWAT_WAKTU_PATTERN), Integer),
+            ),
+            denda_amount=func.coalesce(
+                DataTelat.denda_amount,
+                case((denda.op('~')(DENDA_PATTERN), cast(denda, Numeric(12, 2))), else_=None),
+            ),
+            modifiedOn=DataTelat.modifiedOn,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def _backfill_by_range(db: Session, model, build_update: Callable, batch_size: int) -> int:
+    low, high = db.query(func.min(model.no), func.max(model.no)).one()
+    db.commit()
+    if low is None:
+        return 0
+
+    total = 0
+    for start in range(low, high + 1, batch_size):
+        total += db.execute(build_update(start, start + batch_size)).rowcount
+        db.commit()
+        logger.info(f"Backfill {model.__tablename__}: no < {start + batch_size} selesai, {total} baris diisi")
+    return total
+
+def backfill_izin_durations(db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> dict:
+    """Mengisi duration_seconds di dataIzin dan semua tabel arsipnya."""
+    return {
+        model.__tablename__: _backfill_by_range(
+            db, model, lambda start, end, model=model: _izin_duration_update(model, start, end), batch_size
+        )
+        for model in izin_models_all(db)
+    }
+
+def backfill_datatelat(db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Mengisi lewat_waktu_seconds dan denda_amount di dataTelat."""
+    return _backfill_by_range(db, DataTelat, _datatelat_update, batch_size)
+
+def backfill_izin_daily_stats(db: Session) -> int:
+    """Membangun ulang izin_daily_stats dari izin tertua hingga hari ini, satu transaksi per bulan."""
+    oldest = [db.query(func.min(model.tanggal)).scalar() for model in izin_models_all(db)]
+    oldest = [value for value in oldest if value is not None]
+    db.commit()
+    if not oldest:
+        return 0
+
+    first = min(oldest)
+    month_start = (first.astimezone(WIB_TIMEZONE) if first.tzinfo else first).date().replace(day=1)
+    last_day = wib_today()
+    total = 0
+    while month_start <= last_day:
+        next_month = date(month_start.year + 1, 1, 1) if month_start.month == 12 else date(month_start.year, month_start.month + 1, 1)
+        total += rebuild_izin_daily_stats(db, month_start, next_month)
+        logger.info(f"Backfill izin_daily_stats: {month_start:%Y-%m} selesai, {total} baris")
+        month_start = next_month
+    return total
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.core.database import SessionLocal
+    from app.core.migrations import ensure_columns
+    # Pastikan semua model terdaftar agar relasi SQLAlchemy dapat dikonfigurasi
+    from app.core.models import import_all as import_all_models
+    import_all_models()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        ensure_columns(db.get_bind())
+        print(f"Durasi izin diisi: {backfill_izin_durations(db, batch_size=args.batch_size)}")
+        print(f"Data telat diisi: {backfill_datatelat(db, batch_size=args.batch_size)}")
+        print(f"Rekap izin harian ditulis: {backfill_izin_daily_stats(db)}")
+    finally:
+        db.close()
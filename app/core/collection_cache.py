@@ -0,0 +1,119 @@
+# backend/app/core/collection_cache.py
+#
+# Cache respons + ETag untuk koleksi yang jarang berubah (users, roles, listJob, whitelist_ip).
+# Setiap tabel memiliki nomor versi di tabel `collection_versions` yang dinaikkan oleh fungsi crud
+# dalam transaksi yang sama dengan perubahan datanya, sehingga versi berlaku untuk semua worker.
+# ETag dibentuk dari versi tabel yang dibaca sebuah respons; `If-None-Match` yang cocok dijawab 304
+# dari memori, tanpa query data dan tanpa Pydantic.
+#
+# Versi dibaca dengan satu query kecil paling sering setiap COLLECTION_VERSION_CHECK_SECONDS.
+# Worker yang menulis langsung melihat versi baru (setelah commit); worker lain paling lambat setelah selang itu.
+
+import hashlib
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import BigInteger, Column, DateTime, String, event, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, Base
+from app.core.encoding import negotiated_media_type
+from app.core.response_cache import ResponseCache
+
+class CollectionVersion(Base):
+    __tablename__ = "collection_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default="0")
+    modifiedOn = Column("modifiedOn", DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# Nama tabel yang versinya dinaikkan session ini; dibaca listener after_commit
+_BUMPED_KEY = "collection_versions_bumped"
+
+def bump_collection_version(db: Session, *tables: str):
+    """
+    Menaikkan versi tabel. Dipanggil crud SEBELUM commit agar versi dan data berubah dalam satu transaksi:
+    pembaca tidak pernah melihat versi baru dengan data lama.
+    """
+    for table in tables:
+        statement = pg_insert(CollectionVersion).values(name=table, version=1)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[CollectionVersion.name],
+            set_={"version": CollectionVersion.version + 1, "modifiedOn": func.now()},
+        ))
+    db.info.setdefault(_BUMPED_KEY, set()).update(tables)
+
+def _load_versions(db: Session) -> Dict[str, int]:
+    return dict(db.execute(select(CollectionVersion.name, CollectionVersion.version)).all())
+
+# Versi dibagikan lewat ResponseCache: satu query untuk semua request serentak, TTL = selang pemeriksaan
+_versions_cache = ResponseCache("collection_versions", ttl_seconds=settings.COLLECTION_VERSION_CHECK_SECONDS, maxsize=1)
+
+async def get_collection_versions() -> Dict[str, int]:
+    async def loader() -> Dict[str, int]:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(_load_versions)
+
+    versions, _ = await _versions_cache.get_or_load(None, loader)
+    return versions
+
+@event.listens_for(Session, "after_commit")
+def _refresh_versions_after_commit(session: Session):
+    if session.info.pop(_BUMPED_KEY, None):
+        _versions_cache.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bumped_versions(session: Session):
+    session.info.pop(_BUMPED_KEY, None)
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match memakai perbandingan lemah (RFC 9110 13.1.2): awalan W/ diabaikan
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+_collection_registry: List["CollectionCache"] = []
+
+class CollectionCache:
+    """
+    Byte respons satu endpoint koleksi, disimpan per (versi tabel, parameter query).
+    `tables` adalah semua tabel yang isinya ikut diserialisasi (mis. users + roles untuk /api/users/).
+    """
+
+    def __init__(self, name: str, tables: Tuple[str, ...], maxsize: int = 16):
+        self.name = name
+        self.tables = tables
+        # TTL panjang hanya jaring pengaman; entri lama tidak pernah terbaca lagi setelah versi naik
+        self._responses = ResponseCache(name, ttl_seconds=settings.COLLECTION_CACHE_TTL_SECONDS, maxsize=maxsize)
+        self.not_modified = 0
+        _collection_registry.append(self)
+
+    def etag(self, versions: Tuple[int, ...], key: Hashable) -> str:
+        variant = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+        return f'"{self.name}-{".".join(map(str, versions))}-{variant}"'
+
+    async def respond(self, request: Request, response_type, fn: Callable[..., Any], key: Hashable = None, **kwargs) -> Response:
+        # Versi dibaca sebelum data, jadi data yang dimuat paling tidak sebaru versi di ETag-nya
+        all_versions = await get_collection_versions()
+        versions = tuple(all_versions.get(table, 0) for table in self.tables)
+        # JSON dan MessagePack adalah representasi berbeda, jadi ETag-nya juga berbeda
+        etag = self.etag(versions, (negotiated_media_type(), key))
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response = await self._responses.respond(response_type, fn, key=(versions, key), **kwargs)
+        response.headers.update(headers)
+        return response
+
+    def stats(self) -> dict:
+        # hits/misses byte respons tercatat di ResponseCache dengan nama yang sama
+        return {"tables": list(self.tables), "not_modified": self.not_modified}
+
+def collection_cache_stats() -> dict:
+    return {cache.name: cache.stats() for cache in _collection_registry}
@@ -9,10 +9,90 @@ load_dotenv()
 class Settings:
     PROJECT_NAME: str = "Admin Panel API"
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # Anggaran koneksi ke primary PER WORKER, dibagi antara engine sync dan async (default sama dengan
+    # QueuePool bawaan: 5 + 10). Total koneksi = workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW);
+    # dengan 4 worker gunicorn (Dockerfile) paling banyak 60 koneksi. Replica memakai anggaran yang sama.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # Bagian engine async dari anggaran di atas; engine sync mendapat sisanya (default 3 + 6)
+    ASYNC_DB_POOL_SIZE: int = int(os.getenv("ASYNC_DB_POOL_SIZE", "2"))
+    ASYNC_DB_MAX_OVERFLOW: int = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "4"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+    # Koneksi didaur ulang sebelum diputus oleh Postgres terkelola saat idle
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    # statement_timeout Postgres per koneksi (ms), 0 berarti tanpa batas
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+    # Opsional: URL untuk engine async. Jika kosong, diturunkan dari DATABASE_URL (asyncpg untuk Postgres,
+    # aiosqlite untuk SQLite); backend lain wajib mengisinya
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL")
+    # Set 0 jika koneksi melewati pgbouncer/Supavisor mode transaction (prepared statement tidak didukung)
+    ASYNC_DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("ASYNC_DB_STATEMENT_CACHE_SIZE", "100"))
+
+    # Opsional: read replica untuk endpoint laporan (GET). Jika kosong, semua bacaan ke primary
+    DATABASE_REPLICA_URL: str = os.getenv("DATABASE_REPLICA_URL")
+    ASYNC_DATABASE_REPLICA_URL: str = os.getenv("ASYNC_DATABASE_REPLICA_URL")
+    # Lama (detik) bacaan klien tetap diarahkan ke primary setelah klien tersebut menulis
+    REPLICA_STICKY_SECONDS: float = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
     SUPABASE_URL: str = os.getenv("SUPABASE_URL")
     SUPABASE_ANON_KEY: str = os.getenv("SUPABASE_ANON_KEY")
     FIREBASE_CREDENTIALS_PATH: str = os.getenv("FIREBASE_CREDENTIALS_PATH")
 
+    # Daftar CIDR proxy tepercaya (dipisah koma). Header Forwarded/X-Forwarded-For/X-Real-IP
+    # hanya dibaca jika koneksi berasal dari salah satu jaringan ini.
+    TRUSTED_PROXIES: str = os.getenv("TRUSTED_PROXIES", "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16")
+    PUBLIC_IP_LOOKUP_URL: str = os.getenv("PUBLIC_IP_LOOKUP_URL", "https://api.ipify.org")
+    PUBLIC_IP_TTL_SECONDS: int = int(os.getenv("PUBLIC_IP_TTL_SECONDS", "3600"))
+
+    # Jumlah maksimum token Firebase ID terverifikasi yang disimpan di cache per worker
+    FIREBASE_TOKEN_CACHE_MAXSIZE: int = int(os.getenv("FIREBASE_TOKEN_CACHE_MAXSIZE", "2048"))
+
+    # Cache data principal (status, role, jabatan) untuk get_current_active_user
+    PRINCIPAL_CACHE_MAXSIZE: int = int(os.getenv("PRINCIPAL_CACHE_MAXSIZE", "4096"))
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+
+    # Statistik query per request (header Server-Timing dan deteksi N+1)
+    QUERY_STATS_ENABLED: bool = os.getenv("QUERY_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Statement yang sama (setelah dinormalisasi) lebih dari N kali dalam satu request dianggap N+1
+    QUERY_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", "10"))
+    # Jika aktif (mode pengujian), request yang melewati query budget router-nya gagal dengan 500
+    QUERY_BUDGET_ENFORCE: bool = os.getenv("QUERY_BUDGET_ENFORCE", "false").lower() in ("1", "true", "yes")
+
+    # Aktif secara default: relasi yang tidak dideklarasikan lewat app.core.loaders.eager akan raise saat diakses,
+    # sehingga N+1 query gagal di development alih-alih diam-diam memperlambat produksi.
+    # Set "false" hanya sebagai jalan keluar darurat.
+    STRICT_RELATIONSHIP_LOADING: bool = os.getenv("STRICT_RELATIONSHIP_LOADING", "true").lower() in ("1", "true", "yes")
+
+    # Selang maksimum (detik) sebelum worker memeriksa versi aturan izin yang di-cache
+    IZIN_RULE_CACHE_CHECK_SECONDS: float = float(os.getenv("IZIN_RULE_CACHE_CHECK_SECONDS", "10"))
+
+    # Dispatcher outbox notifikasi (python -m app.services.dispatcher)
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+    OUTBOX_POLL_INTERVAL_SECONDS: float = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "2"))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+    OUTBOX_BACKOFF_BASE_SECONDS: int = int(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", "5"))
+    OUTBOX_BACKOFF_MAX_SECONDS: int = int(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "900"))
+
+    # Deteksi izin lewat waktu di proses dispatcher (app.services.overdue)
+    OVERDUE_SCHEDULER_ENABLED: bool = os.getenv("OVERDUE_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+    OVERDUE_REFRESH_LOOKBACK_SECONDS: float = float(os.getenv("OVERDUE_REFRESH_LOOKBACK_SECONDS", "60"))
+
+    # Papan izin live lewat SSE dan LISTEN/NOTIFY (app.dataizin.live)
+    LIVE_EVENTS_ENABLED: bool = os.getenv("LIVE_EVENTS_ENABLED", "true").lower() in ("1", "true", "yes")
+    LIVE_EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("LIVE_EVENTS_HEARTBEAT_SECONDS", "15"))
+    # Batas pesan yang belum terkirim per klien sebelum klien lambat diputus
+    LIVE_EVENTS_QUEUE_SIZE: int = int(os.getenv("LIVE_EVENTS_QUEUE_SIZE", "100"))
+
+    # Cache respons mikro + single-flight untuk GET yang sering di-poll (app.core.response_cache).
+    # Sebaiknya 1-5 detik: cukup untuk menggabungkan lonjakan polling, cukup singkat untuk data live.
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "2"))
+
+    # Cache + ETag untuk koleksi yang jarang berubah (app.core.collection_cache).
+    # Selang maksimum sebelum worker membaca ulang versi tabel yang diubah worker lain
+    COLLECTION_VERSION_CHECK_SECONDS: float = float(os.getenv("COLLECTION_VERSION_CHECK_SECONDS", "5"))
+    COLLECTION_CACHE_TTL_SECONDS: float = float(os.getenv("COLLECTION_CACHE_TTL_SECONDS", "3600"))
+
     TIMEZONE = timezone('Asia/Jakarta')
 
 settings = Settings()
\ No newline at end of file
@@ -1,14 +1,127 @@
 # backend/app/core/database.py
 
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.query_stats import install_query_stats
+from app.core.pool_metrics import TimedQueuePool, TimedAsyncAdaptedQueuePool
+from app.core.read_routing import should_read_from_primary
+
+_IS_POSTGRES = make_url(settings.DATABASE_URL).get_backend_name() == "postgresql"
+
+# Driver async untuk backend yang URL async-nya bisa diturunkan otomatis dari URL sync
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def _async_database_url(url: str, setting_name: str) -> str:
+    """
+    Menurunkan URL async dari URL sync: asyncpg untuk Postgres (sslmode diganti menjadi parameter ssl
+    milik asyncpg), aiosqlite untuk SQLite. URL yang sudah memakai driver async dipakai apa adanya.
+    """
+    parsed = make_url(url)
+    if parsed.get_dialect().is_async:
+        return url
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise RuntimeError(
+            f"Tidak dapat menurunkan URL async untuk backend '{backend}'. "
+            f"Set {setting_name} dengan driver async (mis. postgresql+asyncpg://...)."
+        )
+    query = dict(parsed.query)
+    if backend == "postgresql":
+        sslmode = query.pop("sslmode", None)
+        if sslmode and "ssl" not in query:
+            query["ssl"] = sslmode
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}", query=query).render_as_string(hide_password=False)
+
+def pool_budget() -> dict:
+    """
+    Pembagian anggaran koneksi per worker (DB_POOL_SIZE + DB_MAX_OVERFLOW) antara engine sync dan async,
+    sehingga kedua engine bersama tidak melebihi anggaran tersebut.
+    """
+    # pool_size 0 berarti tanpa batas di QueuePool, jadi setiap engine mendapat paling sedikit satu koneksi
+    async_size = max(1, min(settings.ASYNC_DB_POOL_SIZE, settings.DB_POOL_SIZE - 1))
+    async_overflow = max(0, min(settings.ASYNC_DB_MAX_OVERFLOW, settings.DB_MAX_OVERFLOW))
+    return {
+        "sync": {
+            "pool_size": max(1, settings.DB_POOL_SIZE - async_size),
+            "max_overflow": max(0, settings.DB_MAX_OVERFLOW - async_overflow),
+        },
+        "async": {"pool_size": async_size, "max_overflow": async_overflow},
+        "max_connections_per_worker": settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    }
+
+def _pool_options(poolclass, kind: str) -> dict:
+    """Opsi pool dari Settings; hanya berlaku untuk Postgres (SQLite memakai pool bawaannya)."""
+    if not _IS_POSTGRES:
+        return {}
+    return {
+        "poolclass": poolclass,
+        **pool_budget()[kind],
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def _sync_connect_args() -> dict:
+    if not _IS_POSTGRES or not settings.DB_STATEMENT_TIMEOUT_MS:
+        return {}
+    return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+
+def _async_connect_args() -> dict:
+    if not _IS_POSTGRES:
+        return {}
+    connect_args = {"statement_cache_size": settings.ASYNC_DB_STATEMENT_CACHE_SIZE}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    return connect_args
 
 # Menggunakan URL database dari konfigurasi
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(
+    settings.DATABASE_URL,
+    connect_args=_sync_connect_args(),
+    **_pool_options(TimedQueuePool, "sync"),
+)
+if settings.QUERY_STATS_ENABLED:
+    install_query_stats(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine async (asyncpg) untuk router yang paling sering dipanggil; router lain tetap memakai engine sync
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or _async_database_url(settings.DATABASE_URL, "ASYNC_DATABASE_URL"),
+    connect_args=_async_connect_args(),
+    **_pool_options(TimedAsyncAdaptedQueuePool, "async"),
+)
+if settings.QUERY_STATS_ENABLED:
+    install_query_stats(async_engine.sync_engine)
+# expire_on_commit=False agar atribut tetap bisa dibaca setelah commit tanpa query (lazy IO) tambahan
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Read replica opsional untuk laporan; tanpa DATABASE_REPLICA_URL, session baca memakai primary
+replica_engine = None
+async_replica_engine = None
+ReplicaSessionLocal = SessionLocal
+AsyncReplicaSessionLocal = AsyncSessionLocal
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        connect_args=_sync_connect_args(),
+        **_pool_options(TimedQueuePool, "sync"),
+    )
+    async_replica_engine = create_async_engine(
+        settings.ASYNC_DATABASE_REPLICA_URL or _async_database_url(settings.DATABASE_REPLICA_URL, "ASYNC_DATABASE_REPLICA_URL"),
+        connect_args=_async_connect_args(),
+        **_pool_options(TimedAsyncAdaptedQueuePool, "async"),
+    )
+    if settings.QUERY_STATS_ENABLED:
+        install_query_stats(replica_engine)
+        install_query_stats(async_replica_engine.sync_engine)
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    AsyncReplicaSessionLocal = async_sessionmaker(bind=async_replica_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -16,4 +129,31 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def read_session_factory(request: Request):
+    """
+    Pabrik session untuk bacaan. Replica, kecuali klien baru saja menulis
+    (jendela sticky REPLICA_STICKY_SECONDS) sehingga tetap membaca tulisannya sendiri dari primary.
+    """
+    if replica_engine is None or should_read_from_primary(request):
+        return SessionLocal
+    return ReplicaSessionLocal
+
+def get_read_db(request: Request):
+    """Session untuk endpoint baca saja (lihat read_session_factory)."""
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    use_primary = async_replica_engine is None or should_read_from_primary(request)
+    session_factory = AsyncSessionLocal if use_primary else AsyncReplicaSessionLocal
+    async with session_factory() as db:
+        yield db
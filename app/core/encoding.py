@@ -0,0 +1,101 @@
+# backend/app/core/encoding.py
+#
+# Encoding respons untuk seluruh aplikasi: orjson secara default, MessagePack jika klien mengirim
+# `Accept: application/msgpack`. ContentNegotiationMiddleware membaca header Accept sekali per request
+# dan menyimpannya di contextvar, sehingga NegotiatedResponse (default_response_class FastAPI) dan
+# cache respons (app.core.response_cache) memilih format yang sama tanpa akses ke objek Request.
+#
+# Bandingkan waktu encode dan ukuran payload: python -m benchmarks.response_encoding
+
+import contextvars
+import datetime
+import decimal
+import uuid
+from typing import Any, Optional
+
+import msgpack
+import orjson
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+# Nama lain yang dipakai sebagian klien MessagePack
+_MSGPACK_ALIASES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+_JSON_ALIASES = (JSON_MEDIA_TYPE, "application/*", "*/*")
+
+_wants_msgpack: contextvars.ContextVar[bool] = contextvars.ContextVar("wants_msgpack", default=False)
+
+def prefers_msgpack(accept: Optional[str]) -> bool:
+    """True jika Accept memberi MessagePack bobot (q) paling tidak setinggi JSON."""
+    if not accept or "msgpack" not in accept:
+        return False
+    msgpack_q = json_q = 0.0
+    for part in accept.split(","):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.lower()
+        if media_type in _MSGPACK_ALIASES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type in _JSON_ALIASES:
+            json_q = max(json_q, q)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+def wants_msgpack() -> bool:
+    return _wants_msgpack.get()
+
+def negotiated_media_type() -> str:
+    return MSGPACK_MEDIA_TYPE if _wants_msgpack.get() else JSON_MEDIA_TYPE
+
+def _msgpack_default(value: Any):
+    # Konten FastAPI sudah berupa tipe JSON; ini hanya untuk pemanggil yang mengirim objek Python langsung
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"Tipe {type(value).__name__} tidak dapat di-encode ke MessagePack")
+
+def encode_json(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def encode_msgpack(content: Any) -> bytes:
+    return msgpack.packb(content, use_bin_type=True, default=_msgpack_default)
+
+def encode(content: Any, media_type: str) -> bytes:
+    return encode_msgpack(content) if media_type == MSGPACK_MEDIA_TYPE else encode_json(content)
+
+class NegotiatedResponse(JSONResponse):
+    """JSON lewat orjson, atau MessagePack jika request meminta `Accept: application/msgpack`."""
+
+    def __init__(self, content: Any, status_code: int = 200, headers=None, media_type: Optional[str] = None, background=None):
+        if media_type is None and _wants_msgpack.get():
+            media_type = MSGPACK_MEDIA_TYPE
+        super().__init__(content, status_code=status_code, headers=headers, media_type=media_type, background=background)
+        # Cache/proxy tidak boleh memberikan respons MessagePack ke klien JSON (atau sebaliknya)
+        self.headers.add_vary_header("Accept")
+
+    def render(self, content: Any) -> bytes:
+        return encode(content, self.media_type)
+
+class ContentNegotiationMiddleware:
+    """Middleware ASGI murni: menyimpan pilihan format respons dari header Accept untuk request ini."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _wants_msgpack.set(prefers_msgpack(Headers(scope=scope).get("accept")))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _wants_msgpack.reset(token)
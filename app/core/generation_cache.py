@@ -0,0 +1,63 @@
+# backend/app/core/generation_cache.py
+#
+# Dasar cache per proses yang dipakai principal, aturan izin, dan cache respons.
+# Setiap invalidasi menaikkan nomor generasi; pemuat mencatat generasi sebelum query dan `set` menolak
+# hasilnya jika generasi sudah berubah, sehingga data yang dibaca sebelum sebuah tulisan tidak
+# menimpa invalidasi dari tulisan tersebut.
+
+import threading
+import time
+from typing import Any, Hashable, Optional, Tuple
+
+from cachetools import LRUCache, TTLCache
+
+class GenerationCache:
+    """
+    Cache kunci -> nilai yang aman antar thread (jalur tulis sync memanggil invalidasi dari thread pool).
+    Tanpa `ttl_seconds`, entri hanya keluar lewat invalidasi atau LRU.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds
+        if ttl_seconds is None:
+            self._entries = LRUCache(maxsize=maxsize)
+        else:
+            self._entries = TTLCache(maxsize=maxsize, ttl=ttl_seconds, timer=time.monotonic)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            return self._entries.get(key)
+
+    def lookup(self, key: Hashable) -> Tuple[Any, int]:
+        """Nilai (atau None) beserta generasi saat ini, dibaca bersamaan; generasi diteruskan ke `set`."""
+        with self._lock:
+            return self._entries.get(key), self._generation
+
+    def set(self, key: Hashable, value: Any, generation: int) -> bool:
+        """Menyimpan hasil load yang dimulai pada `generation`; False jika ada invalidasi sejak itu."""
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._entries[key] = value
+            return True
+
+    def evict(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,25 @@
+# backend/app/core/loaders.py
+#
+# Strategi pemuatan relasi untuk query daftar/detail.
+# Setiap query mendeklarasikan relasi yang dibutuhkan skema responsnya:
+# joinedload untuk many-to-one, selectinload untuk koleksi.
+# Opsi dibangun di dalam fungsi (mis. izin_loaders()) karena mapper baru bisa
+# dikonfigurasi setelah semua model terdaftar.
+
+from sqlalchemy.orm import joinedload, raiseload
+from app.core.config import settings
+from app.users.models import User
+
+def user_loader(relationship):
+    """joinedload untuk relasi ke User beserta role-nya (skema User selalu menyertakan role)."""
+    return joinedload(relationship).joinedload(User.role)
+
+def eager(*options):
+    """
+    Mengembalikan opsi loader yang dideklarasikan ditambah raiseload untuk semua relasi lain,
+    sehingga lazy load yang tidak direncanakan langsung gagal alih-alih diam-diam menambah
+    query per baris. STRICT_RELATIONSHIP_LOADING=false mematikan raiseload (jalan keluar darurat).
+    """
+    if settings.STRICT_RELATIONSHIP_LOADING:
+        return (*options, raiseload("*"))
+    return options
@@ -0,0 +1,136 @@
+# backend/app/core/migrations.py
+#
+# Migrasi idempoten yang dijalankan saat startup (dan bisa dijalankan manual:
+# python -m app.core.migrations). Base.metadata.create_all hanya membuat kolom dan indeks untuk tabel baru,
+# sehingga kolom dan indeks yang ditambahkan ke model setelah tabel ada dibuat di sini.
+# Kolom baru selalu nullable tanpa default, sehingga ADD COLUMN di Postgres hanya mengubah katalog
+# (tanpa menulis ulang tabel); pengisian data lama dilakukan job backfill terpisah.
+# Di Postgres indeks dibangun dengan CREATE INDEX CONCURRENTLY agar tidak mengunci tulisan.
+
+import logging
+from typing import List
+
+from sqlalchemy import Column, Index, inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Kolom yang ditambahkan ke model setelah tabelnya ada di produksi
+MANAGED_COLUMNS = (
+    ("dataIzin", "duration_seconds"),
+    ("dataIzin", "slot_scopes"),
+    ("dataTelat", "lewat_waktu_seconds"),
+    ("dataTelat", "denda_amount"),
+)
+
+# Indeks yang dideklarasikan di __table_args__ model dan dijamin ada pada tabel lama
+MANAGED_INDEXES = (
+    ("dataIzin", "ix_dataIzin_user_uid_tanggal"),
+    ("dataIzin", "ix_dataIzin_status_tanggal"),
+    ("dataIzin", "ix_dataIzin_tanggal"),
+    ("dataTelat", "ix_dataTelat_izin_no"),
+)
+
+def _model_tables() -> dict:
+    # Impor lokal agar tabel model terdaftar di metadata tanpa impor melingkar dengan app.core.database
+    from app.core.database import Base
+    import app.dataizin.models  # noqa: F401
+    import app.datatelat.models  # noqa: F401
+
+    return Base.metadata.tables
+
+def managed_indexes() -> List[Index]:
+    tables = _model_tables()
+    indexes = []
+    for table_name, index_name in MANAGED_INDEXES:
+        indexes.extend(index for index in tables[table_name].indexes if index.name == index_name)
+    return indexes
+
+def _add_column_sql(engine: Engine, table_name: str, column: Column) -> str:
+    preparer = engine.dialect.identifier_preparer
+    column_type = column.type.compile(dialect=engine.dialect)
+    # SQLite tidak mengenal ADD COLUMN IF NOT EXISTS; keberadaan kolom sudah diperiksa lewat inspector
+    if_not_exists = "IF NOT EXISTS " if engine.dialect.name == "postgresql" else ""
+    return (
+        f"ALTER TABLE {preparer.quote(table_name)} "
+        f"ADD COLUMN {if_not_exists}{preparer.quote(column.name)} {column_type}"
+    )
+
+def ensure_columns(engine: Engine) -> List[str]:
+    """
+    Menambahkan kolom yang belum ada. Kolom izin juga ditambahkan ke tabel arsip `dataIzin_<tahun>`
+    karena job arsip menyalin semua kolom `dataIzin`. Mengembalikan "tabel.kolom" yang ditambahkan.
+    """
+    from app.dataizin.archive import ARCHIVE_TABLE_PREFIX
+
+    tables = _model_tables()
+    inspector = inspect(engine)
+    existing_tables = inspector.get_table_names()
+    added = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if engine.dialect.name == "postgresql":
+            # ADD COLUMN butuh kunci eksklusif singkat; jangan mengantre di belakang transaksi panjang
+            connection.execute(text("SET lock_timeout = '5s'"))
+        for table_name, column_name in MANAGED_COLUMNS:
+            column = tables[table_name].columns[column_name]
+            targets = [table_name]
+            if table_name == "dataIzin":
+                targets += [name for name in existing_tables if name.startswith(ARCHIVE_TABLE_PREFIX)]
+            for target in targets:
+                if target not in existing_tables:
+                    continue
+                if column_name in {existing["name"] for existing in inspector.get_columns(target)}:
+                    continue
+                try:
+                    connection.execute(text(_add_column_sql(engine, target, column)))
+                    added.append(f"{target}.{column_name}")
+                except Exception as e:
+                    logger.warning(f"Gagal menambahkan kolom {target}.{column_name}: {e}")
+    return added
+
+def _create_index_sql(engine: Engine, index: Index, concurrently: bool) -> str:
+    preparer = engine.dialect.identifier_preparer
+    columns = ", ".join(preparer.quote(column.name) for column in index.columns)
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+        f"{preparer.quote(index.name)} ON {preparer.format_table(index.table)} ({columns})"
+    )
+
+def _drop_invalid_index(connection, engine: Engine, index: Index) -> bool:
+    """Build CONCURRENTLY yang gagal meninggalkan indeks INVALID; hapus agar bisa dibangun ulang."""
+    invalid = connection.execute(
+        text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND pg_catalog.pg_table_is_visible(c.oid) AND NOT i.indisvalid"
+        ),
+        {"name": index.name},
+    ).first()
+    if invalid:
+        preparer = engine.dialect.identifier_preparer
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {preparer.quote(index.name)}"))
+        logger.warning(f"Indeks {index.name} tidak valid dan dibangun ulang.")
+    return bool(invalid)
+
+def ensure_indexes(engine: Engine) -> List[str]:
+    """Membuat indeks yang belum ada. Mengembalikan nama indeks yang diproses."""
+    is_postgres = engine.dialect.name == "postgresql"
+    processed = []
+    # CREATE INDEX CONCURRENTLY tidak boleh berada di dalam blok transaksi
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for index in managed_indexes():
+            try:
+                if is_postgres:
+                    _drop_invalid_index(connection, engine, index)
+                connection.execute(text(_create_index_sql(engine, index, concurrently=is_postgres)))
+                processed.append(index.name)
+            except Exception as e:
+                # Worker lain mungkin sedang membangun indeks yang sama; coba lagi pada startup berikutnya
+                logger.warning(f"Gagal memastikan indeks {index.name}: {e}")
+    return processed
+
+if __name__ == "__main__":
+    from app.core.database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"Kolom ditambahkan: {ensure_columns(engine)}")
+    print(f"Indeks dipastikan: {ensure_indexes(engine)}")
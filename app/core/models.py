@@ -0,0 +1,30 @@
+# backend/app/core/models.py
+#
+# Satu daftar semua modul model. Relasi SQLAlchemy (mis. "User" di Izin) hanya dapat dikonfigurasi
+# jika semua model terdaftar di Base, dan create_all hanya membuat tabel yang modelnya sudah diimpor.
+# Dipanggil oleh app.main dan setiap entry point CLI; model baru cukup ditambahkan di sini.
+
+import importlib
+
+MODEL_MODULES = (
+    "app.fcm.models",
+    "app.dataizin.models",
+    "app.users.models",
+    "app.izin_rules.models",
+    "app.roles.models",
+    "app.datatelat.models",
+    "app.datajobdesk.models",
+    "app.datashift.models",
+    "app.listjob.models",
+    "app.datacuti.models",
+    "app.dataresign.models",
+    "app.whitelist.models",
+    "app.statusLive.models",
+    "app.logs.models",
+    "app.outbox.models",
+    "app.core.collection_cache",
+)
+
+def import_all():
+    for module in MODEL_MODULES:
+        importlib.import_module(module)
@@ -0,0 +1,88 @@
+# backend/app/core/pool_metrics.py
+#
+# Pool koneksi yang mencatat lama menunggu checkout, untuk endpoint /metrics/db-pool.
+
+import os
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+class PoolWaitStats:
+    """Akumulasi waktu checkout koneksi (termasuk antre saat pool penuh) per worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, elapsed: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += elapsed
+            self.max_wait_seconds = max(self.max_wait_seconds, elapsed)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_seconds / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "total_wait_ms": round(self.total_wait_seconds * 1000, 3),
+            }
+
+class _TimedCheckoutMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Per instance: pool primary dan replica dengan kelas yang sama tidak boleh berbagi statistik
+        self.wait_stats = PoolWaitStats()
+
+    def recreate(self):
+        # Pool baru (mis. setelah engine.dispose()) melanjutkan statistik pool lama
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return connection
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_status(pool) -> dict:
+    """Status pool saat ini untuk satu engine di worker ini."""
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            # QueuePool.overflow() bernilai negatif selama pool belum terisi penuh
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status["wait"] = wait_stats.snapshot()
+    return status
+
+def worker_pid() -> int:
+    return os.getpid()
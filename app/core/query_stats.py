@@ -0,0 +1,187 @@
+# backend/app/core/query_stats.py
+#
+# Penghitung statement SQL per request dan pendeteksi N+1.
+# Event cursor SQLAlchemy pada engine mencatat jumlah query dan waktu DB ke objek
+# QueryStats milik request yang sedang berjalan (disimpan di contextvar).
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\?")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """Menyamakan SQL yang hanya berbeda di parameter/literal, agar query berulang mudah dikenali."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _BIND_PARAM.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PARAM_LIST.sub("(?)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+class QueryStats:
+    """Statistik query untuk satu request (atau satu blok assert_query_budget)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter = Counter()
+        self.budget: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float):
+        normalized = normalize_sql(statement)
+        with self._lock:
+            self.count += 1
+            self.total_seconds += elapsed
+            self.statements[normalized] += 1
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """Statement yang dijalankan lebih dari `threshold` kali, urut dari yang terbanyak."""
+        with self._lock:
+            return [(sql, n) for sql, n in self.statements.most_common() if n > threshold]
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Perekam global untuk assert_query_budget; menangkap query dari thread mana pun
+_recorders: List[QueryStats] = []
+_recorders_lock = threading.Lock()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    elapsed = time.perf_counter() - start_times.pop() if start_times else 0.0
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if _recorders:
+        with _recorders_lock:
+            recorders = list(_recorders)
+        for recorder in recorders:
+            if recorder is not stats:
+                recorder.record(statement, elapsed)
+
+def install_query_stats(engine: Engine):
+    """Memasang event cursor pada engine. Aman dipanggil lebih dari sekali."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def get_current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+def query_budget(max_queries: int):
+    """
+    Dependency untuk mengunci jumlah query maksimum per request pada sebuah router.
+    Pelanggaran dicatat di log; jika QUERY_BUDGET_ENFORCE aktif (mode pengujian), request gagal dengan 500.
+    Dependency di level route dijalankan setelah dependency router, jadi batas route menimpa batas router.
+    """
+    def _set_query_budget():
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = max_queries
+    # Dibaca benchmarks.query_budget untuk mengambil batas route tanpa menyalinnya
+    _set_query_budget.max_queries = max_queries
+    return _set_query_budget
+
+class QueryBudgetExceeded(AssertionError):
+    def __init__(self, stats: QueryStats, max_queries: Optional[int], max_repeats: Optional[int]):
+        self.stats = stats
+        details = [f"{stats.count} query dijalankan"]
+        if max_queries is not None:
+            details.append(f"batas {max_queries}")
+        for sql, n in stats.repeated(max_repeats if max_repeats is not None else 1)[:3]:
+            details.append(f"{n}x: {sql[:200]}")
+        super().__init__("Query budget terlampaui: " + "; ".join(details))
+
+@contextmanager
+def assert_query_budget(max_queries: Optional[int] = None, max_repeats: Optional[int] = None):
+    """
+    Helper pengujian: semua query yang dijalankan di dalam blok dihitung
+    (termasuk yang berasal dari TestClient di thread lain), lalu diperiksa terhadap batasnya.
+
+        with assert_query_budget(max_queries=3, max_repeats=1):
+            client.get("/api/izin/")
+    """
+    stats = QueryStats()
+    with _recorders_lock:
+        _recorders.append(stats)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        with _recorders_lock:
+            _recorders.remove(stats)
+
+    if max_queries is not None and stats.count > max_queries:
+        raise QueryBudgetExceeded(stats, max_queries, max_repeats)
+    if max_repeats is not None and stats.repeated(max_repeats):
+        raise QueryBudgetExceeded(stats, max_queries, max_repeats)
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Menambahkan header Server-Timing berisi jumlah query dan total waktu DB,
+    serta menandai request yang menjalankan SQL yang sama lebih dari QUERY_REPEAT_THRESHOLD kali.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _current_stats.reset(token)
+
+        timings = [
+            f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries"',
+            f"db-queries;desc={stats.count}",
+        ]
+
+        repeated = stats.repeated(settings.QUERY_REPEAT_THRESHOLD)
+        if repeated:
+            sql, n = repeated[0]
+            timings.append(f"db-repeat;desc={n}")
+            logger.warning(
+                f"Kemungkinan N+1 pada {request.method} {request.url.path}: "
+                f"statement yang sama dijalankan {n}x: {sql[:300]}"
+            )
+
+        if stats.budget is not None and stats.count > stats.budget:
+            logger.warning(
+                f"Query budget terlampaui pada {request.method} {request.url.path}: "
+                f"{stats.count} query (batas {stats.budget})"
+            )
+            if settings.QUERY_BUDGET_ENFORCE:
+                response = JSONResponse(
+                    status_code=500,
+                    content={"detail": f"Query budget terlampaui: {stats.count} query (batas {stats.budget})"},
+                )
+
+        response.headers.append("Server-Timing", ", ".join(timings))
+        return response
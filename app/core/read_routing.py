@@ -0,0 +1,89 @@
+# backend/app/core/read_routing.py
+#
+# Routing baca ke replica dengan jaminan read-your-writes.
+# Setelah klien melakukan mutasi (POST/PUT/PATCH/DELETE yang berhasil), semua bacaan klien tersebut
+# diarahkan ke primary selama REPLICA_STICKY_SECONDS agar tidak membaca data replica yang tertinggal.
+# Klien dikenali dari UID token Firebase (jika sudah terverifikasi di cache) dan dari cookie sticky.
+# IP sengaja tidak dipakai: seluruh staf satu kantor berbagi IP NAT (izin keluar/kembali tanpa token),
+# sehingga satu mutasi akan memindahkan semua pembaca kantor itu ke primary tepat saat pergantian shift.
+
+import threading
+import time
+from typing import Optional
+
+from cachetools import TTLCache
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Cookie cadangan agar request berikutnya yang mendarat di worker gunicorn lain tetap ke primary
+STICKY_COOKIE_NAME = "db_primary"
+
+class StickyPrimaryTracker:
+    """Mencatat klien yang baru saja menulis; entri kedaluwarsa setelah `window_seconds`."""
+
+    def __init__(self, window_seconds: float, maxsize: int = 10000):
+        self.window_seconds = window_seconds
+        self._marks = TTLCache(maxsize=maxsize, ttl=window_seconds, timer=time.monotonic)
+        self._lock = threading.Lock()
+
+    def mark(self, key: Optional[str]):
+        if not key or self.window_seconds <= 0:
+            return
+        with self._lock:
+            self._marks[key] = True
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        with self._lock:
+            return key in self._marks
+
+sticky_primary = StickyPrimaryTracker(settings.REPLICA_STICKY_SECONDS)
+
+def _token_uid(request: Request) -> Optional[str]:
+    """UID dari token Bearer, hanya jika klaimnya sudah terverifikasi dan tersimpan di cache (tanpa verifikasi RSA)."""
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    # Impor lokal: modul autentikasi bergantung pada app.core.database
+    from app.autentikasi.security import firebase_token_cache
+    claims = firebase_token_cache.get(token.strip())
+    return claims.get("uid") if claims else None
+
+def sticky_keys(request: Request) -> list:
+    keys = []
+    uid = _token_uid(request)
+    if uid:
+        keys.append(f"uid:{uid}")
+    return keys
+
+def should_read_from_primary(request: Request) -> bool:
+    """True jika klien ini menulis dalam jendela sticky sehingga bacaannya harus dari primary."""
+    if request.method not in SAFE_METHODS:
+        return True
+    if request.cookies.get(STICKY_COOKIE_NAME):
+        return True
+    return any(sticky_primary.is_sticky(key) for key in sticky_keys(request))
+
+class ReadRoutingMiddleware(BaseHTTPMiddleware):
+    """Menandai klien yang baru saja melakukan mutasi yang berhasil agar bacaan berikutnya ke primary."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            for key in sticky_keys(request):
+                sticky_primary.mark(key)
+            response.set_cookie(
+                STICKY_COOKIE_NAME,
+                "1",
+                max_age=max(1, int(settings.REPLICA_STICKY_SECONDS)),
+                httponly=True,
+                secure=request.url.scheme == "https",
+                samesite="none" if request.url.scheme == "https" else "lax",
+            )
+        return response
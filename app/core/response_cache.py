@@ -0,0 +1,122 @@
+# backend/app/core/response_cache.py
+#
+# Cache respons mikro (TTL 1-5 detik) dengan single-flight untuk GET yang hasilnya sama bagi semua klien
+# (mis. /api/izin/pending). Request serentak dengan kunci yang sama digabung menjadi satu eksekusi query,
+# dan hasilnya disimpan sebagai byte JSON/MessagePack yang sudah diserialisasi (per format). Cache berlaku per worker; jalur tulis
+# memanggil `invalidate()` sehingga worker yang menulis langsung melihat perubahan, worker lain paling
+# lambat setelah TTL.
+
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.encoding import MSGPACK_MEDIA_TYPE, encode_msgpack, negotiated_media_type
+from app.core.generation_cache import GenerationCache
+
+_registry: List["ResponseCache"] = []
+
+@lru_cache(maxsize=None)
+def _type_adapter(response_type) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+class ResponseCache:
+    """
+    Cache byte respons per kunci dengan TTL pendek dan penggabungan request serentak.
+    Statistik: hits (dari cache), misses (menjalankan query), coalesced (menunggu query yang sedang berjalan).
+    """
+
+    def __init__(self, name: str, ttl_seconds: float = None, maxsize: int = 64):
+        self.name = name
+        self.ttl_seconds = settings.RESPONSE_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._entries = GenerationCache(maxsize=maxsize, ttl_seconds=self.ttl_seconds)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Jalur tulis sync memanggil invalidate dari thread pool, jadi query yang berjalan dan statistik dilindungi lock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        _registry.append(self)
+
+    def invalidate(self):
+        self._entries.clear()
+        with self._lock:
+            # Query yang sedang berjalan tetap selesai untuk penunggunya, tetapi request baru tidak ikut
+            self._inflight.clear()
+
+    async def _load(self, key: Hashable, generation: int, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            body = await loader()
+            self._entries.set(key, body, generation)
+            return body
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is asyncio.current_task():
+                    del self._inflight[key]
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        """
+        Mengembalikan (nilai, asal) dengan asal 'HIT', 'COALESCED', atau 'MISS'.
+        Nilai biasanya byte respons, tetapi boleh objek immutable apa pun selain None.
+        """
+        body, generation = self._entries.lookup(key)
+        with self._lock:
+            if body is not None:
+                self.hits += 1
+                return body, "HIT"
+            task = self._inflight.get(key)
+            if task is not None:
+                self.coalesced += 1
+                outcome = "COALESCED"
+            else:
+                self.misses += 1
+                outcome = "MISS"
+                # Query berjalan sebagai task tersendiri: klien pemicu yang memutus koneksi tidak membatalkannya
+                task = asyncio.get_running_loop().create_task(self._load(key, generation, loader))
+                self._inflight[key] = task
+        return await asyncio.shield(task), outcome
+
+    async def respond(self, response_type, fn: Callable[..., Any], key: Hashable = None, **kwargs) -> Response:
+        """
+        Respons JSON (atau MessagePack, sesuai header Accept) untuk `fn(db, **kwargs)` (fungsi crud sync)
+        yang divalidasi terhadap `response_type`. Query dan serialisasi berjalan dengan session async
+        sendiri yang langsung ditutup, sehingga cache hit tidak meminjam koneksi sama sekali.
+        """
+        adapter = _type_adapter(response_type)
+        media_type = negotiated_media_type()
+
+        def load_and_serialize(db) -> bytes:
+            value = adapter.validate_python(fn(db, **kwargs), from_attributes=True)
+            if media_type == MSGPACK_MEDIA_TYPE:
+                return encode_msgpack(adapter.dump_python(value, mode="json"))
+            return adapter.dump_json(value)
+
+        async def loader() -> bytes:
+            async with AsyncSessionLocal() as db:
+                return await db.run_sync(load_and_serialize)
+
+        body, outcome = await self.get_or_load((media_type, key), loader)
+        return Response(content=body, media_type=media_type, headers={"X-Cache": outcome, "Vary": "Accept"})
+
+    def stats(self) -> dict:
+        entries = len(self._entries)
+        with self._lock:
+            total = self.hits + self.misses + self.coalesced
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                # Request yang tidak menjalankan query sendiri (hit + coalesced)
+                "saved_ratio": round((self.hits + self.coalesced) / total, 4) if total else None,
+            }
+
+def response_cache_stats() -> dict:
+    return {cache.name: cache.stats() for cache in _registry}
@@ -1,16 +1,18 @@
 # app/datacuti/api.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, timedelta
 import json
 
-from app.core.database import get_db
+from app.core.database import get_db, read_session_factory
 from app.datacuti import schemas, crud, models
 from app.autentikasi.security import verify_firebase_token
 from app.users.crud import get_user_by_uid
 from app.users import models as user_models
+from app.utils.pagination import InvalidCursorError, invalid_cursor_exception, set_next_cursor
+from app.utils.export import ExportFormat, stream_export
 
 router = APIRouter()
 
@@ -194,20 +196,37 @@ def create_new_cuti(
 
 @router.get("/", response_model=List[schemas.CutiInDB])
 def read_all_cuti(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[schemas.CutiStatus] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user_token: dict = Depends(verify_firebase_token)
 ):
     try:
-        all_cuti = crud.get_all_cuti(db, skip=skip, limit=limit, status=status_filter)
+        all_cuti = crud.get_all_cuti(db, skip=skip, limit=limit, status=status_filter, cursor=cursor)
         if not all_cuti:
             return []
+        set_next_cursor(response, all_cuti)
         return all_cuti
+    except InvalidCursorError as e:
+        raise invalid_cursor_exception(e)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Terjadi kesalahan saat mengambil data cuti.")
 
+@router.get("/export")
+def export_cuti_by_year(
+    request: Request,
+    tahun: int,
+    status_filter: Optional[schemas.CutiStatus] = None,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    current_user_token: dict = Depends(verify_firebase_token)
+):
+    """Ekspor pengajuan cuti satu tahun (berdasarkan tanggal mulai) sebagai NDJSON atau CSV yang di-stream."""
+    statement = crud.cuti_export_statement(tahun=tahun, status=status_filter)
+    return stream_export(read_session_factory(request), statement, export_format, f"cuti-{tahun}")
+
 @router.get("/{cuti_id}", response_model=schemas.CutiInDB)
 def read_cuti_by_id(
     cuti_id: int,
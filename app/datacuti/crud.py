@@ -1,23 +1,61 @@
 # app/datacuti/crud.py
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.datacuti import models, schemas
 from app.users import models as user_models
 from datetime import date, timedelta, datetime
 from dateutil.relativedelta import relativedelta
+from app.core.loaders import eager
+from app.utils.pagination import keyset_paginate
+from app.utils.date_range import in_range, year_date_range
+
+# Skema respons CutiInDB tidak menyertakan relasi, jadi tidak ada yang perlu dimuat
+def cuti_loaders():
+    return ()
 
 def get_cuti(db: Session, cuti_id: int):
-    return db.query(models.Cuti).filter(models.Cuti.id == cuti_id).first()
+    return db.query(models.Cuti).options(*eager(*cuti_loaders())).filter(models.Cuti.id == cuti_id).first()
 
 def get_cuti_by_user_uid(db: Session, user_uid: str, skip: int = 0, limit: int = 100):
-    return db.query(models.Cuti).filter(models.Cuti.user_uid == user_uid).offset(skip).limit(limit).all()
+    return db.query(models.Cuti).options(*eager(*cuti_loaders())).filter(models.Cuti.user_uid == user_uid).offset(skip).limit(limit).all()
 
-def get_all_cuti(db: Session, skip: int = 0, limit: int = 100, status: str = None):
-    query = db.query(models.Cuti)
+def get_all_cuti(db: Session, skip: int = 0, limit: int = 100, status: str = None, cursor: str = None):
+    query = db.query(models.Cuti).options(*eager(*cuti_loaders()))
     if status:
         query = query.filter(models.Cuti.status == status)
+    if cursor is not None:
+        return keyset_paginate(query, "cuti", [models.Cuti.id], cursor, limit, descending=True)
     return query.offset(skip).limit(limit).all()
 
+def cuti_export_statement(tahun: int, status: str = None):
+    """SELECT kolom datar untuk ekspor cuti per tahun tanggal mulai (lihat app.utils.export)."""
+    statement = (
+        select(
+            models.Cuti.id,
+            models.Cuti.user_uid,
+            user_models.User.fullname,
+            user_models.User.jabatan,
+            models.Cuti.tanggal_mulai,
+            models.Cuti.tanggal_akhir,
+            models.Cuti.masa_cuti,
+            models.Cuti.masa_cuti_tambahan,
+            models.Cuti.jenis_cuti,
+            models.Cuti.status,
+            models.Cuti.keterangan,
+            models.Cuti.potongan_gaji_opsi,
+            models.Cuti.detail_mix_cuti,
+            models.Cuti.tanggal,
+            models.Cuti.by,
+        )
+        .join(user_models.User, models.Cuti.user_uid == user_models.User.uid)
+        .where(in_range(models.Cuti.tanggal_mulai, year_date_range(tahun)))
+        .order_by(models.Cuti.tanggal_mulai, models.Cuti.id)
+    )
+    if status:
+        statement = statement.where(models.Cuti.status == status)
+    return statement
+
 def calculate_masa_kerja_years(join_date: date) -> int:
     today = date.today()
     return relativedelta(today, join_date).years
@@ -1,19 +1,27 @@
 # backend/app/dataizin/api.py
 
+import asyncio
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.dataizin.schemas import Izin as IzinSchema, IzinCreate
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_async_db, get_async_read_db, read_session_factory
+from app.dataizin.schemas import Izin as IzinSchema, IzinCreate, IzinDailyStats, IzinDurationStats, IzinInDB
 from app.dataizin import crud as crud_izin
+from app.dataizin import archive as izin_archive
+from app.dataizin.live import format_sse, izin_event_broker, load_snapshot
+from app.core.config import settings
 from app.utils.ip_utils import get_request_ip
+from app.utils.pagination import InvalidCursorError, invalid_cursor_exception, set_next_cursor
+from app.utils.sideload import IncludeMode, normalized_response
+from app.utils.export import ExportFormat, stream_export
+from app.utils.date_range import wib_today
 from app.users import crud as crud_user
 from app.izin_rules import crud as crud_izin_rules
-from datetime import datetime
+from app.outbox.schemas import NotificationCreate
+from datetime import date, datetime, timedelta
 import pytz
-import threading
-from app.services.tasks import send_izin_notification_async
 
 router = APIRouter()
 
@@ -34,28 +42,43 @@ HARI_INDONESIA = {
 }
 
 @router.get("/", response_model=List[IzinSchema])
-def read_izins(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    izins = crud_izin.get_izins(db, skip=skip, limit=limit)
+async def read_izins(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include: Optional[IncludeMode] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    try:
+        izins = await db.run_sync(crud_izin.get_izins, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise invalid_cursor_exception(e)
+    if include == "normalized":
+        response = normalized_response(izins, IzinInDB, user_paths=("user",))
+        set_next_cursor(response, izins)
+        return response
+    set_next_cursor(response, izins)
     return izins
 
 @router.get("/users/{user_uid}", response_model=List[IzinSchema])
-def get_izins_by_user(user_uid: str, db: Session = Depends(get_db)):
-    izins = crud_izin.get_izins_by_user(db, user_uid=user_uid)
+async def get_izins_by_user(user_uid: str, db: AsyncSession = Depends(get_async_read_db)):
+    izins = await db.run_sync(crud_izin.get_izins_by_user, user_uid=user_uid)
     return izins
 
 @router.post("/keluar", response_model=IzinSchema)
-def izin_keluar(
+async def izin_keluar(
     izin: IzinCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     ip_address = get_request_ip(request)
 
-    user_data = crud_user.get_user_by_uid(db, user_uid=izin.user_uid)
+    user_data = await db.run_sync(crud_user.get_user_by_uid, user_uid=izin.user_uid)
     if not user_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User tidak ditemukan.")
 
-    active_rule = crud_izin_rules.get_active_izin_rule(db)
+    active_rule = await db.run_sync(crud_izin_rules.get_active_izin_rule)
     if not active_rule:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,122 +97,238 @@ def izin_keluar(
             daily_izin_limit = active_rule.max_daily_double_shift
             detail_message_limit = active_rule.max_daily_double_shift
 
+    # Satu query agregat untuk semua batas: harian, serentak, dan per jabatan
+    admission_counts = await db.run_sync(crud_izin.get_izin_admission_counts, user_uid=izin.user_uid)
+
     if daily_izin_limit is not None and daily_izin_limit >= 0:
-        today_izin_count = crud_izin.get_izin_count_for_user_today(db, user_uid=izin.user_uid)
-        if today_izin_count >= daily_izin_limit:
+        if admission_counts.today_count >= daily_izin_limit:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Anda sudah mencapai batas ({detail_message_limit}x) izin keluar untuk hari ini."
             )
 
     if active_rule.max_concurrent_izin is not None and active_rule.max_concurrent_izin >= 0:
-        current_pending_izins = crud_izin.get_pending_izins(db)
-        if len(current_pending_izins) >= active_rule.max_concurrent_izin:
+        if admission_counts.total_pending >= active_rule.max_concurrent_izin:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Batas jumlah izin yang sedang berjalan ({active_rule.max_concurrent_izin} izin) sudah tercapai. Silakan tunggu hingga ada yang kembali."
             )
             
     jabatan = user_data.jabatan.lower() if user_data.jabatan else None
+    jabatan_limits = {
+        "operator": active_rule.max_izin_operator,
+        "kapten": active_rule.max_izin_kapten,
+        "kasir": active_rule.max_izin_kasir,
+        "kasir lokal": active_rule.max_izin_kasir_lokal
+    }
+    jabatan_limit = jabatan_limits.get(jabatan) if jabatan else None
+    if jabatan_limit is not None and jabatan_limit < 0:
+        jabatan_limit = None
+
+    if jabatan_limit is not None:
+        pending_izins_by_jabatan = admission_counts.pending_by_jabatan.get(jabatan, 0)
+        if pending_izins_by_jabatan >= jabatan_limit:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Batas izin untuk jabatan '{jabatan.title()}' ({jabatan_limit} izin) sudah tercapai. Silakan tunggu hingga ada yang kembali."
+            )
+
+    # Pemeriksaan di atas hanya penolakan cepat; pemesanan slot atomik di bawah
+    # yang menjamin batas tetap benar saat banyak request datang bersamaan.
+    concurrent_limit = active_rule.max_concurrent_izin
+    if concurrent_limit is not None and concurrent_limit < 0:
+        concurrent_limit = None
+    slot_limits = {crud_izin.GLOBAL_SLOT_SCOPE: concurrent_limit}
     if jabatan:
-        pending_izins_by_jabatan = [i for i in crud_izin.get_pending_izins(db) if i.user.jabatan and i.user.jabatan.lower() == jabatan]
-        
-        jabatan_limits = {
-            "operator": active_rule.max_izin_operator,
-            "kapten": active_rule.max_izin_kapten,
-            "kasir": active_rule.max_izin_kasir,
-            "kasir lokal": active_rule.max_izin_kasir_lokal
-        }
-        
-        if jabatan in jabatan_limits and jabatan_limits[jabatan] is not None and jabatan_limits[jabatan] >= 0:
-            if len(pending_izins_by_jabatan) >= jabatan_limits[jabatan]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Batas izin untuk jabatan '{jabatan.title()}' ({jabatan_limits[jabatan]} izin) sudah tercapai. Silakan tunggu hingga ada yang kembali."
-                )
-
-    db_izin = crud_izin.create_izin_keluar(db=db, izin=izin, ip_keluar=ip_address)
-
-    thread_db = get_db().__next__()
-    notification_thread = threading.Thread(
-        target=send_izin_notification_async,
-        args=(
-            thread_db,
-            izin.user_uid,
-            user_data.fullname,
-            "Ada Permintaan Izin Baru",
-            f"Pengguna {user_data.fullname} telah mengajukan izin keluar.",
-            "/"
-        )
+        slot_limits[crud_izin.jabatan_slot_scope(jabatan)] = jabatan_limit
+
+    notification = NotificationCreate(
+        event="izin_keluar",
+        sender_uid=izin.user_uid,
+        title="Ada Permintaan Izin Baru",
+        body=f"Pengguna {user_data.fullname} telah mengajukan izin keluar.",
+        click_action_url="/",
     )
-    notification_thread.start()
+    try:
+        db_izin = await db.run_sync(
+            crud_izin.create_izin_keluar,
+            izin=izin,
+            ip_keluar=ip_address,
+            notification=notification,
+            slot_limits=slot_limits
+        )
+    except crud_izin.IzinSlotUnavailableError as e:
+        if e.scope == crud_izin.GLOBAL_SLOT_SCOPE:
+            detail = f"Batas jumlah izin yang sedang berjalan ({e.limit} izin) sudah tercapai. Silakan tunggu hingga ada yang kembali."
+        else:
+            detail = f"Batas izin untuk jabatan '{jabatan.title()}' ({e.limit} izin) sudah tercapai. Silakan tunggu hingga ada yang kembali."
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
 
     return db_izin
 
 @router.put("/kembali/{no}", response_model=IzinSchema)
-def izin_kembali(
+async def izin_kembali(
     no: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     ip_address = get_request_ip(request)
 
-    db_izin = crud_izin.get_izin(db, no=no)
+    # Kunci baris izin agar dua request kembali yang bersamaan tidak melepas slot dua kali
+    db_izin = await db.run_sync(crud_izin.get_izin, no=no, for_update=True)
     if db_izin is None:
         raise HTTPException(status_code=404, detail="Izin not found")
 
     if db_izin.status != "Pending":
         raise HTTPException(status_code=400, detail="Silahkan melakukan izin keluar terlebih dahulu.")
 
-    active_rule = crud_izin_rules.get_active_izin_rule(db)
+    active_rule = await db.run_sync(crud_izin_rules.get_active_izin_rule)
     if active_rule is None:
         raise HTTPException(status_code=404, detail="Aturan izin belum diatur.")
         
-    db_izin_updated = crud_izin.update_izin_kembali(db=db, izin=db_izin, ip_kembali=ip_address, max_duration_seconds=active_rule.max_duration_seconds)
-
-    thread_db = get_db().__next__()
-    notification_thread = threading.Thread(
-        target=send_izin_notification_async,
-        args=(
-            thread_db,
-            db_izin_updated.user_uid,
-            db_izin_updated.user.fullname,
-            "Pemberitahuan Izin Kembali",
-            f"Pengguna {db_izin_updated.user.fullname} telah kembali.",
-            "/"
-        )
+    notification = NotificationCreate(
+        event="izin_kembali",
+        sender_uid=db_izin.user_uid,
+        title="Pemberitahuan Izin Kembali",
+        body=f"Pengguna {db_izin.user.fullname} telah kembali.",
+        click_action_url="/",
+    )
+    db_izin_updated = await db.run_sync(
+        crud_izin.update_izin_kembali,
+        izin=db_izin,
+        ip_kembali=ip_address,
+        max_duration_seconds=active_rule.max_duration_seconds,
+        notification=notification
     )
-    notification_thread.start()
 
     return db_izin_updated
 
 @router.get("/pending", response_model=List[IzinSchema])
-def get_pending_izins(db: Session = Depends(get_db)):
-    pending_izins = crud_izin.get_pending_izins(db)
-    return pending_izins
+async def get_pending_izins():
+    """
+    Izin yang masih Pending. Request serentak digabung menjadi satu query dan hasilnya
+    di-cache beberapa detik (RESPONSE_CACHE_TTL_SECONDS); izin keluar/kembali mengosongkan cache.
+    """
+    return await crud_izin.pending_izins_cache.respond(List[IzinSchema], crud_izin.get_pending_izins)
 
 @router.get("/users/{user_uid}/today", response_model=List[IzinSchema])
-def get_izins_by_user_today(user_uid: str, db: Session = Depends(get_db)):
-    izins = crud_izin.get_izins_by_user_today(db, user_uid=user_uid)
+async def get_izins_by_user_today(user_uid: str, db: AsyncSession = Depends(get_async_db)):
+    izins = await db.run_sync(crud_izin.get_izins_by_user_today, user_uid=user_uid)
     if not izins:
         return []
     return izins
 
 @router.get("/by_year_and_date", response_model=List[IzinSchema])
-def get_izins_by_year_and_date(
-    db: Session = Depends(get_db),
+async def get_izins_by_year_and_date(
+    db: AsyncSession = Depends(get_async_read_db),
     year: int = None,
-    tanggal: str = None
+    tanggal: str = None,
+    include: Optional[IncludeMode] = None,
 ):
     if not year:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Parameter 'year' harus disediakan."
         )
-    izins = crud_izin.get_izins_by_year_and_date(db, year=year, tanggal=tanggal)
+    izins = await db.run_sync(crud_izin.get_izins_by_year_and_date, year=year, tanggal=tanggal)
+    if include == "normalized":
+        # User yang sama muncul di ratusan izin setahun; mode ini mengirim setiap user sekali
+        return normalized_response(izins, IzinInDB, user_paths=("user",))
     return izins
 
+@router.get("/stats/durasi", response_model=List[IzinDurationStats])
+async def get_izin_duration_stats(
+    year: int,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    user_uid: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Rekap durasi izin (total, rata-rata, p95 dalam detik) per user per bulan, dihitung di database.
+    """
+    return await db.run_sync(crud_izin.get_izin_duration_stats, year=year, month=month, user_uid=user_uid)
+
+@router.get("/stats/harian", response_model=List[IzinDailyStats])
+async def get_izin_daily_stats(
+    tanggal: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Rekap izin semua user untuk satu tanggal WIB (default hari ini) dari tabel izin_daily_stats.
+    """
+    return await db.run_sync(crud_izin.get_izin_daily_stats, day_wib=tanggal or wib_today())
+
+@router.get("/stats/harian/users/{user_uid}", response_model=List[IzinDailyStats])
+async def get_izin_daily_stats_for_user(
+    user_uid: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Rekap harian satu user untuk tanggal WIB [start, end]. Default: 30 hari terakhir.
+    """
+    end = end or wib_today()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Parameter 'start' harus sebelum 'end'.")
+    return await db.run_sync(
+        crud_izin.get_izin_daily_stats_for_user, user_uid=user_uid, start_day=start, end_day=end + timedelta(days=1)
+    )
+
+@router.get("/export")
+def export_izins_by_year_and_date(
+    request: Request,
+    year: int,
+    tanggal: str = None,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+):
+    """
+    Ekspor izin satu tahun (opsional satu tanggal) sebagai NDJSON atau CSV yang di-stream.
+    Baris dibaca lewat server-side cursor sehingga memori tetap datar berapa pun jumlahnya.
+    """
+    session_factory = read_session_factory(request)
+    with session_factory() as db:
+        models = izin_archive.izin_models_for_year(db, year)
+    statement = crud_izin.izin_export_statement(year=year, tanggal=tanggal, models=models)
+    filename = f"izin-{year}-{tanggal}" if tanggal else f"izin-{year}"
+    return stream_export(session_factory, statement, export_format, filename)
+
+@router.get("/stream")
+async def stream_izin_board(request: Request):
+    """
+    Papan izin live (Server-Sent Events): event `snapshot` berisi izin Pending dan lewat waktu hari ini,
+    lalu event `izin_keluar`, `izin_kembali`, dan `izin_overdue` setiap ada perubahan.
+    Event `resync` berarti klien harus menyambung ulang untuk mengambil snapshot baru.
+    """
+    # Berlangganan sebelum snapshot diambil agar tidak ada perubahan yang terlewat di antaranya
+    queue = izin_event_broker.subscribe()
+
+    async def events():
+        try:
+            yield format_sse("snapshot", await load_snapshot())
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.LIVE_EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Komentar SSE menjaga koneksi tetap hidup melewati proxy
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            izin_event_broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/overdue", response_model=List[IzinSchema])
-def get_overdue_izins(db: Session = Depends(get_db)):
-    overdue_izins = crud_izin.get_overdue_izins(db)
-    return overdue_izins
\ No newline at end of file
+async def get_overdue_izins():
+    """Izin lewat waktu hari ini, dengan cache mikro dan penggabungan request seperti /pending."""
+    return await crud_izin.overdue_izins_cache.respond(List[IzinSchema], crud_izin.get_overdue_izins)
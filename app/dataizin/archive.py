@@ -0,0 +1,165 @@
+# backend/app/dataizin/archive.py
+#
+# Penyimpanan izin per tahun di atas Izin.create_dynamic_table_model.
+# Tabel `dataIzin` hanya menyimpan tahun berjalan; tahun yang sudah lewat dipindahkan ke
+# tabel arsip `dataIzin_<tahun>` oleh job arsip, sehingga query "hari ini" hanya menyentuh tabel kecil.
+# Izin yang dirujuk dataTelat tetap di `dataIzin` (foreign key dataTelat.izin_no), jadi bacaan satu tahun
+# lama menggabungkan tabel arsip dengan sisa baris tahun itu di `dataIzin`.
+#
+# Jalankan job arsip (mis. lewat cron setiap awal tahun):
+#   python -m app.dataizin.archive              # semua tahun sebelum tahun berjalan
+#   python -m app.dataizin.archive --year 2024
+
+import logging
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import delete, exists, func, inspect, insert, select
+from sqlalchemy.orm import Session
+
+from app.dataizin.models import Izin as IzinModel
+from app.datatelat.models import DataTelat
+from app.utils.date_range import WIB_TIMEZONE, in_range, wib_year_range_utc
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_TABLE_PREFIX = "dataIzin_"
+_ARCHIVE_TABLE_PATTERN = re.compile(rf"^{ARCHIVE_TABLE_PREFIX}(\d{{4}})$")
+
+# Jumlah baris yang dipindahkan per transaksi
+ARCHIVE_BATCH_SIZE = 5000
+
+_archive_models: Dict[int, type] = {}
+_archive_models_lock = threading.Lock()
+# Hanya hasil positif yang di-cache: tabel arsip tidak pernah dihapus, tetapi bisa muncul kapan saja
+_known_archived_years = set()
+
+def archive_table_name(year: int) -> str:
+    return f"{ARCHIVE_TABLE_PREFIX}{year}"
+
+def izin_archive_model(year: int):
+    """Model ORM untuk tabel arsip satu tahun. Dibuat sekali per proses."""
+    with _archive_models_lock:
+        model = _archive_models.get(year)
+        if model is None:
+            model = IzinModel.create_dynamic_table_model(archive_table_name(year))
+            _archive_models[year] = model
+        return model
+
+def current_year() -> int:
+    return datetime.now(WIB_TIMEZONE).year
+
+def is_year_archived(db: Session, year: int) -> bool:
+    # Tahun berjalan tidak pernah diarsipkan, jadi query hari ini tidak butuh pemeriksaan katalog
+    if year >= current_year():
+        return False
+    if year in _known_archived_years:
+        return True
+    if inspect(db.connection()).has_table(archive_table_name(year)):
+        _known_archived_years.add(year)
+        return True
+    return False
+
+def archived_years(db: Session) -> List[int]:
+    years = sorted(
+        int(match.group(1))
+        for match in map(_ARCHIVE_TABLE_PATTERN.match, inspect(db.connection()).get_table_names())
+        if match
+    )
+    _known_archived_years.update(years)
+    return years
+
+def izin_models_for_year(db: Session, year: int) -> list:
+    """Model yang harus dibaca untuk satu tahun: arsip tahun itu (jika ada) lalu `dataIzin`."""
+    if is_year_archived(db, year):
+        return [izin_archive_model(year), IzinModel]
+    return [IzinModel]
+
+def izin_models_all(db: Session) -> list:
+    """Semua tabel izin, dari arsip tertua hingga `dataIzin`."""
+    return [izin_archive_model(year) for year in archived_years(db)] + [IzinModel]
+
+def _archivable_condition(year: int):
+    is_referenced_by_telat = exists().where(DataTelat.izin_no == IzinModel.no)
+    return (
+        in_range(IzinModel.tanggal, wib_year_range_utc(year)),
+        IzinModel.status != "Pending",
+        ~is_referenced_by_telat,
+    )
+
+def archive_izin_year(db: Session, year: int, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Memindahkan izin satu tahun yang sudah lewat ke tabel arsipnya.
+    Setiap batch adalah satu statement `WITH moved AS (DELETE ... RETURNING *) INSERT ...`,
+    sehingga pembaca selalu melihat baris di salah satu tabel, tidak pernah di keduanya atau hilang.
+    """
+    if year >= current_year():
+        raise ValueError(f"Tahun {year} belum selesai dan tidak dapat diarsipkan.")
+
+    archive_table = izin_archive_model(year).__table__
+    archive_table.create(bind=db.connection(), checkfirst=True)
+    db.commit()
+    _known_archived_years.add(year)
+
+    columns = [column.name for column in IzinModel.__table__.columns]
+    total = 0
+    while True:
+        batch = (
+            select(IzinModel.no)
+            .where(*_archivable_condition(year))
+            .order_by(IzinModel.no)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        moved = (
+            delete(IzinModel)
+            .where(IzinModel.no.in_(batch))
+            .returning(*IzinModel.__table__.columns)
+            .cte("moved")
+        )
+        statement = (
+            insert(archive_table)
+            .from_select(columns, select(*(moved.c[name] for name in columns)))
+            .add_cte(moved)
+        )
+        moved_count = db.execute(statement).rowcount
+        db.commit()
+        if not moved_count:
+            break
+        total += moved_count
+        logger.info(f"Arsip izin {year}: {total} baris dipindahkan ke {archive_table.name}")
+    return total
+
+def archive_closed_years(db: Session) -> Dict[int, int]:
+    """Mengarsipkan semua tahun sebelum tahun berjalan yang masih memiliki baris di `dataIzin`."""
+    oldest = db.query(func.min(IzinModel.tanggal)).scalar()
+    if oldest is None:
+        return {}
+    first_year = oldest.astimezone(WIB_TIMEZONE).year if oldest.tzinfo else oldest.year
+    return {year: archive_izin_year(db, year) for year in range(first_year, current_year())}
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.core.database import SessionLocal
+    # Pastikan semua model terdaftar agar relasi SQLAlchemy dapat dikonfigurasi
+    from app.core.models import import_all as import_all_models
+    import_all_models()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--year", type=int, help="Tahun yang diarsipkan (default: semua tahun yang sudah lewat)")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.year:
+            result = {args.year: archive_izin_year(db, args.year, batch_size=args.batch_size)}
+        else:
+            result = archive_closed_years(db)
+        print(f"Izin diarsipkan: {result}")
+    finally:
+        db.close()
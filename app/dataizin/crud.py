@@ -1,20 +1,60 @@
 # backend/app/dataizin/crud.py
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc, and_
-from app.dataizin.models import Izin as IzinModel
+from sqlalchemy.orm import Session
+from sqlalchemy import func, desc, and_, update, select, union_all, delete, text, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.dataizin.models import Izin as IzinModel, IzinSlot as IzinSlotModel, IzinDailyStats as IzinDailyStatsModel
 from app.users.models import User as UserModel
 from app.dataizin.schemas import IzinCreate
 from datetime import datetime, timedelta, date
 from app.core.config import settings
+from app.core.loaders import eager, user_loader
+from app.utils.date_range import (
+    in_range, wib_date, wib_day_range_utc, wib_days_range_utc, wib_month_label, wib_month_range_utc,
+    wib_today, wib_today_range_utc, wib_year_range_utc,
+)
+from app.utils.pagination import CursorPage, keyset_paginate
+from app.dataizin.archive import izin_models_all, izin_models_for_year
 from app.datatelat.crud import create_data_telat
+from app.outbox import crud as outbox_crud
+from app.outbox.schemas import NotificationCreate
+from app.core.response_cache import ResponseCache
+import json
 import pytz
 import logging
-from typing import List
+from typing import List, Optional, Dict, NamedTuple, Tuple
 
 WIB_TIMEZONE = pytz.timezone('Asia/Jakarta')
 UTC_TIMEZONE = pytz.timezone('UTC')
 
+# Relasi yang dibutuhkan skema respons Izin (user beserta role)
+def izin_loaders():
+    return (user_loader(IzinModel.user),)
+
+GLOBAL_SLOT_SCOPE = "global"
+
+class IzinSlotUnavailableError(ValueError):
+    """Dilempar saat slot izin untuk suatu cakupan sudah penuh."""
+
+    def __init__(self, scope: str, limit: int):
+        self.scope = scope
+        self.limit = limit
+        super().__init__(f"Slot izin untuk '{scope}' sudah penuh ({limit}).")
+
+def jabatan_slot_scope(jabatan: Optional[str]) -> Optional[str]:
+    return f"jabatan:{jabatan.lower()}" if jabatan else None
+
+SLOT_SCOPE_SEPARATOR = ","
+
+def izin_slot_scopes(slot_scopes: Optional[str], jabatan: Optional[str]) -> List[str]:
+    """
+    Cakupan slot yang dipegang sebuah izin Pending: yang tersimpan saat keluar,
+    atau global + jabatan saat ini untuk izin lama yang belum menyimpannya.
+    """
+    if slot_scopes is not None:
+        return [scope for scope in slot_scopes.split(SLOT_SCOPE_SEPARATOR) if scope]
+    return [scope for scope in (GLOBAL_SLOT_SCOPE, jabatan_slot_scope(jabatan)) if scope]
+
 def convert_to_wib(izin: IzinModel):
     if izin.tanggal:
         izin.tanggal = izin.tanggal.astimezone(WIB_TIMEZONE)
@@ -29,50 +69,317 @@ def convert_to_wib(izin: IzinModel):
     
     return izin
 
-def get_izin_count_for_user_today(db: Session, user_uid: str):
-    now_wib = datetime.now(WIB_TIMEZONE)
-    start_of_today_wib = now_wib.replace(hour=0, minute=0, second=0, microsecond=0)
-    end_of_today_wib = now_wib.replace(hour=23, minute=59, second=59, microsecond=999999)
+def _izin_count_today(user_uid: str):
+    # Satu baris rekap harian (primary key), bukan COUNT(*) atas dataIzin
+    return select(IzinDailyStatsModel.count).where(
+        IzinDailyStatsModel.user_uid == user_uid,
+        IzinDailyStatsModel.day_wib == wib_today(),
+    ).scalar_subquery()
+
+def get_izin_count_for_user_today(db: Session, user_uid: str) -> int:
+    return db.execute(select(func.coalesce(_izin_count_today(user_uid), 0))).scalar()
+
+class IzinAdmissionCounts(NamedTuple):
+    total_pending: int
+    pending_by_jabatan: Dict[Optional[str], int]
+    today_count: int
+
+def get_izin_admission_counts(db: Session, user_uid: str) -> IzinAdmissionCounts:
+    """
+    Menghitung total izin Pending, izin Pending per jabatan (lowercase), dan jumlah izin `user_uid`
+    hari ini (WIB, dari izin_daily_stats) dalam satu query yang hanya memindai baris Pending.
+    """
+    jabatan_key = func.lower(UserModel.jabatan)
+
+    pending = select(
+        jabatan_key.label("jabatan"),
+        func.count().label("pending"),
+    ).select_from(IzinModel).join(
+        UserModel, IzinModel.user_uid == UserModel.uid
+    ).where(
+        IzinModel.status == "Pending"
+    ).group_by(jabatan_key).subquery()
+    # Satu baris jumlah hari ini, di-LEFT JOIN agar tetap terbaca saat tidak ada izin Pending
+    today = select(func.coalesce(_izin_count_today(user_uid), 0).label("today_count")).subquery()
 
-    start_of_today_utc = start_of_today_wib.astimezone(pytz.utc)
-    end_of_today_utc = end_of_today_wib.astimezone(pytz.utc)
+    rows = db.execute(
+        select(today.c.today_count, pending.c.jabatan, pending.c.pending)
+        .select_from(today.outerjoin(pending, true()))
+    ).all()
 
-    return db.query(IzinModel).filter(
-        IzinModel.user_uid == user_uid,
-        IzinModel.tanggal >= start_of_today_utc,
-        IzinModel.tanggal <= end_of_today_utc
-    ).count()
+    pending_by_jabatan = {row.jabatan: row.pending for row in rows if row.pending}
+    return IzinAdmissionCounts(
+        total_pending=sum(row.pending or 0 for row in rows),
+        pending_by_jabatan=pending_by_jabatan,
+        today_count=rows[0].today_count,
+    )
+
+# Cache respons /pending dan /overdue; dikosongkan setiap izin keluar atau kembali
+pending_izins_cache = ResponseCache("izin_pending")
+overdue_izins_cache = ResponseCache("izin_overdue")
+
+def invalidate_izin_caches():
+    pending_izins_cache.invalidate()
+    overdue_izins_cache.invalidate()
+
+# Kanal LISTEN/NOTIFY untuk papan izin live (app.dataizin.live)
+IZIN_EVENTS_CHANNEL = "izin_events"
+
+def notify_izin_event(db: Session, event: str, izin_no: int):
+    """
+    pg_notify dalam transaksi pemanggil: Postgres hanya mengirimkannya saat commit
+    (dan membuangnya saat rollback). Payload hanya event dan nomor izin.
+    """
+    payload = json.dumps({"event": event, "no": izin_no})
+    db.execute(select(func.pg_notify(IZIN_EVENTS_CHANNEL, payload)))
+
+def add_izin_daily_stats(
+    db: Session,
+    user_uid: str,
+    day_wib: date,
+    count: int = 0,
+    total_seconds: int = 0,
+    overdue_count: int = 0,
+):
+    """Menambahkan nilai ke rekap harian dengan UPSERT (tanpa commit, ikut transaksi pemanggil)."""
+    insert_stmt = pg_insert(IzinDailyStatsModel).values(
+        user_uid=user_uid,
+        day_wib=day_wib,
+        count=count,
+        total_seconds=total_seconds,
+        overdue_count=overdue_count,
+    )
+    db.execute(insert_stmt.on_conflict_do_update(
+        index_elements=["user_uid", "day_wib"],
+        set_={
+            "count": IzinDailyStatsModel.count + insert_stmt.excluded.count,
+            "total_seconds": IzinDailyStatsModel.total_seconds + insert_stmt.excluded.total_seconds,
+            "overdue_count": IzinDailyStatsModel.overdue_count + insert_stmt.excluded.overdue_count,
+            "modifiedOn": func.now(),
+        }
+    ))
+
+def rebuild_izin_daily_stats(db: Session, start_day: date, end_day: date) -> int:
+    """
+    Menghitung ulang rekap harian untuk tanggal WIB [start_day, end_day) dari data izin
+    (termasuk tabel arsip), lalu commit. Mengembalikan jumlah baris rekap yang ditulis.
+    Dijalankan oleh job backfill (python -m app.core.backfill), bukan saat startup worker.
+    """
+    # Menahan UPSERT izin keluar/kembali sampai rebuild selesai: tanpa ini, kenaikan yang di-commit
+    # setelah agregasi membaca dataIzin tertimpa nilai hasil hitung ulang. Izin yang sudah menulis rekap
+    # lebih dulu membuat LOCK menunggu commit-nya, sehingga ikut terhitung di agregasi.
+    db.execute(text(f'LOCK TABLE "{IzinDailyStatsModel.__tablename__}" IN SHARE ROW EXCLUSIVE MODE'))
+
+    models = {}
+    for year in range(start_day.year, (end_day - timedelta(days=1)).year + 1):
+        for model in izin_models_for_year(db, year):
+            models[model.__tablename__] = model
+
+    bounds = wib_days_range_utc(start_day, end_day)
+    selects = [
+        select(model.user_uid, model.tanggal, model.duration_seconds, model.status).where(in_range(model.tanggal, bounds))
+        for model in models.values()
+    ]
+    source = (selects[0] if len(selects) == 1 else union_all(*selects)).subquery("izin_harian")
+    day_wib = wib_date(source.c.tanggal)
+    aggregated = select(
+        source.c.user_uid,
+        day_wib,
+        func.count(),
+        func.coalesce(func.sum(source.c.duration_seconds), 0),
+        func.count().filter(source.c.status == "Lewat Waktu"),
+    ).group_by(source.c.user_uid, day_wib)
+
+    db.execute(delete(IzinDailyStatsModel).where(in_range(IzinDailyStatsModel.day_wib, (start_day, end_day))))
+    insert_stmt = pg_insert(IzinDailyStatsModel).from_select(
+        ["user_uid", "day_wib", "count", "total_seconds", "overdue_count"], aggregated
+    )
+    result = db.execute(insert_stmt.on_conflict_do_update(
+        index_elements=["user_uid", "day_wib"],
+        set_={
+            "count": insert_stmt.excluded.count,
+            "total_seconds": insert_stmt.excluded.total_seconds,
+            "overdue_count": insert_stmt.excluded.overdue_count,
+            "modifiedOn": func.now(),
+        }
+    ))
+    db.commit()
+    return result.rowcount
+
+def _izin_daily_stats_select():
+    return select(
+        IzinDailyStatsModel.user_uid,
+        UserModel.fullname,
+        IzinDailyStatsModel.day_wib,
+        IzinDailyStatsModel.count,
+        IzinDailyStatsModel.total_seconds,
+        IzinDailyStatsModel.overdue_count,
+    ).join(UserModel, UserModel.uid == IzinDailyStatsModel.user_uid)
+
+def get_izin_daily_stats(db: Session, day_wib: date) -> list:
+    """Rekap semua user untuk satu tanggal WIB."""
+    statement = (
+        _izin_daily_stats_select()
+        .where(IzinDailyStatsModel.day_wib == day_wib)
+        .order_by(desc(IzinDailyStatsModel.count), UserModel.fullname)
+    )
+    return db.execute(statement).mappings().all()
+
+def get_izin_daily_stats_for_user(db: Session, user_uid: str, start_day: date, end_day: date) -> list:
+    """Rekap harian satu user untuk tanggal WIB [start_day, end_day)."""
+    statement = (
+        _izin_daily_stats_select()
+        .where(
+            IzinDailyStatsModel.user_uid == user_uid,
+            in_range(IzinDailyStatsModel.day_wib, (start_day, end_day)),
+        )
+        .order_by(IzinDailyStatsModel.day_wib)
+    )
+    return db.execute(statement).mappings().all()
+
+def reserve_izin_slots(db: Session, slot_limits: Dict[str, Optional[int]]):
+    """
+    Memesan satu slot untuk setiap cakupan di `slot_limits` (tanpa commit).
+    Setiap slot dinaikkan dengan UPDATE bersyarat `used < limit`, sehingga hanya baris slot
+    yang dikunci (bukan seluruh tabel) dan request serentak tidak bisa melewati batas.
+    Limit None berarti tidak dibatasi, tetapi slot tetap dihitung.
+    """
+    scopes = sorted(slot_limits)
+    db.execute(
+        pg_insert(IzinSlotModel)
+        .values([{"scope": scope, "used": 0} for scope in scopes])
+        .on_conflict_do_nothing(index_elements=["scope"])
+    )
+
+    # Urutan cakupan selalu sama agar transaksi serentak tidak saling deadlock
+    for scope in scopes:
+        limit = slot_limits[scope]
+        stmt = update(IzinSlotModel).where(IzinSlotModel.scope == scope)
+        if limit is not None:
+            stmt = stmt.where(IzinSlotModel.used < limit)
+        result = db.execute(
+            stmt.values(used=IzinSlotModel.used + 1).returning(IzinSlotModel.used)
+        )
+        if result.first() is None:
+            raise IzinSlotUnavailableError(scope, limit)
+
+def release_izin_slots(db: Session, scopes: List[str]):
+    """Melepas slot yang dipesan saat izin keluar (tanpa commit)."""
+    db.execute(
+        update(IzinSlotModel)
+        .where(IzinSlotModel.scope.in_(sorted(scopes)))
+        .values(used=func.greatest(IzinSlotModel.used - 1, 0))
+    )
 
-def get_izin(db: Session, no: int):
-    izin = db.query(IzinModel).filter(IzinModel.no == no).first()
+# Kunci advisory agar hanya satu worker yang menyinkronkan slot pada saat yang sama
+IZIN_SLOT_RESYNC_LOCK = "izin_slots_resync"
+
+def resync_izin_slots(db: Session) -> Optional[Dict[str, int]]:
+    """
+    Menyamakan penghitung slot dengan jumlah izin Pending yang sebenarnya.
+    Mengembalikan None tanpa perubahan jika worker lain sedang menjalankannya.
+    """
+    acquired = db.execute(select(func.pg_try_advisory_xact_lock(func.hashtext(IZIN_SLOT_RESYNC_LOCK)))).scalar()
+    if not acquired:
+        db.rollback()
+        return None
+
+    # Seluruh tabel slot dikunci (bukan hanya baris yang ada): pemesanan yang sedang berjalan di-commit
+    # lebih dulu sehingga ikut terhitung, dan pemesanan baru (termasuk cakupan baru) menunggu sampai
+    # penghitung ditulis, sehingga tidak ada pemesanan yang tertimpa hasil hitungan.
+    db.execute(text(f'LOCK TABLE "{IzinSlotModel.__tablename__}" IN SHARE ROW EXCLUSIVE MODE'))
+    existing_scopes = [scope for (scope,) in db.query(IzinSlotModel.scope).all()]
+
+    # Dihitung dari cakupan yang benar-benar dipesan setiap izin, sama dengan yang dilepas saat kembali
+    rows = db.query(
+        IzinModel.slot_scopes,
+        func.lower(UserModel.jabatan).label("jabatan"),
+        func.count().label("pending"),
+    ).select_from(IzinModel).join(
+        UserModel, IzinModel.user_uid == UserModel.uid
+    ).filter(
+        IzinModel.status == "Pending"
+    ).group_by(IzinModel.slot_scopes, func.lower(UserModel.jabatan)).all()
+
+    desired = {scope: 0 for scope in existing_scopes}
+    desired[GLOBAL_SLOT_SCOPE] = 0
+    for row in rows:
+        for scope in izin_slot_scopes(row.slot_scopes, row.jabatan):
+            desired[scope] = desired.get(scope, 0) + row.pending
+
+    insert_stmt = pg_insert(IzinSlotModel).values(
+        [{"scope": scope, "used": used} for scope, used in sorted(desired.items())]
+    )
+    db.execute(insert_stmt.on_conflict_do_update(
+        index_elements=["scope"],
+        set_={"used": insert_stmt.excluded.used, "modifiedOn": func.now()}
+    ))
+    db.commit()
+    return desired
+
+def get_izin(db: Session, no: int, for_update: bool = False):
+    query = db.query(IzinModel).options(*eager(*izin_loaders())).filter(IzinModel.no == no)
+    if for_update:
+        # Hanya baris izin yang dikunci, bukan baris user hasil outer join
+        query = query.with_for_update(of=IzinModel)
+    izin = query.first()
     if izin:
         return convert_to_wib(izin)
     return None
 
-def get_izins(db: Session, skip: int = 0, limit: int = 100) -> List[IzinModel]:
-    izins = db.query(IzinModel).offset(skip).limit(limit).all()
+def get_izins(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[IzinModel]:
+    query = db.query(IzinModel).options(*eager(*izin_loaders()))
+    if cursor is not None:
+        # Mode cursor: terbaru lebih dulu, berdasarkan nomor izin
+        page = keyset_paginate(query, "izin", [IzinModel.no], cursor, limit, descending=True)
+        return CursorPage([convert_to_wib(izin) for izin in page], page.next_cursor)
+    izins = query.offset(skip).limit(limit).all()
     return [convert_to_wib(izin) for izin in izins]
 
 def get_izins_by_user(db: Session, user_uid: str) -> List[IzinModel]:
-    izins = db.query(IzinModel).options(joinedload(IzinModel.user)).filter(IzinModel.user_uid == user_uid).all()
+    # Riwayat lengkap: tabel arsip tahunan (indeks user_uid, tanggal) lalu dataIzin
+    izins = []
+    for model in izin_models_all(db):
+        izins.extend(db.query(model).options(*eager(user_loader(model.user))).filter(model.user_uid == user_uid).all())
     return [convert_to_wib(izin) for izin in izins]
 
-def create_izin_keluar(db: Session, izin: IzinCreate, ip_keluar: str):
+def create_izin_keluar(
+    db: Session,
+    izin: IzinCreate,
+    ip_keluar: str,
+    notification: Optional[NotificationCreate] = None,
+    slot_limits: Optional[Dict[str, Optional[int]]] = None
+):
     now_utc = datetime.now(UTC_TIMEZONE).replace(microsecond=0)
 
+    if slot_limits:
+        try:
+            reserve_izin_slots(db, slot_limits)
+        except IzinSlotUnavailableError:
+            db.rollback()
+            raise
+
     db_izin = IzinModel(
         user_uid=izin.user_uid,
         tanggal=now_utc,
         jamKeluar=now_utc,
         ipKeluar=ip_keluar,
-        status="Pending"
+        status="Pending",
+        slot_scopes=SLOT_SCOPE_SEPARATOR.join(sorted(slot_limits or ())),
     )
     db.add(db_izin)
+    add_izin_daily_stats(db, izin.user_uid, now_utc.astimezone(WIB_TIMEZONE).date(), count=1)
+    # Flush untuk mendapatkan nomor izin; outbox dan event live ikut tersimpan dalam transaksi yang sama
+    db.flush()
+    if notification:
+        outbox_crud.add_notification(db, notification, izin_no=db_izin.no)
+    notify_izin_event(db, "izin_keluar", db_izin.no)
     db.commit()
+    invalidate_izin_caches()
     db.refresh(db_izin)
     return convert_to_wib(db_izin)
 
-def update_izin_kembali(db: Session, izin: IzinModel, ip_kembali: str, max_duration_seconds: int):
+def update_izin_kembali(db: Session, izin: IzinModel, ip_kembali: str, max_duration_seconds: int, notification: Optional[NotificationCreate] = None):
     now_utc = datetime.now(UTC_TIMEZONE).replace(microsecond=0)
     
     if not izin.jamKeluar.tzinfo:
@@ -108,21 +415,38 @@ def update_izin_kembali(db: Session, izin: IzinModel, ip_kembali: str, max_durat
             db,
             izin_no=izin.no,
             user_uid=izin.user_uid,
-            lewat_waktu_seconds=lewat_waktu_seconds
+            lewat_waktu_seconds=lewat_waktu_seconds,
+            commit=False
         )
 
     izin.jamKembali = now_utc
     izin.ipKembali = ip_kembali
     izin.durasi = durasi_formatted
+    izin.duration_seconds = int(total_seconds)
     izin.status = status_izin
 
+    if notification:
+        outbox_crud.add_notification(db, notification, izin_no=izin.no)
+    notify_izin_event(db, "izin_kembali", izin.no)
+
+    release_izin_slots(db, izin_slot_scopes(izin.slot_scopes, izin.user.jabatan))
+    # Urutan kunci sama dengan izin keluar: slot lalu rekap harian (hari WIB saat izin dibuat)
+    add_izin_daily_stats(
+        db,
+        izin.user_uid,
+        izin.jamKeluar.astimezone(WIB_TIMEZONE).date(),
+        total_seconds=int(total_seconds),
+        overdue_count=1 if status_izin == "Lewat Waktu" else 0,
+    )
+
     db.commit()
+    invalidate_izin_caches()
     db.refresh(izin)
     return convert_to_wib(izin)
 
 def get_pending_izins(db: Session) -> List[IzinModel]:
     izins = db.query(IzinModel).options(
-        joinedload(IzinModel.user)
+        *eager(*izin_loaders())
     ).filter(
         IzinModel.status == "Pending"
     ).order_by(
@@ -140,7 +464,7 @@ def get_izins_by_user_today(db: Session, user_uid: str) -> List[IzinModel]:
     end_of_today_utc = end_of_today_wib.astimezone(UTC_TIMEZONE)
 
     izins = db.query(IzinModel).options(
-        joinedload(IzinModel.user)
+        *eager(*izin_loaders())
     ).filter(
         IzinModel.user_uid == user_uid,
         IzinModel.tanggal >= start_of_today_utc,
@@ -149,34 +473,159 @@ def get_izins_by_user_today(db: Session, user_uid: str) -> List[IzinModel]:
 
     return [convert_to_wib(izin) for izin in izins]
 
-def get_overdue_izins(db: Session) -> List[IzinModel]:
-    today_wib_date = datetime.now(WIB_TIMEZONE).date()
+IZIN_OVERDUE_EVENT = "izin_overdue"
 
+def get_pending_izin_departures(db: Session, since: Optional[datetime] = None) -> List[Tuple[int, datetime]]:
+    """
+    (no, jamKeluar) izin yang masih Pending, lewat indeks (status, tanggal).
+    Dengan `since`, hanya izin yang dibuat sejak waktu tersebut.
+    """
+    query = db.query(IzinModel.no, IzinModel.jamKeluar).filter(
+        IzinModel.status == "Pending",
+        IzinModel.jamKeluar.isnot(None),
+    )
+    if since is not None:
+        query = query.filter(IzinModel.tanggal >= since)
+    return [(row.no, row.jamKeluar) for row in query.all()]
+
+def record_izin_overdue(db: Session, izin_no: int, max_duration_seconds: int) -> bool:
+    """
+    Menulis notifikasi outbox 'izin_overdue' untuk izin yang masih Pending melewati batas durasi, lalu commit.
+    Advisory lock per izin dan pemeriksaan outbox membuat notifikasi hanya ditulis sekali,
+    walaupun beberapa dispatcher berjalan bersamaan atau dispatcher di-restart.
+    Mengembalikan True jika notifikasi baru ditulis.
+    """
+    try:
+        db.execute(select(func.pg_advisory_xact_lock(func.hashtext(IZIN_OVERDUE_EVENT), izin_no)))
+        izin = db.query(IzinModel).options(*eager(*izin_loaders())).filter(
+            IzinModel.no == izin_no,
+            IzinModel.status == "Pending",
+        ).first()
+        deadline = None
+        if izin and izin.jamKeluar:
+            jam_keluar = izin.jamKeluar if izin.jamKeluar.tzinfo else UTC_TIMEZONE.localize(izin.jamKeluar)
+            deadline = jam_keluar + timedelta(seconds=max_duration_seconds)
+        if (
+            deadline is None
+            or deadline > datetime.now(UTC_TIMEZONE)
+            or outbox_crud.has_notification(db, IZIN_OVERDUE_EVENT, izin_no)
+        ):
+            db.rollback()
+            return False
+
+        outbox_crud.add_notification(db, NotificationCreate(
+            event=IZIN_OVERDUE_EVENT,
+            sender_uid=izin.user_uid,
+            title="Izin Lewat Waktu",
+            body=f"{izin.user.fullname} belum kembali setelah {max_duration_seconds // 60} menit izin keluar.",
+            click_action_url="/",
+        ), izin_no=izin_no)
+        notify_izin_event(db, IZIN_OVERDUE_EVENT, izin_no)
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        raise
+
+def get_overdue_izins(db: Session) -> List[IzinModel]:
+    # Rentang UTC hari ini (WIB) agar indeks (status, tanggal) terpakai
     izins = db.query(IzinModel).filter(
         IzinModel.status == "Lewat Waktu",
-        func.date(func.timezone('Asia/Jakarta', IzinModel.tanggal)) == today_wib_date
-    ).options(joinedload(IzinModel.user)).all()
+        in_range(IzinModel.tanggal, wib_today_range_utc())
+    ).options(*eager(*izin_loaders())).all()
 
     return [convert_to_wib(izin) for izin in izins]
 
-def get_izins_by_year_and_date(db: Session, year: int, tanggal: str = None) -> List[IzinModel]:
-    query = db.query(IzinModel).options(joinedload(IzinModel.user))
-
-    conditions = [
-        func.extract('year', func.timezone('Asia/Jakarta', IzinModel.tanggal)) == year
-    ]
+def _year_and_date_conditions(year: int, tanggal: str = None, model=IzinModel) -> list:
+    """
+    Filter tahun (dan opsional tanggal) WIB sebagai rentang UTC setengah terbuka,
+    sehingga indeks pada kolom tanggal dapat dipakai (bukan extract/timezone per baris).
+    """
+    conditions = [in_range(model.tanggal, wib_year_range_utc(year))]
 
     if tanggal:
         try:
             filter_date = datetime.strptime(tanggal, '%Y-%m-%d').date()
-            conditions.append(
-                func.date(func.timezone('Asia/Jakarta', IzinModel.tanggal)) == filter_date
-            )
+            conditions.append(in_range(model.tanggal, wib_day_range_utc(filter_date)))
         except ValueError:
             pass
+    return conditions
 
-    query = query.filter(and_(*conditions))
-    query = query.order_by(desc(IzinModel.tanggal))
+def get_izins_by_year_and_date(db: Session, year: int, tanggal: str = None) -> List[IzinModel]:
+    # Tahun yang sudah diarsipkan dibaca dari tabel arsipnya ditambah sisa baris di dataIzin
+    models = izin_models_for_year(db, year)
+    izins = []
+    for model in models:
+        query = db.query(model).options(*eager(user_loader(model.user)))
+        query = query.filter(and_(*_year_and_date_conditions(year, tanggal, model)))
+        izins.extend(query.order_by(desc(model.tanggal)).all())
+    if len(models) > 1:
+        izins.sort(key=lambda izin: izin.tanggal, reverse=True)
 
-    izins = query.all()
-    return [convert_to_wib(izin) for izin in izins]
\ No newline at end of file
+    return [convert_to_wib(izin) for izin in izins]
+
+def izin_export_statement(year: int, tanggal: str = None, models: list = None):
+    """
+    SELECT kolom datar untuk ekspor izin per tahun (lihat app.utils.export); tanpa objek ORM.
+    `models` dari izin_models_for_year; lebih dari satu tabel digabung dengan UNION ALL.
+    """
+    models = models or [IzinModel]
+    selects = [
+        select(
+            model.no,
+            model.user_uid,
+            UserModel.fullname,
+            UserModel.jabatan,
+            model.tanggal,
+            model.jamKeluar,
+            model.ipKeluar,
+            model.jamKembali,
+            model.ipKembali,
+            model.durasi,
+            model.duration_seconds,
+            model.status,
+        )
+        .join(UserModel, UserModel.uid == model.user_uid)
+        .where(and_(*_year_and_date_conditions(year, tanggal, model)))
+        for model in models
+    ]
+    if len(selects) == 1:
+        # Tabel yang dipilih bisa berupa arsip dataIzin_<tahun>, bukan dataIzin
+        return selects[0].order_by(desc(models[0].tanggal))
+    return union_all(*selects).order_by(desc("tanggal"))
+
+def get_izin_duration_stats(
+    db: Session,
+    year: int,
+    month: Optional[int] = None,
+    user_uid: Optional[str] = None,
+) -> list:
+    """
+    Total, rata-rata, dan p95 durasi izin per user per bulan WIB, dihitung seluruhnya di SQL
+    dari kolom numerik duration_seconds (satu query, termasuk tabel arsip tahun tersebut).
+    """
+    bounds = wib_month_range_utc(year, month) if month else wib_year_range_utc(year)
+    selects = []
+    for model in izin_models_for_year(db, year):
+        conditions = [in_range(model.tanggal, bounds), model.duration_seconds.isnot(None)]
+        if user_uid:
+            conditions.append(model.user_uid == user_uid)
+        selects.append(select(model.user_uid, model.tanggal, model.duration_seconds).where(*conditions))
+    source = (selects[0] if len(selects) == 1 else union_all(*selects)).subquery("izin_durasi")
+
+    bulan = wib_month_label(source.c.tanggal)
+    statement = (
+        select(
+            source.c.user_uid,
+            UserModel.fullname,
+            bulan.label("bulan"),
+            func.count().label("jumlah"),
+            func.sum(source.c.duration_seconds).label("total_seconds"),
+            func.avg(source.c.duration_seconds).label("avg_seconds"),
+            func.percentile_cont(0.95).within_group(source.c.duration_seconds).label("p95_seconds"),
+        )
+        .join(UserModel, UserModel.uid == source.c.user_uid)
+        .group_by(source.c.user_uid, UserModel.fullname, bulan)
+        .order_by(bulan, UserModel.fullname)
+    )
+    return db.execute(statement).mappings().all()
\ No newline at end of file
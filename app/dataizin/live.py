@@ -0,0 +1,142 @@
+# backend/app/dataizin/live.py
+#
+# Papan izin live: GET /api/izin/stream (Server-Sent Events) menggantikan polling /pending dan /overdue.
+# Penulis izin memanggil pg_notify dalam transaksinya (crud.notify_izin_event). Setiap worker memegang
+# satu koneksi LISTEN, memuat izin yang berubah SEKALI, lalu membagikannya ke semua dashboard
+# yang terhubung ke worker tersebut. Beban database mengikuti jumlah tulisan, bukan jumlah dashboard.
+
+import asyncio
+import json
+import logging
+from typing import List, Optional, Set
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.dataizin import crud as crud_izin
+from app.dataizin.schemas import Izin as IzinSchema
+
+logger = logging.getLogger(__name__)
+
+# Event khusus saat koneksi LISTEN tersambung ulang: event yang terlewat tidak bisa diputar ulang,
+# jadi klien diminta mengambil snapshot baru
+RESYNC_EVENT = "resync"
+
+def _listen_dsn() -> str:
+    # asyncpg menerima DSN libpq (termasuk sslmode), jadi cukup buang nama driver SQLAlchemy
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def serialize_izins(izins) -> list:
+    return [IzinSchema.model_validate(izin).model_dump(mode="json") for izin in izins]
+
+async def load_snapshot() -> dict:
+    """Izin Pending dan izin lewat waktu hari ini, dengan session sendiri yang langsung ditutup."""
+    async with AsyncSessionLocal() as db:
+        pending = await db.run_sync(crud_izin.get_pending_izins)
+        overdue = await db.run_sync(crud_izin.get_overdue_izins)
+        return {"pending": serialize_izins(pending), "overdue": serialize_izins(overdue)}
+
+class IzinEventBroker:
+    """Satu per worker: koneksi LISTEN ke Postgres dan antrean per klien SSE."""
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._tasks: List[asyncio.Task] = []
+        # Notifikasi diproses berurutan oleh satu task agar urutan event sama dengan urutan commit
+        self._incoming: Optional[asyncio.Queue] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, message: str):
+        """Mengirim pesan ke semua klien. None di antrean berarti stream klien tersebut harus ditutup."""
+        for queue in list(self._subscribers):
+            if queue.qsize() >= settings.LIVE_EVENTS_QUEUE_SIZE:
+                # Klien terlalu lambat: putuskan; EventSource tersambung ulang dan menerima snapshot baru
+                self.unsubscribe(queue)
+                queue.put_nowait(None)
+                logger.warning("Klien stream izin terlalu lambat dan diputus.")
+                continue
+            queue.put_nowait(message)
+
+    async def _publish_forever(self):
+        while True:
+            event, izin_no = await self._incoming.get()
+            # Tanpa pelanggan di worker ini tidak perlu query sama sekali
+            if not self._subscribers:
+                continue
+            try:
+                async with AsyncSessionLocal() as db:
+                    izin = await db.run_sync(crud_izin.get_izin, no=izin_no)
+                if izin is not None:
+                    self.publish(format_sse(event, {"izin": serialize_izins([izin])[0]}))
+            except Exception as e:
+                logger.error(f"Gagal memuat izin #{izin_no} untuk event {event}: {e}")
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+            event, izin_no = message["event"], int(message["no"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Payload {channel} tidak valid: {payload!r}")
+            return
+        # Perubahan dari worker lain (atau dispatcher) ikut mengosongkan cache /pending dan /overdue di worker ini
+        crud_izin.invalidate_izin_caches()
+        self._incoming.put_nowait((event, izin_no))
+
+    async def _listen_forever(self):
+        delay = 1
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(_listen_dsn())
+                await connection.add_listener(crud_izin.IZIN_EVENTS_CHANNEL, self._on_notification)
+                logger.info(f"Mendengarkan kanal {crud_izin.IZIN_EVENTS_CHANNEL}.")
+                if delay > 1:
+                    self.publish(format_sse(RESYNC_EVENT, {}))
+                delay = 1
+                # Koneksi diperiksa berkala; koneksi yang putus memicu sambung ulang
+                while not connection.is_closed():
+                    await asyncio.sleep(settings.LIVE_EVENTS_HEARTBEAT_SECONDS)
+                    await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Koneksi LISTEN {crud_izin.IZIN_EVENTS_CHANNEL} terputus: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    def start(self):
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._incoming = asyncio.Queue()
+        self._tasks = [loop.create_task(self._publish_forever()), loop.create_task(self._listen_forever())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for queue in list(self._subscribers):
+            self.unsubscribe(queue)
+            queue.put_nowait(None)
+
+izin_event_broker = IzinEventBroker()
@@ -1,6 +1,6 @@
 # backend/app/dataizin/models.py
 
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship, declarative_base
 from app.core.database import Base
 
@@ -16,13 +16,27 @@ class Izin(Base):
     ipKembali = Column(String, nullable=True)
     
     durasi = Column(String, nullable=True)
+    # Durasi numerik untuk agregasi di SQL; `durasi` tetap teks untuk tampilan
+    duration_seconds = Column(Integer, nullable=True)
     status = Column(String, default="Pending")
+    # Cakupan slot yang dipesan saat keluar (dipisah koma), agar kembali melepas slot yang sama
+    # walaupun jabatan user berubah selama izin berjalan. NULL untuk izin sebelum kolom ini ada.
+    slot_scopes = Column(String, nullable=True)
     createOn = Column(DateTime(timezone=True), server_default=func.now())
     modifiedOn = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     user = relationship("User", back_populates="izins")
     telats = relationship("DataTelat", back_populates="izin")
 
+    # Indeks untuk filter rentang tanggal per user / per status.
+    # Tabel yang sudah ada mendapatkannya lewat app.core.migrations.ensure_indexes.
+    __table_args__ = (
+        Index("ix_dataIzin_user_uid_tanggal", "user_uid", "tanggal"),
+        Index("ix_dataIzin_status_tanggal", "status", "tanggal"),
+        # Laporan per tanggal/tahun tanpa filter user atau status
+        Index("ix_dataIzin_tanggal", "tanggal"),
+    )
+
     def __repr__(self):
         return f"<Izin(no={self.no}, user_uid='{self.user_uid}', tanggal='{self.tanggal}')>"
 
@@ -32,7 +46,12 @@ class Izin(Base):
 
         class DynamicDataIzin(DynamicBase):
             __tablename__ = table_name
-            __table_args__ = ({'extend_existing': True},) 
+            # Arsip tahunan dibaca per tanggal dan per user (lihat app.dataizin.archive)
+            __table_args__ = (
+                Index(f"ix_{table_name}_user_uid_tanggal", "user_uid", "tanggal"),
+                Index(f"ix_{table_name}_tanggal", "tanggal"),
+                {'extend_existing': True},
+            )
 
             no = Column(Integer, primary_key=True, index=True)
             user_uid = Column(String, ForeignKey('users.uid'), nullable=False)
@@ -44,7 +63,9 @@ class Izin(Base):
             ipKembali = Column(String, nullable=True)
             
             durasi = Column(String, nullable=True)
+            duration_seconds = Column(Integer, nullable=True)
             status = Column(String, default="Pending")
+            slot_scopes = Column(String, nullable=True)
             createOn = Column(DateTime(timezone=True), server_default=func.now())
             modifiedOn = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -53,4 +74,42 @@ class Izin(Base):
             def __repr__(self):
                 return f"<DynamicDataIzin(no={self.no}, user_uid='{self.user_uid}', tanggal='{self.tanggal}', table='{self.__tablename__}')>"
 
-        return DynamicDataIzin
\ No newline at end of file
+        return DynamicDataIzin
+
+class IzinSlot(Base):
+    """
+    Penghitung slot izin yang sedang berjalan per cakupan ('global' atau 'jabatan:<nama>').
+    Slot dipesan dengan UPDATE bersyarat dalam transaksi yang sama dengan insert izin,
+    sehingga batas serentak tetap benar saat banyak request datang bersamaan.
+    """
+    __tablename__ = "izin_slots"
+
+    scope = Column(String, primary_key=True)
+    used = Column(Integer, nullable=False, default=0, server_default="0")
+    modifiedOn = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<IzinSlot(scope='{self.scope}', used={self.used})>"
+
+class IzinDailyStats(Base):
+    """
+    Rekap izin per user per hari WIB: jumlah izin, total detik di luar, dan jumlah yang lewat waktu.
+    Diperbarui dengan UPSERT dalam transaksi yang sama dengan izin keluar/kembali,
+    sehingga dashboard dan batas harian cukup membaca satu baris.
+    """
+    __tablename__ = "izin_daily_stats"
+
+    user_uid = Column(String, ForeignKey('users.uid'), primary_key=True)
+    day_wib = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_seconds = Column(Integer, nullable=False, default=0, server_default="0")
+    overdue_count = Column(Integer, nullable=False, default=0, server_default="0")
+    modifiedOn = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Dashboard membaca semua user untuk satu hari
+    __table_args__ = (
+        Index("ix_izin_daily_stats_day_wib", "day_wib"),
+    )
+
+    def __repr__(self):
+        return f"<IzinDailyStats(user_uid='{self.user_uid}', day_wib='{self.day_wib}', count={self.count})>"
\ No newline at end of file
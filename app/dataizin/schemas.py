@@ -1,7 +1,7 @@
 # backend/app/dataizin/schemas.py
 
 from pydantic import BaseModel, ConfigDict
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from app.users.schemas import User
 
@@ -17,7 +17,7 @@ class IzinUpdate(BaseModel):
     ipKembali: Optional[str] = None
     durasi: Optional[str] = None
 
-class Izin(IzinBase):
+class IzinInDB(IzinBase):
     no: int
     tanggal: datetime
     jamKeluar: Optional[datetime] = None
@@ -25,10 +25,35 @@ class Izin(IzinBase):
     jamKembali: Optional[datetime] = None
     ipKembali: Optional[str] = None
     durasi: Optional[str] = None
+    duration_seconds: Optional[int] = None
     status: str
     createOn: datetime
     modifiedOn: datetime
-    
+
+    model_config = ConfigDict(from_attributes=True)
+
+class Izin(IzinInDB):
     user: Optional[User] = None
 
+    model_config = ConfigDict(from_attributes=True)
+
+class IzinDurationStats(BaseModel):
+    """Agregat durasi izin satu user dalam satu bulan (detik)."""
+    user_uid: str
+    fullname: Optional[str] = None
+    bulan: str
+    jumlah: int
+    total_seconds: int
+    avg_seconds: float
+    p95_seconds: float
+
+class IzinDailyStats(BaseModel):
+    """Rekap izin satu user dalam satu hari WIB, dibaca dari tabel izin_daily_stats."""
+    user_uid: str
+    fullname: Optional[str] = None
+    day_wib: date
+    count: int
+    total_seconds: int
+    overdue_count: int
+
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,16 +1,18 @@
 # app/datajobdesk/api.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 from sqlalchemy.exc import IntegrityError
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.datajobdesk import crud, schemas, models
 from app.autentikasi.security import get_current_active_user as get_current_user
-from app.users.schemas import User
+from app.autentikasi.principal_cache import Principal
 from app.listjob import crud as listjob_category_crud
+from app.utils.pagination import InvalidCursorError, invalid_cursor_exception, set_next_cursor
+from app.utils.sideload import IncludeMode, normalized_response
 
 router = APIRouter()
 
@@ -20,7 +22,7 @@ router = APIRouter()
 def create_new_jobdesk(
     jobdesk: schemas.JobdeskCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Membuat data jobdesk baru. Hanya Admin, SuperAdmin, atau staff yang bisa membuat jobdesk untuk dirinya sendiri.
@@ -67,6 +69,7 @@ def create_new_jobdesk(
 
 @router.get("/", response_model=List[schemas.JobdeskInDB])
 def read_all_jobdesks(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     user_uid: Optional[str] = None,
@@ -74,11 +77,14 @@ def read_all_jobdesks(
     listjob_category_id: Optional[int] = None,
     search: Optional[str] = None,
     jabatan: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    include: Optional[IncludeMode] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Mengambil daftar semua data jobdesk dengan opsi filter dan paginasi.
+    `include=normalized`: baris hanya berisi uid/id, dengan peta `users`, `roles`, `categories`, dan `shifts`.
     """
     if current_user.role.name != "Admin":
         if user_uid is not None and current_user.uid != user_uid:
@@ -87,17 +93,32 @@ def read_all_jobdesks(
                 detail="Anda hanya dapat melihat jobdesk milik Anda sendiri atau semua jobdesk."
             )
 
-    jobdesks = crud.get_jobdesks(
-        db,
-        skip=skip,
-        limit=limit,
-        user_uid=user_uid,
-        tanggal_efektif_mulai=tanggal,
-        tanggal_efektif_akhir=tanggal,
-        listjob_category_id=listjob_category_id,
-        search_query=search,
-        jabatan=jabatan
-    )
+    try:
+        jobdesks = crud.get_jobdesks(
+            db,
+            skip=skip,
+            limit=limit,
+            user_uid=user_uid,
+            tanggal_efektif_mulai=tanggal,
+            tanggal_efektif_akhir=tanggal,
+            listjob_category_id=listjob_category_id,
+            search_query=search,
+            jabatan=jabatan,
+            cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise invalid_cursor_exception(e)
+    if include == "normalized":
+        response = normalized_response(
+            jobdesks,
+            schemas.JobdeskNormalized,
+            user_paths=("user", "created_by_user", "modified_by_user"),
+            category_path="categories",
+            shift_path="shift",
+        )
+        set_next_cursor(response, jobdesks)
+        return response
+    set_next_cursor(response, jobdesks)
     return jobdesks
 
 ### Endpoint untuk mendapatkan data jobdesk berdasarkan no
@@ -106,7 +127,7 @@ def read_all_jobdesks(
 def read_jobdesk_by_no(
     jobdesk_no: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Mengambil satu data jobdesk berdasarkan nomor (no).
@@ -131,7 +152,7 @@ def update_existing_jobdesk(
     jobdesk_no: int,
     jobdesk: schemas.JobdeskUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Memperbarui data jobdesk yang ada.
@@ -178,7 +199,7 @@ def update_existing_jobdesk(
 def delete_existing_jobdesk(
     jobdesk_no: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Menghapus data jobdesk.
@@ -1,6 +1,6 @@
 # app/datajobdesk/crud.py
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import func, case, asc, and_
 from datetime import date, datetime
 from typing import Optional, List
@@ -9,17 +9,27 @@ from app.listjob import crud as listjob_category_crud
 from app.listjob.models import ListJobCategory
 from app.datashift.models import Shift
 from app.users.models import User
+from app.listjob.crud import category_loaders
+from app.datashift.crud import shift_loaders
+from app.core.loaders import eager, user_loader
+from app.utils.pagination import keyset_paginate
+
+# Relasi yang dibutuhkan skema respons JobdeskInDB: user, kategori (koleksi), dan shift beserta isinya
+def jobdesk_loaders():
+    return (
+        user_loader(models.Jobdesk.user),
+        user_loader(models.Jobdesk.created_by_user),
+        user_loader(models.Jobdesk.modified_by_user),
+        selectinload(models.Jobdesk.categories).options(*category_loaders()),
+        joinedload(models.Jobdesk.shift).options(*shift_loaders()),
+    )
 
 def get_jobdesk(db: Session, jobdesk_no: int):
     """
     Mengambil satu data jobdesk berdasarkan nomor (no) dengan eager loading relasi user, created_by_user, modified_by_user, categories, DAN SHIFT.
     """
     return db.query(models.Jobdesk)\
-             .options(joinedload(models.Jobdesk.user))\
-             .options(joinedload(models.Jobdesk.created_by_user))\
-             .options(joinedload(models.Jobdesk.modified_by_user))\
-             .options(joinedload(models.Jobdesk.categories))\
-             .options(joinedload(models.Jobdesk.shift)) \
+             .options(*eager(*jobdesk_loaders())) \
              .filter(models.Jobdesk.no == jobdesk_no).first()
 
 def get_jobdesks(
@@ -31,7 +41,8 @@ def get_jobdesks(
     tanggal_efektif_akhir: Optional[date] = None,
     listjob_category_id: Optional[int] = None,
     search_query: Optional[str] = None,
-    jabatan: Optional[str] = None
+    jabatan: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
     """
     Mengambil daftar data jobdesk dengan opsi filter dan paginasi,
@@ -39,11 +50,7 @@ def get_jobdesks(
     Akan mengurutkan data berdasarkan tanggal efektif dan nama kategori jobdesk (jika difilter).
     """
     query = db.query(models.Jobdesk)\
-              .options(joinedload(models.Jobdesk.user))\
-              .options(joinedload(models.Jobdesk.created_by_user))\
-              .options(joinedload(models.Jobdesk.modified_by_user))\
-              .options(joinedload(models.Jobdesk.categories))\
-              .options(joinedload(models.Jobdesk.shift))
+              .options(*eager(*jobdesk_loaders()))
 
     if listjob_category_id is not None or search_query:
         query = query.join(models.kategoriJobdesk, models.Jobdesk.no == models.kategoriJobdesk.c.jobdesk_no)
@@ -79,6 +86,9 @@ def get_jobdesks(
         models.Jobdesk.user_uid.asc()
     ).distinct()
 
+    if cursor is not None:
+        # Mode cursor: urut (tanggal, no) agar setiap baris punya posisi yang unik
+        return keyset_paginate(query, "jobdesk", [models.Jobdesk.tanggal, models.Jobdesk.no], cursor, limit)
     return query.offset(skip).limit(limit).all()
 
 def get_jobdesk_by_user_date_shift(db: Session, user_uid: str, tanggal: date, shift_no: int):
@@ -1,6 +1,6 @@
 # app/datajobdesk/schemas.py
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import date, datetime
 from typing import List, Optional
 
@@ -42,4 +42,25 @@ class JobdeskInDB(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
-JobdeskInDB.model_rebuild()
\ No newline at end of file
+JobdeskInDB.model_rebuild()
+
+class JobdeskNormalized(BaseModel):
+    """Baris mode ?include=normalized: relasi hanya berupa uid/id ke peta `users`, `categories`, dan `shifts`."""
+    no: int
+    tanggal: date
+    user_uid: str
+    shift_no: Optional[int] = None
+
+    createdBy_uid: str
+    modifiedBy_uid: Optional[str] = None
+    createdOn: datetime
+    modifiedOn: Optional[datetime] = None
+
+    category_ids: List[int] = Field(validation_alias="categories")
+
+    @field_validator('category_ids', mode='before')
+    @classmethod
+    def category_ids_from_categories(cls, v):
+        return [category if isinstance(category, int) else category.id for category in v]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,18 +1,39 @@
 # app/dataresign/api.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.dataresign import crud as crud_resign
-from app.dataresign.schemas import DataResign, DataResignCreate, DataResignUpdate, DataResignApprove
-from typing import List
+from app.dataresign.schemas import DataResign, DataResignCreate, DataResignInDB, DataResignUpdate, DataResignApprove
+from typing import List, Optional
+from app.utils.pagination import InvalidCursorError, invalid_cursor_exception, set_next_cursor
+from app.utils.sideload import IncludeMode, normalized_response
 
 router = APIRouter()
 
 @router.get("/", response_model=List[DataResign])
-def get_all_resignations(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
-    """Mendapatkan daftar semua pengajuan resign."""
-    resignations = crud_resign.get_resignations(db, skip=skip, limit=limit)
+def get_all_resignations(
+    response: Response,
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include: Optional[IncludeMode] = None,
+):
+    """Mendapatkan daftar semua pengajuan resign. `include=normalized` mengirim setiap user sekali di peta `users`."""
+    try:
+        resignations = crud_resign.get_resignations(db, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise invalid_cursor_exception(e)
+    if include == "normalized":
+        response = normalized_response(
+            resignations,
+            DataResignInDB,
+            user_paths=("user", "approved_by_user", "created_by_user", "edited_by_user"),
+        )
+        set_next_cursor(response, resignations)
+        return response
+    set_next_cursor(response, resignations)
     return resignations
 
 @router.get("/{resignation_id}", response_model=DataResign)
@@ -1,27 +1,31 @@
 # app/dataresign/crud.py
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
+from app.core.loaders import eager, user_loader
+from app.utils.pagination import keyset_paginate
 from app.dataresign.models import DataResign as DataResignModel
 from app.dataresign.schemas import DataResignCreate, DataResignUpdate, DataResignApprove
 from typing import List, Optional
 
-def get_resignations(db: Session, skip: int = 0, limit: int = 100) -> List[DataResignModel]:
+# Relasi yang dibutuhkan skema respons DataResign
+def resign_loaders():
+    return (
+        user_loader(DataResignModel.user),
+        user_loader(DataResignModel.approved_by_user),
+        user_loader(DataResignModel.created_by_user),
+        user_loader(DataResignModel.edited_by_user),
+    )
+
+def get_resignations(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[DataResignModel]:
     """Mengambil daftar pengajuan resign dengan relasi yang dimuat."""
-    return db.query(DataResignModel).options(
-        joinedload(DataResignModel.user),
-        joinedload(DataResignModel.approved_by_user),
-        joinedload(DataResignModel.created_by_user),
-        joinedload(DataResignModel.edited_by_user)
-    ).offset(skip).limit(limit).all()
+    query = db.query(DataResignModel).options(*eager(*resign_loaders()))
+    if cursor is not None:
+        return keyset_paginate(query, "resign", [DataResignModel.id], cursor, limit, descending=True)
+    return query.offset(skip).limit(limit).all()
 
 def get_resignation_by_id(db: Session, resignation_id: int) -> Optional[DataResignModel]:
     """Mengambil satu pengajuan resign berdasarkan ID."""
-    return db.query(DataResignModel).options(
-        joinedload(DataResignModel.user),
-        joinedload(DataResignModel.approved_by_user),
-        joinedload(DataResignModel.created_by_user),
-        joinedload(DataResignModel.edited_by_user)
-    ).filter(DataResignModel.id == resignation_id).first()
+    return db.query(DataResignModel).options(*eager(*resign_loaders())).filter(DataResignModel.id == resignation_id).first()
 
 def create_resignation(db: Session, resignation_data: DataResignCreate) -> DataResignModel:
     """Membuat pengajuan resign baru."""
@@ -1,6 +1,6 @@
 # app/datashift/api.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
@@ -8,7 +8,8 @@ from datetime import date
 from app.core.database import get_db
 from app.datashift import crud, schemas
 from app.autentikasi.security import get_current_active_user as get_current_user
-from app.users.schemas import User
+from app.autentikasi.principal_cache import Principal
+from app.utils.pagination import InvalidCursorError, invalid_cursor_exception, set_next_cursor
 
 router = APIRouter()
 
@@ -17,7 +18,7 @@ router = APIRouter()
 def create_new_shift(
     shift: schemas.ShiftCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     db_shift = crud.create_shift(db=db, shift=shift, createdBy_uid=current_user.uid)
     return db_shift
@@ -25,20 +26,26 @@ def create_new_shift(
 # Endpoint untuk mendapatkan semua data shift
 @router.get("/", response_model=List[schemas.ShiftInDB])
 def read_all_shifts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     user_uid: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     jabatan: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Mengambil daftar semua data shift dengan opsi filter.
     """
     # Hapus semua logika otorisasi di sini untuk memungkinkan semua pengguna melihat semua data.
-    shifts = crud.get_shifts(db, skip=skip, limit=limit, user_uid=user_uid, start_date=start_date, end_date=end_date, jabatan=jabatan)
+    try:
+        shifts = crud.get_shifts(db, skip=skip, limit=limit, user_uid=user_uid, start_date=start_date, end_date=end_date, jabatan=jabatan, cursor=cursor)
+    except InvalidCursorError as e:
+        raise invalid_cursor_exception(e)
+    set_next_cursor(response, shifts)
     return shifts
 
 # Endpoint untuk mendapatkan data shift berdasarkan no
@@ -46,7 +53,7 @@ def read_all_shifts(
 def read_shift_by_no(
     shift_no: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Mengambil satu data shift berdasarkan nomor (no).
@@ -70,7 +77,7 @@ def update_existing_shift(
     shift_no: int,
     shift: schemas.ShiftUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     db_shift = crud.get_shift(db, shift_no=shift_no)
     if db_shift is None:
@@ -90,7 +97,7 @@ def update_existing_shift(
 def delete_existing_shift(
     shift_no: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Menghapus data shift.
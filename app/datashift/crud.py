@@ -1,30 +1,38 @@
 # app/datashift/crud.py
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func, case, asc
 from datetime import date, datetime
 from app.datashift import models, schemas
 from app.users import models as user_models # <-- PERBAIKI: Impor model User
+from app.datajobdesk.models import Jobdesk
+from app.listjob.crud import category_loaders
+from app.core.loaders import eager, user_loader
+from app.utils.pagination import keyset_paginate
+
+# Relasi yang dibutuhkan skema respons ShiftInDB, termasuk kategori setiap jobdesk
+def shift_loaders():
+    return (
+        user_loader(models.Shift.user),
+        user_loader(models.Shift.created_by_user),
+        selectinload(models.Shift.jobdesks).selectinload(Jobdesk.categories).options(*category_loaders()),
+    )
 
 def get_shift(db: Session, shift_no: int):
     """
     Mengambil satu data shift berdasarkan nomor (no) dengan eager loading relasi user dan jobdesks.
     """
     return db.query(models.Shift)\
-             .options(joinedload(models.Shift.user))\
-             .options(joinedload(models.Shift.created_by_user))\
-             .options(joinedload(models.Shift.jobdesks)) \
+             .options(*eager(*shift_loaders())) \
              .filter(models.Shift.no == shift_no).first()
 
-def get_shifts(db: Session, skip: int = 0, limit: int = 100, user_uid: str = None, start_date: date = None, end_date: date = None, jabatan: str = None): # <-- PERBAIKI: Tambahkan parameter jabatan
+def get_shifts(db: Session, skip: int = 0, limit: int = 100, user_uid: str = None, start_date: date = None, end_date: date = None, jabatan: str = None, cursor: str = None): # <-- PERBAIKI: Tambahkan parameter jabatan
     """
     Mengambil daftar data shift dengan opsi filter dan paginasi,
     serta eager loading relasi user, created_by_user, dan jobdesks.
     Akan mengurutkan data berdasarkan tanggal mulai, jadwal, jam masuk, dan user_uid.
     """
     query = db.query(models.Shift)\
-              .options(joinedload(models.Shift.user))\
-              .options(joinedload(models.Shift.created_by_user))\
-              .options(joinedload(models.Shift.jobdesks))
+              .options(*eager(*shift_loaders()))
 
     if user_uid:
         query = query.filter(models.Shift.user_uid == user_uid)
@@ -47,7 +55,10 @@ def get_shifts(db: Session, skip: int = 0, limit: int = 100, user_uid: str = Non
         models.Shift.jamMasuk.asc(),
         models.Shift.user_uid.asc()
     )
-    
+
+    if cursor is not None:
+        # Mode cursor: urut (tanggalMulai, no) agar setiap baris punya posisi yang unik
+        return keyset_paginate(query, "shift", [models.Shift.tanggalMulai, models.Shift.no], cursor, limit)
     return query.offset(skip).limit(limit).all()
 
 # Helper function to convert datetime to HH:MM string for database storage
@@ -77,9 +88,7 @@ def create_shift(db: Session, shift: schemas.ShiftCreate, createdBy_uid: str):
     db.commit()
     db.refresh(db_shift)
     db_shift = db.query(models.Shift)\
-                     .options(joinedload(models.Shift.user))\
-                     .options(joinedload(models.Shift.created_by_user))\
-                     .options(joinedload(models.Shift.jobdesks)) \
+                     .options(*eager(*shift_loaders())) \
                      .filter(models.Shift.no == db_shift.no).first()
     return db_shift
 
@@ -100,9 +109,7 @@ def update_shift(db: Session, shift_no: int, shift_update: schemas.ShiftUpdate):
         db.commit()
         db.refresh(db_shift)
         db_shift = db.query(models.Shift)\
-                         .options(joinedload(models.Shift.user))\
-                         .options(joinedload(models.Shift.created_by_user))\
-                         .options(joinedload(models.Shift.jobdesks)) \
+                         .options(*eager(*shift_loaders())) \
                          .filter(models.Shift.no == db_shift.no).first()
     return db_shift
 
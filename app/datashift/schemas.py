@@ -79,4 +79,13 @@ class ShiftInDB(ShiftBase):
     def format_time_output(cls, v: Optional[str]) -> Optional[str]:
         return format_time_to_hh_mm(v)
 
-    model_config = ConfigDict(from_attributes=True) # <--- ConfigDict is now defined
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True) # <--- ConfigDict is now defined
+
+class ShiftNormalized(ShiftBase):
+    """Shift untuk mode ?include=normalized: user dirujuk lewat uid, tanpa daftar jobdesk tersemat."""
+    no: int
+    createdBy_uid: str
+    createOn: date
+    modifiedOn: Optional[date] = None
+
+    model_config = ConfigDict(from_attributes=True)
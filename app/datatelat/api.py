@@ -1,47 +1,85 @@
 # backend/app/datatelat/api.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.core.database import get_db
-from app.datatelat.schemas import DataTelat as DataTelatSchema, DataTelatCreate, DataTelatUpdate
+from app.core.database import get_db, get_read_db, read_session_factory
+from app.datatelat.schemas import DataTelat as DataTelatSchema, DataTelatCreate, DataTelatNormalized, DataTelatStats, DataTelatUpdate
 from app.datatelat import crud as crud_datatelat
 from datetime import date
 from sqlalchemy import extract
 from app.dataizin import crud as crud_izin
 from app.autentikasi.security import get_current_active_user
-from app.users.models import User
+from app.autentikasi.principal_cache import Principal
+from app.utils.export import ExportFormat, stream_export
+from app.utils.sideload import IncludeMode, normalized_response
 
 router = APIRouter()
 
+# Relasi User per baris data telat, termasuk user pada izin yang tersemat
+DATATELAT_USER_PATHS = ("user", "approved_by", "izin.user")
+
 # Dapatkan semua data telat dengan filter tahun
 @router.get("/", response_model=List[DataTelatSchema])
 def get_all_datatelats(
-    db: Session = Depends(get_db),
-    tahun: Optional[int] = None
+    db: Session = Depends(get_read_db),
+    tahun: Optional[int] = None,
+    include: Optional[IncludeMode] = None,
 ):
     """
     Mengambil semua data telat. Filter opsional berdasarkan tahun.
+    `include=normalized`: user hanya dirujuk lewat uid, dengan peta `users` dan `roles` di tingkat atas.
     """
     if tahun:
         datatelats = crud_datatelat.get_datatelats_by_year(db, tahun=tahun)
     else:
         datatelats = crud_datatelat.get_all_datatelats(db)
+    if include == "normalized":
+        return normalized_response(datatelats, DataTelatNormalized, user_paths=DATATELAT_USER_PATHS)
     return datatelats
 
 # Dapatkan data telat berdasarkan bulan dan tahun
 @router.get("/filter_by_month_year/", response_model=List[DataTelatSchema])
 def get_datatelats_by_month_year(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     bulan: Optional[int] = None,
-    tahun: Optional[int] = None
+    tahun: Optional[int] = None,
+    include: Optional[IncludeMode] = None,
 ):
     """
-    Mengambil data telat dengan filter bulan dan tahun.
+    Mengambil data telat dengan filter bulan dan tahun. Mendukung `include=normalized`.
     """
     datatelats = crud_datatelat.get_datatelats_by_month_year(db, bulan=bulan, tahun=tahun)
+    if include == "normalized":
+        return normalized_response(datatelats, DataTelatNormalized, user_paths=DATATELAT_USER_PATHS)
     return datatelats
 
+# Ekspor data telat satu tahun (NDJSON/CSV yang di-stream)
+@router.get("/export")
+def export_datatelats_by_year(
+    request: Request,
+    tahun: int,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+):
+    """
+    Mengekspor data telat satu tahun tanpa memuat seluruh tahun ke memori.
+    """
+    statement = crud_datatelat.datatelat_export_statement(tahun=tahun)
+    return stream_export(read_session_factory(request), statement, export_format, f"datatelat-{tahun}")
+
+# Rekap keterlambatan per user per bulan (agregasi di database)
+@router.get("/stats", response_model=List[DataTelatStats])
+def get_datatelat_stats(
+    tahun: int,
+    bulan: Optional[int] = Query(None, ge=1, le=12),
+    user_uid: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Mengambil jumlah, total/rata-rata/p95 lewat waktu, dan total denda per user per bulan.
+    """
+    return crud_datatelat.get_datatelat_stats(db, tahun=tahun, bulan=bulan, user_uid=user_uid)
+
 # Dapatkan satu data telat berdasarkan nomor (no)
 @router.get("/{dataTelat_no}", response_model=DataTelatSchema)
 def get_datatelat_by_id(dataTelat_no: int, db: Session = Depends(get_db)):
@@ -75,7 +113,7 @@ def update_existing_datatelat(
     dataTelat_no: int,
     datatelat_update: DataTelatUpdate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user) # Ambil objek user dari dependensi
+    current_user: Principal = Depends(get_current_active_user) # Ambil objek user dari dependensi
 ):
     """
     Memperbarui data telat yang sudah ada dan mencatat siapa yang memperbarui.
@@ -1,14 +1,35 @@
 # backend/app/datatelat/crud.py
 
 from sqlalchemy.orm import Session, joinedload
+from app.core.loaders import eager, user_loader
 from app.datatelat.models import DataTelat
 from app.datatelat.schemas import DataTelatCreate, DataTelatUpdate
 from app.dataizin.models import Izin as IzinModel
-from sqlalchemy import extract
+from app.users.models import User
+from sqlalchemy import extract, func
 from typing import Optional
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
 from fastapi import HTTPException, status
-from sqlalchemy import and_
+from sqlalchemy import and_, select
+from app.utils.date_range import in_range, wib_month_label, wib_month_range_utc, wib_year_range_utc
+
+# Relasi yang dibutuhkan skema respons DataTelat: izin beserta user-nya, user, dan penyetuju
+def datatelat_loaders():
+    return (
+        joinedload(DataTelat.izin).options(user_loader(IzinModel.user)),
+        user_loader(DataTelat.user),
+        user_loader(DataTelat.approved_by),
+    )
+def parse_denda(denda: Optional[str]) -> Optional[Decimal]:
+    """Nilai numerik dari teks denda (mis. "300"); None jika bukan angka."""
+    if denda is None:
+        return None
+    try:
+        amount = Decimal(denda.strip())
+    except InvalidOperation:
+        return None
+    return amount if amount.is_finite() else None
 
 # --- Fungsi yang sudah ada (create_data_telat) ---
 def create_data_telat(
@@ -16,9 +37,11 @@ def create_data_telat(
     izin_no: int,
     user_uid: str,
     lewat_waktu_seconds: float,
+    commit: bool = True,
 ):
     """
     Membuat entri data telat secara otomatis berdasarkan data izin yang lewat waktu.
+    Dengan commit=False, entri hanya di-flush dan ikut transaksi pemanggil.
     """
     sanksi = None
     denda = None
@@ -41,8 +64,15 @@ def create_data_telat(
         keterangan=keterangan,
     )
     
-    db_telat = DataTelat(**telat_payload.model_dump())
+    db_telat = DataTelat(
+        **telat_payload.model_dump(),
+        lewat_waktu_seconds=int(lewat_waktu_seconds),
+        denda_amount=parse_denda(denda),
+    )
     db.add(db_telat)
+    if not commit:
+        db.flush()
+        return db_telat
     db.commit()
     db.refresh(db_telat)
     return db_telat
@@ -51,66 +81,118 @@ def create_data_telat(
 
 # Mengambil semua data telat
 def get_all_datatelats(db: Session):
-    return db.query(DataTelat).options(
-        joinedload(DataTelat.izin),
-        joinedload(DataTelat.user),
-        joinedload(DataTelat.approved_by)
-    ).all()
+    return db.query(DataTelat).options(*eager(*datatelat_loaders())).all()
 
 # Mengambil satu data telat berdasarkan nomor
 def get_datatelat_by_no(db: Session, dataTelat_no: int):
-    return db.query(DataTelat).options(
-        joinedload(DataTelat.izin),
-        joinedload(DataTelat.user),
-        joinedload(DataTelat.approved_by)
-    ).filter(DataTelat.no == dataTelat_no).first()
+    return db.query(DataTelat).options(*eager(*datatelat_loaders())).filter(DataTelat.no == dataTelat_no).first()
 
 # PERBAIKAN: Mengambil data telat berdasarkan tahun DARI TANGGAL IZIN
 def get_datatelats_by_year(db: Session, tahun: int):
     query = db.query(DataTelat)
     query = query.join(IzinModel, DataTelat.izin_no == IzinModel.no)
     
-    query = query.filter(extract('year', IzinModel.tanggal) == tahun)
+    query = query.filter(in_range(IzinModel.tanggal, wib_year_range_utc(tahun)))
     
-    query = query.options(
-        joinedload(DataTelat.izin),
-        joinedload(DataTelat.user),
-        joinedload(DataTelat.approved_by)
-    )
+    query = query.options(*eager(*datatelat_loaders()))
     
     return query.all()
 
+# SELECT kolom datar untuk ekspor data telat per tahun (lihat app.utils.export)
+def datatelat_export_statement(tahun: int):
+    return (
+        select(
+            DataTelat.no,
+            DataTelat.izin_no,
+            DataTelat.user_uid,
+            User.fullname,
+            User.jabatan,
+            IzinModel.tanggal.label("tanggal_izin"),
+            IzinModel.jamKeluar,
+            IzinModel.jamKembali,
+            DataTelat.sanksi,
+            DataTelat.denda,
+            DataTelat.lewat_waktu_seconds,
+            DataTelat.denda_amount,
+            DataTelat.status,
+            DataTelat.keterangan,
+            DataTelat.jam,
+            DataTelat.by,
+            DataTelat.createOn,
+        )
+        .join(IzinModel, DataTelat.izin_no == IzinModel.no)
+        .join(User, DataTelat.user_uid == User.uid)
+        .where(in_range(IzinModel.tanggal, wib_year_range_utc(tahun)))
+        .order_by(IzinModel.tanggal)
+    )
+
+def get_datatelat_stats(
+    db: Session,
+    tahun: int,
+    bulan: Optional[int] = None,
+    user_uid: Optional[str] = None,
+) -> list:
+    """
+    Jumlah, total/rata-rata/p95 lewat waktu (detik), dan total denda per user per bulan WIB
+    (bulan tanggal izin), dihitung seluruhnya di SQL dari kolom numerik.
+    """
+    month = wib_month_label(IzinModel.tanggal)
+    query = (
+        select(
+            DataTelat.user_uid,
+            User.fullname,
+            month.label("bulan"),
+            func.count().label("jumlah"),
+            func.sum(DataTelat.lewat_waktu_seconds).label("total_lewat_waktu_seconds"),
+            func.avg(DataTelat.lewat_waktu_seconds).label("avg_lewat_waktu_seconds"),
+            func.percentile_cont(0.95).within_group(DataTelat.lewat_waktu_seconds).label("p95_lewat_waktu_seconds"),
+            func.coalesce(func.sum(DataTelat.denda_amount), 0).label("total_denda"),
+        )
+        .join(IzinModel, DataTelat.izin_no == IzinModel.no)
+        .join(User, DataTelat.user_uid == User.uid)
+        .where(*_month_year_conditions(bulan, tahun))
+    )
+    if user_uid:
+        query = query.where(DataTelat.user_uid == user_uid)
+    query = query.group_by(DataTelat.user_uid, User.fullname, month).order_by(month, User.fullname)
+    return db.execute(query).mappings().all()
+
+# Batas bulan/tahun WIB sebagai rentang UTC agar indeks dataIzin(tanggal) terpakai.
+# Hanya filter bulan tanpa tahun (lintas tahun) yang masih memakai extract.
+def _month_year_conditions(bulan: Optional[int] = None, tahun: Optional[int] = None) -> list:
+    if bulan is not None and tahun is not None:
+        return [in_range(IzinModel.tanggal, wib_month_range_utc(tahun, bulan))]
+    if tahun is not None:
+        return [in_range(IzinModel.tanggal, wib_year_range_utc(tahun))]
+    if bulan is not None:
+        return [extract('month', func.timezone('Asia/Jakarta', IzinModel.tanggal)) == bulan]
+    return []
+
 # Mengambil data telat berdasarkan bulan dan tahun DARI TANGGAL IZIN
 def get_datatelats_by_month_year(db: Session, bulan: Optional[int] = None, tahun: Optional[int] = None):
     query = db.query(DataTelat)
     query = query.join(IzinModel, DataTelat.izin_no == IzinModel.no)
     
-    conditions = []
-    if bulan is not None:
-        conditions.append(extract('month', IzinModel.tanggal) == bulan)
-    if tahun is not None:
-        conditions.append(extract('year', IzinModel.tanggal) == tahun)
-    
+    conditions = _month_year_conditions(bulan, tahun)
     if conditions:
         query = query.filter(and_(*conditions))
     
-    query = query.options(
-        joinedload(DataTelat.izin),
-        joinedload(DataTelat.user),
-        joinedload(DataTelat.approved_by)
-    )
+    query = query.options(*eager(*datatelat_loaders()))
     
     return query.all()
 
 def create_datatelat_manual(db: Session, datatelat: DataTelatCreate):
     db_datatelat = DataTelat(**datatelat.model_dump(exclude_unset=True))
+    db_datatelat.denda_amount = parse_denda(db_datatelat.denda)
     db.add(db_datatelat)
     db.commit()
     db.refresh(db_datatelat)
     return db_datatelat
 
 def update_datatelat(db: Session, dataTelat_no: int, datatelat_update: DataTelatUpdate, current_user_uid: str = None):
-    db_datatelat = db.query(DataTelat).filter(DataTelat.no == dataTelat_no).first()
+    db_datatelat = db.query(DataTelat).options(
+        *eager(*datatelat_loaders())
+    ).filter(DataTelat.no == dataTelat_no).first()
     if not db_datatelat:
         return None
     
@@ -144,6 +226,8 @@ def update_datatelat(db: Session, dataTelat_no: int, datatelat_update: DataTelat
     for key, value in update_data.items():
         if key not in ["by", "jam", "keterangan", "status"]:
             setattr(db_datatelat, key, value)
+    if "denda" in update_data:
+        db_datatelat.denda_amount = parse_denda(update_data["denda"])
 
     if new_status:
         db_datatelat.status = new_status
@@ -1,6 +1,6 @@
 # backend/app/datatelat/models.py
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, Numeric, String, DateTime, ForeignKey, func, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -11,6 +11,9 @@ class DataTelat(Base):
     user_uid = Column(String, ForeignKey('users.uid'), nullable=False)
     sanksi = Column(String, nullable=True)
     denda = Column(String, nullable=True)
+    # Nilai numerik untuk agregasi di SQL; `denda` dan `keterangan` tetap teks untuk tampilan
+    lewat_waktu_seconds = Column(Integer, nullable=True)
+    denda_amount = Column(Numeric(12, 2), nullable=True)
     status = Column(String, default="Pending")
     keterangan = Column(String, nullable=True)
     jam = Column(String, nullable=True)
@@ -21,4 +24,9 @@ class DataTelat(Base):
     # Perbaikan: Sesuaikan relasi `izin` untuk menunjuk kembali ke `telats` di Izin model
     izin = relationship("Izin", back_populates="telats")
     user = relationship("User", foreign_keys=[user_uid], back_populates="telats")
-    approved_by = relationship("User", foreign_keys=[by])
\ No newline at end of file
+    approved_by = relationship("User", foreign_keys=[by])
+
+    # Join dataTelat -> dataIzin untuk filter tahun/bulan (lihat app.core.migrations)
+    __table_args__ = (
+        Index("ix_dataTelat_izin_no", "izin_no"),
+    )
\ No newline at end of file
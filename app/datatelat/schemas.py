@@ -3,7 +3,7 @@
 from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
-from app.dataizin.schemas import Izin as IzinSchema
+from app.dataizin.schemas import Izin as IzinSchema, IzinInDB
 from app.users.schemas import User as UserSchema
 
 class DataTelatBase(BaseModel):
@@ -29,13 +29,35 @@ class DataTelatUpdate(DataTelatBase):
     jam: Optional[str] = None
     by: Optional[str] = None
 
-class DataTelat(DataTelatBase):
+class DataTelatInDB(DataTelatBase):
     no: int
     createOn: datetime
     modifiedOn: datetime
-    
+    lewat_waktu_seconds: Optional[int] = None
+    denda_amount: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class DataTelat(DataTelatInDB):
     izin: Optional[IzinSchema] = None
     user: Optional[UserSchema] = None
     approved_by: Optional[UserSchema] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class DataTelatNormalized(DataTelatInDB):
+    """Baris mode ?include=normalized: izin tanpa user tersemat; user ada di peta `users`."""
+    izin: Optional[IzinInDB] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class DataTelatStats(BaseModel):
+    """Agregat keterlambatan satu user dalam satu bulan. Nilai lewat waktu dalam detik."""
+    user_uid: str
+    fullname: Optional[str] = None
+    bulan: str
+    jumlah: int
+    total_lewat_waktu_seconds: Optional[int] = None
+    avg_lewat_waktu_seconds: Optional[float] = None
+    p95_lewat_waktu_seconds: Optional[float] = None
+    total_denda: float
\ No newline at end of file
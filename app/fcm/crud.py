@@ -3,6 +3,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.fcm.models import FCMToken as FCMTokenModel
+from app.users.models import User as UserModel
 from typing import List
 import json  # 👈 Tambahkan import ini
 
@@ -46,7 +47,17 @@ def get_fcm_tokens_by_user(db: Session, user_uid: str) -> List[str]:
     """
     fcm_tokens = db.query(FCMTokenModel).filter(FCMTokenModel.user_uid == user_uid).all()
     return [token.fcm_token for token in fcm_tokens]
-    
+
+def get_fcm_tokens_except_user(db: Session, exclude_user_uid: str) -> List[str]:
+    """
+    Mengambil semua token FCM milik pengguna selain `exclude_user_uid` dalam satu query join.
+    """
+    rows = db.query(FCMTokenModel.fcm_token)\
+             .join(UserModel, FCMTokenModel.user_uid == UserModel.uid)\
+             .filter(UserModel.uid != exclude_user_uid)\
+             .all()
+    return [row.fcm_token for row in rows]
+
 def delete_fcm_token(db: Session, fcm_token: str):
     """
     Menghapus token FCM yang tidak valid dari database.
@@ -56,4 +67,17 @@ def delete_fcm_token(db: Session, fcm_token: str):
         db.delete(db_token)
         db.commit()
         return True
-    return False
\ No newline at end of file
+    return False
+
+def delete_fcm_tokens(db: Session, fcm_tokens: List[str]) -> int:
+    """
+    Menghapus banyak token FCM yang tidak valid sekaligus dalam satu statement DELETE.
+    Mengembalikan jumlah baris yang dihapus.
+    """
+    if not fcm_tokens:
+        return 0
+    deleted = db.query(FCMTokenModel)\
+                .filter(FCMTokenModel.fcm_token.in_(fcm_tokens))\
+                .delete(synchronize_session=False)
+    db.commit()
+    return deleted
\ No newline at end of file
@@ -11,12 +11,12 @@ from datetime import date
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.IzinRuleInDB])
-def read_izin_rules(db: Session = Depends(get_db)):
+async def read_izin_rules():
     """
     Mengambil daftar semua aturan izin. Karena hanya satu aturan yang diizinkan, ini akan mengembalikan daftar berisi 0 atau 1 aturan.
+    Respons di-cache beberapa detik dan dikosongkan setiap aturan berubah.
     """
-    rules = crud.get_izin_rules(db)
-    return rules
+    return await crud.izin_rules_response_cache.respond(List[schemas.IzinRuleInDB], crud.get_izin_rules)
 
 @router.get("/{rule_id}", response_model=schemas.IzinRuleInDB)
 def read_izin_rule(rule_id: int, db: Session = Depends(get_db)):
@@ -2,6 +2,8 @@
 # (Tidak ada perubahan, kode ini sudah benar)
 from sqlalchemy.orm import Session
 from . import models, schemas
+from .rule_cache import izin_rule_cache, IzinRuleSnapshot
+from app.core.response_cache import ResponseCache
 from datetime import date
 from typing import List, Optional
 import logging
@@ -9,15 +11,17 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Cache respons GET /api/izin_rules/; dikosongkan bersama izin_rule_cache setiap aturan berubah
+izin_rules_response_cache = ResponseCache("izin_rules")
+
 def get_izin_rule(db: Session, rule_id: int):
     return db.query(models.IzinRule).filter(models.IzinRule.id == rule_id).first()
 
 def get_izin_rules(db: Session, skip: int = 0, limit: int = 100) -> List[models.IzinRule]:
     return db.query(models.IzinRule).offset(skip).limit(limit).all()
 
-def get_active_izin_rule(db: Session) -> Optional[models.IzinRule]:
-    rule = db.query(models.IzinRule).first()
-    return rule
+def get_active_izin_rule(db: Session) -> Optional[IzinRuleSnapshot]:
+    return izin_rule_cache.get(db)
 
 def create_izin_rule(db: Session, rule: schemas.IzinRuleCreate):
     existing_rule = db.query(models.IzinRule).first()
@@ -29,6 +33,8 @@ def create_izin_rule(db: Session, rule: schemas.IzinRuleCreate):
     db_izin_rule = models.IzinRule(**rule.model_dump())
     db.add(db_izin_rule)
     db.commit()
+    izin_rule_cache.invalidate()
+    izin_rules_response_cache.invalidate()
     db.refresh(db_izin_rule)
     logger.info(f"New IzinRule created with ID: {db_izin_rule.id}")
     return db_izin_rule
@@ -42,6 +48,8 @@ def update_izin_rule(db: Session, rule_id: int, rule_update: schemas.IzinRuleCre
         setattr(db_izin_rule, key, value)
     db.add(db_izin_rule)
     db.commit()
+    izin_rule_cache.invalidate()
+    izin_rules_response_cache.invalidate()
     db.refresh(db_izin_rule)
     logger.info(f"IzinRule with ID: {db_izin_rule.id} updated.")
     return db_izin_rule
@@ -51,6 +59,8 @@ def delete_izin_rule(db: Session, rule_id: int):
     if db_izin_rule:
         db.delete(db_izin_rule)
         db.commit()
+        izin_rule_cache.invalidate()
+        izin_rules_response_cache.invalidate()
         logger.info(f"IzinRule with ID: {rule_id} deleted.")
         return True
     logger.warning(f"Attempted to delete IzinRule with ID: {rule_id}, but it was not found.")
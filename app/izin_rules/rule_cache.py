@@ -0,0 +1,88 @@
+# app/izin_rules/rule_cache.py
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.generation_cache import GenerationCache
+from .models import IzinRule
+
+_SNAPSHOT_KEY = "active"
+
+@dataclass(frozen=True)
+class IzinRuleSnapshot:
+    """Snapshot immutable dari aturan izin aktif, aman dibagikan antar request."""
+    id: int
+    max_daily_izin: int
+    max_duration_seconds: int
+    is_double_shift_rule: bool
+    max_daily_double_shift: Optional[int]
+    double_shift_day: Optional[str]
+    max_concurrent_izin: int
+    max_izin_operator: int
+    max_izin_kapten: int
+    max_izin_kasir: int
+    max_izin_kasir_lokal: int
+    modifiedOn: Optional[datetime]
+
+    @classmethod
+    def from_rule(cls, rule: IzinRule) -> "IzinRuleSnapshot":
+        return cls(
+            id=rule.id,
+            max_daily_izin=rule.max_daily_izin,
+            max_duration_seconds=rule.max_duration_seconds,
+            is_double_shift_rule=rule.is_double_shift_rule,
+            max_daily_double_shift=rule.max_daily_double_shift,
+            double_shift_day=rule.double_shift_day,
+            max_concurrent_izin=rule.max_concurrent_izin,
+            max_izin_operator=rule.max_izin_operator,
+            max_izin_kapten=rule.max_izin_kapten,
+            max_izin_kasir=rule.max_izin_kasir,
+            max_izin_kasir_lokal=rule.max_izin_kasir_lokal,
+            modifiedOn=rule.modifiedOn,
+        )
+
+    @property
+    def version(self) -> Tuple[int, Optional[datetime]]:
+        return (self.id, self.modifiedOn)
+
+class IzinRuleCache:
+    """
+    Cache aturan izin aktif per proses.
+    Penulisan lewat crud memanggil `invalidate` sehingga worker yang sama langsung melihat perubahan.
+    Worker lain memeriksa versi (id, modifiedOn) paling sering setiap `check_interval_seconds`,
+    dan hanya memuat ulang baris lengkap jika versinya berubah.
+    """
+
+    def __init__(self, check_interval_seconds: float):
+        self.check_interval_seconds = check_interval_seconds
+        # Satu entri: (snapshot atau None jika belum ada aturan, waktu pemeriksaan versi terakhir)
+        self._entry = GenerationCache(maxsize=1)
+
+    def get(self, db: Session) -> Optional[IzinRuleSnapshot]:
+        now = time.monotonic()
+        entry, generation = self._entry.lookup(_SNAPSHOT_KEY)
+        if entry is not None:
+            snapshot, checked_at = entry
+            if now - checked_at < self.check_interval_seconds:
+                return snapshot
+
+            row = db.query(IzinRule.id, IzinRule.modifiedOn).first()
+            current_version = (row.id, row.modifiedOn) if row else None
+            cached_version = snapshot.version if snapshot else None
+            if current_version == cached_version:
+                self._entry.set(_SNAPSHOT_KEY, (snapshot, now), generation)
+                return snapshot
+
+        rule = db.query(IzinRule).first()
+        snapshot = IzinRuleSnapshot.from_rule(rule) if rule else None
+        self._entry.set(_SNAPSHOT_KEY, (snapshot, now), generation)
+        return snapshot
+
+    def invalidate(self):
+        self._entry.clear()
+
+# Aturan izin dibaca pada setiap izin keluar/kembali, padahal jarang sekali berubah
+izin_rule_cache = IzinRuleCache(check_interval_seconds=settings.IZIN_RULE_CACHE_CHECK_SECONDS)
@@ -1,36 +1,38 @@
 # app/listjob/api.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.core.database import get_db
 from app.listjob import crud, schemas, models
 from app.autentikasi.security import get_current_active_user as get_current_user
-from app.users.schemas import User  # <-- PERBAIKI: Ganti UserDetail dengan User
+from app.autentikasi.principal_cache import Principal
 
 router = APIRouter()
 
 # Endpoint: Mendapatkan semua kategori list job
 @router.get("/", response_model=List[schemas.ListJobCategoryInDB])
-def read_all_list_job_categories(
+async def read_all_list_job_categories(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # <-- PERBAIKI
+    current_user: Principal = Depends(get_current_user)  # <-- PERBAIKI
 ):
     """
     Mengambil daftar semua kategori list job. Dapat diakses oleh semua user yang terautentikasi.
+    Daftar sama untuk semua user, jadi respons di-cache per versi tabel dan (skip, limit); mendukung ETag/304.
     """
-    categories = crud.get_list_job_categories(db, skip=skip, limit=limit)
-    return categories
+    return await crud.list_job_categories_cache.respond(
+        request, List[schemas.ListJobCategoryInDB], crud.get_list_job_categories, key=(skip, limit), skip=skip, limit=limit
+    )
 
 # Endpoint: Membuat kategori list job baru
 @router.post("/", response_model=schemas.ListJobCategoryInDB, status_code=status.HTTP_201_CREATED)
 def create_new_list_job_category(
     category: schemas.ListJobCategoryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Membuat kategori list job baru. Dapat diakses oleh semua peran KECUALI Staff.
@@ -53,7 +55,7 @@ def create_new_list_job_category(
 def read_list_job_category_by_id(
     category_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # <-- PERBAIKI
+    current_user: Principal = Depends(get_current_user)  # <-- PERBAIKI
 ):
     """
     Mengambil satu kategori list job berdasarkan ID. Dapat diakses oleh semua user yang terautentikasi.
@@ -69,7 +71,7 @@ def update_existing_list_job_category(
     category_id: int,
     category_update: schemas.ListJobCategoryUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Memperbarui kategori list job yang ada.
@@ -103,7 +105,7 @@ def update_existing_list_job_category(
 def delete_existing_list_job_category(
     category_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # <-- PERBAIKI
+    current_user: Principal = Depends(get_current_user)  # <-- PERBAIKI
 ):
     """
     Menghapus kategori list job. Hanya untuk admin.
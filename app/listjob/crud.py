@@ -1,11 +1,28 @@
 # app/listjob/crud.py
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional, Dict, Tuple
 import re 
 
 from app.listjob import models, schemas
+from app.core.loaders import eager, user_loader
+from app.core.collection_cache import CollectionCache, bump_collection_version
+from app.users.models import User as UserModel
+from app.roles.models import Role as RoleModel
+
+# Cache + ETag GET /api/listjob/ per (skip, limit); creator/editor beserta role-nya ikut diserialisasi
+list_job_categories_cache = CollectionCache(
+    "listjob_categories",
+    (models.ListJobCategory.__tablename__, UserModel.__tablename__, RoleModel.__tablename__),
+)
+
+# Relasi yang dibutuhkan skema respons ListJobCategoryInDB
+def category_loaders():
+    return (
+        user_loader(models.ListJobCategory.created_by_user),
+        user_loader(models.ListJobCategory.modified_by_user),
+    )
 
 ALL_BANKS = {
     "BCA": "Bank BCA",
@@ -29,8 +46,7 @@ def get_list_job_category(db: Session, category_id: int):
     Mengambil satu kategori list job berdasarkan ID dengan eager loading relasi user pembuat dan pengubah.
     """
     return db.query(models.ListJobCategory)\
-             .options(joinedload(models.ListJobCategory.created_by_user))\
-             .options(joinedload(models.ListJobCategory.modified_by_user))\
+             .options(*eager(*category_loaders()))\
              .filter(models.ListJobCategory.id == category_id).first()
 
 def get_list_job_category_by_name(db: Session, nama: str):
@@ -45,8 +61,7 @@ def get_list_job_categories(db: Session, skip: int = 0, limit: int = 100):
     serta eager loading relasi user pembuat dan pengubah.
     """
     return db.query(models.ListJobCategory)\
-             .options(joinedload(models.ListJobCategory.created_by_user))\
-             .options(joinedload(models.ListJobCategory.modified_by_user))\
+             .options(*eager(*category_loaders()))\
              .offset(skip).limit(limit).all()
 
 def generate_dynamic_description(category_name: str) -> Optional[str]:
@@ -198,11 +213,11 @@ def create_list_job_category(db: Session, category: schemas.ListJobCategoryCreat
         createdBy_uid=createdBy_uid
     )
     db.add(db_category)
+    bump_collection_version(db, models.ListJobCategory.__tablename__)
     db.commit()
     db.refresh(db_category)
     db_category = db.query(models.ListJobCategory)\
-                     .options(joinedload(models.ListJobCategory.created_by_user))\
-                     .options(joinedload(models.ListJobCategory.modified_by_user))\
+                     .options(*eager(*category_loaders()))\
                      .filter(models.ListJobCategory.id == db_category.id).first()
     return db_category
 
@@ -218,11 +233,11 @@ def update_list_job_category(db: Session, category_id: int, category_update: sch
         
         db_category.modifiedBy_uid = modifiedBy_uid 
         
+        bump_collection_version(db, models.ListJobCategory.__tablename__)
         db.commit()
         db.refresh(db_category)
         db_category = db.query(models.ListJobCategory)\
-                         .options(joinedload(models.ListJobCategory.created_by_user))\
-                         .options(joinedload(models.ListJobCategory.modified_by_user))\
+                         .options(*eager(*category_loaders()))\
                          .filter(models.ListJobCategory.id == db_category.id).first()
     return db_category
 
@@ -233,6 +248,7 @@ def delete_list_job_category(db: Session, category_id: int):
     db_category = db.query(models.ListJobCategory).filter(models.ListJobCategory.id == category_id).first()
     if db_category:
         db.delete(db_category)
+        bump_collection_version(db, models.ListJobCategory.__tablename__)
         db.commit()
         return db_category
     return None
\ No newline at end of file
@@ -33,4 +33,14 @@ class ListJobCategoryInDB(ListJobCategoryBase):
     created_by_user: UserInDB
     modified_by_user: Optional[UserInDB] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ListJobCategoryNormalized(ListJobCategoryBase):
+    """Kategori untuk mode ?include=normalized: creator/editor dirujuk lewat uid ke peta `users`."""
+    id: int
+    createdBy_uid: str
+    modifiedBy_uid: Optional[str] = None
+    createOn: datetime
+    modifiedOn: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
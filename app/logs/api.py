@@ -1,13 +1,14 @@
 # app/logs/api.py
 
-from typing import List
-from fastapi import APIRouter, Depends, status, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Response, status, HTTPException
 from sqlalchemy.orm import Session
 import logging
 
 from app.core.database import get_db
 from app.logs import crud as log_crud
 from app.logs import schemas as log_schemas
+from app.utils.pagination import InvalidCursorError, invalid_cursor_exception, set_next_cursor
 from app.users import models as user_models # Diperlukan untuk Depends
 from app.autentikasi import security as auth_security # Diperlukan untuk Depends
 
@@ -41,12 +42,19 @@ async def create_new_log(
 # Endpoint untuk mengambil semua log (opsional, untuk halaman admin)
 @router.get("/", response_model=List[log_schemas.Log])
 async def read_logs(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
     """
     Mengambil daftar semua log.
+    Kirim `cursor` (kosong untuk halaman pertama) untuk paginasi keyset; cursor berikutnya ada di header X-Next-Cursor.
     """
-    logs = log_crud.get_logs(db, skip=skip, limit=limit)
+    try:
+        logs = log_crud.get_logs(db, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise invalid_cursor_exception(e)
+    set_next_cursor(response, logs)
     return logs
\ No newline at end of file
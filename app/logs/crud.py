@@ -3,6 +3,12 @@
 from sqlalchemy.orm import Session
 from app.logs.models import Log as LogModel
 from app.logs.schemas import LogCreate
+from app.core.loaders import eager
+from app.utils.pagination import keyset_paginate
+
+# Skema respons Log tidak menyertakan relasi creator
+def log_loaders():
+    return ()
 
 def create_log(db: Session, log_data: LogCreate):
     """
@@ -15,8 +21,12 @@ def create_log(db: Session, log_data: LogCreate):
     return db_log
 
 # 🆕 Tambahkan fungsi untuk mengambil log
-def get_logs(db: Session, skip: int = 0, limit: int = 100):
+def get_logs(db: Session, skip: int = 0, limit: int = 100, cursor: str = None):
     """
     Mengambil semua entri log dari database.
+    Dengan `cursor`, log diurutkan dari yang terbaru memakai indeks primary key (tanpa OFFSET).
     """
-    return db.query(LogModel).offset(skip).limit(limit).all()
\ No newline at end of file
+    query = db.query(LogModel).options(*eager(*log_loaders()))
+    if cursor is not None:
+        return keyset_paginate(query, "logs", [LogModel.id], cursor, limit, descending=True)
+    return query.offset(skip).limit(limit).all()
\ No newline at end of file
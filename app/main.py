@@ -1,8 +1,11 @@
 # backend/app/main.py
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import Base, engine
+from app.core.database import Base, engine, SessionLocal
+from app.core.query_stats import QueryStatsMiddleware, query_budget
+from app.core.read_routing import ReadRoutingMiddleware
+from app.core.encoding import ContentNegotiationMiddleware, NegotiatedResponse
 
 # Import semua endpoint dan model di sini
 from app.dataizin import api as izin_endpoints
@@ -20,27 +23,20 @@ from app.whitelist import api as whitelist_endpoints
 from app.statusLive import api as statuslive_endpoints
 from app.autentikasi import api as auth_endpoints
 from app.logs import api as logs_endpoints # 🆕 Impor router logs
+from app.metrics import api as metrics_endpoints
 
-# --- Pastikan semua impor model berada di sini ---
-from app.fcm import models as fcm_models
-from app.dataizin import models as izin_models
-from app.users import models as user_models
-from app.izin_rules import models as izin_rules_models
-from app.roles import models as role_models
-from app.datatelat import models as datatelat_models
-from app.datajobdesk import models as datajobdesk_models
-from app.datashift import models as datashift_models
-from app.listjob import models as listjob_models
-from app.datacuti import models as datacuti_models
-from app.dataresign import models as dataresign_models
-from app.whitelist import models as whitelist_models
-from app.statusLive import models as statuslive_models
-from app.logs import models as logs_models
+# --- Pastikan semua model terdaftar sebelum create_all ---
+from app.core.models import import_all as import_all_models
+import_all_models()
 
 # --- Tambahan untuk Firebase ---
 import firebase_admin
 from firebase_admin import credentials
 from app.core.config import settings
+from app.utils.ip_utils import public_ip_cache
+from app.dataizin import crud as izin_crud
+from app.dataizin.live import izin_event_broker
+from app.core.migrations import ensure_columns, ensure_indexes
 
 if not firebase_admin._apps:
     try:
@@ -56,7 +52,9 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="Admin Panel API",
     docs_url="/dokumentasi",
-    redoc_url="/dokumentasi-api"
+    redoc_url="/dokumentasi-api",
+    # orjson untuk semua respons; MessagePack untuk klien dengan Accept: application/msgpack
+    default_response_class=NegotiatedResponse,
 )
 
 origins = [
@@ -72,23 +70,81 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor"],
 )
+
+if settings.QUERY_STATS_ENABLED:
+    # Jumlah query dan waktu DB per request dikirim lewat header Server-Timing
+    app.add_middleware(QueryStatsMiddleware)
+
+app.add_middleware(ContentNegotiationMiddleware)
+
+if settings.DATABASE_REPLICA_URL:
+    # Klien yang baru saja menulis dibaca dari primary selama REPLICA_STICKY_SECONDS (read-your-writes)
+    app.add_middleware(ReadRoutingMiddleware)
+
+# query_budget: batas jumlah query per request (lihat QUERY_BUDGET_ENFORCE untuk mode pengujian)
 # ⭐ Tambahkan baris ini untuk menyertakan router autentikasi
 app.include_router(auth_endpoints.router, prefix="/api/auth", tags=["Auth"])
-app.include_router(user_endpoints.router, prefix="/api/users", tags=["Users"])
+app.include_router(user_endpoints.router, prefix="/api/users", tags=["Users"], dependencies=[Depends(query_budget(8))])
 app.include_router(role_endpoints.router, prefix="/api/roles", tags=["Roles"])
 app.include_router(ip_endpoints.router, prefix="/api/ip", tags=["IP"])
-app.include_router(izin_endpoints.router, prefix="/api/izin", tags=["Izin"])
+app.include_router(izin_endpoints.router, prefix="/api/izin", tags=["Izin"], dependencies=[Depends(query_budget(15))])
 app.include_router(izin_rules_endpoints.router, prefix="/api/izin_rules", tags=["Izin_Rules"])
-app.include_router(datatelat_router, prefix="/api/datatelat", tags=["datatelat"])
-app.include_router(datajobdesk_router, prefix="/api/datajobdesk", tags=["DataJobdesk"])
-app.include_router(datashift_router, prefix="/api/datashift", tags=["DataShift"])
-app.include_router(listjob_router, prefix="/api/listjob", tags=["ListJob"])
-app.include_router(datacuti_router, prefix="/api/datacuti", tags=["DataCuti"])
+app.include_router(datatelat_router, prefix="/api/datatelat", tags=["datatelat"], dependencies=[Depends(query_budget(8))])
+app.include_router(datajobdesk_router, prefix="/api/datajobdesk", tags=["DataJobdesk"], dependencies=[Depends(query_budget(20))])
+app.include_router(datashift_router, prefix="/api/datashift", tags=["DataShift"], dependencies=[Depends(query_budget(10))])
+app.include_router(listjob_router, prefix="/api/listjob", tags=["ListJob"], dependencies=[Depends(query_budget(10))])
+app.include_router(datacuti_router, prefix="/api/datacuti", tags=["DataCuti"], dependencies=[Depends(query_budget(10))])
 app.include_router(dataresign_endpoints.router, prefix="/api/dataresign", tags=["DataResign"])
-app.include_router(whitelist_endpoints.router, prefix="/api/whitelist-ip", tags=["Whitelist IP"])
+app.include_router(whitelist_endpoints.router, prefix="/api/whitelist-ip", tags=["Whitelist IP"], dependencies=[Depends(query_budget(8))])
 app.include_router(statuslive_endpoints.router, prefix="/api/status-live", tags=["Status Live"])
-app.include_router(logs_endpoints.router, prefix="/api/logs", tags=["Logs"]) # 🆕 Tambahkan router logs
+app.include_router(logs_endpoints.router, prefix="/api/logs", tags=["Logs"], dependencies=[Depends(query_budget(5))]) # 🆕 Tambahkan router logs
+app.include_router(metrics_endpoints.router, prefix="/metrics", tags=["Metrics"])
+
+@app.on_event("startup")
+def start_public_ip_refresh():
+    # IP publik server diambil sekali di latar belakang, bukan pada setiap request
+    public_ip_cache.start_background_refresh()
+
+@app.on_event("startup")
+def run_schema_migrations():
+    # Kolom dan indeks yang ditambahkan ke model setelah tabelnya ada (idempoten).
+    # Kolom lebih dulu: query ORM berikutnya (mis. resync_izin_slots) sudah memilih kolom baru.
+    try:
+        print(f"Kolom ditambahkan: {ensure_columns(engine)}")
+    except Exception as e:
+        print(f"Gagal menjalankan migrasi kolom: {e}")
+    try:
+        print(f"Indeks dipastikan: {ensure_indexes(engine)}")
+    except Exception as e:
+        print(f"Gagal menjalankan migrasi indeks: {e}")
+
+@app.on_event("startup")
+def resync_izin_slots():
+    # Penghitung slot izin disamakan dengan data Pending agar selisih akibat perubahan manual terkoreksi
+    db = SessionLocal()
+    try:
+        slots = izin_crud.resync_izin_slots(db)
+        if slots is None:
+            print("Slot izin sedang disinkronkan oleh worker lain.")
+        else:
+            print(f"Slot izin disinkronkan: {slots}")
+    except Exception as e:
+        db.rollback()
+        print(f"Gagal menyinkronkan slot izin: {e}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+async def start_izin_event_listener():
+    # Satu koneksi LISTEN per worker untuk /api/izin/stream (hanya Postgres)
+    if settings.LIVE_EVENTS_ENABLED and engine.dialect.name == "postgresql":
+        izin_event_broker.start()
+
+@app.on_event("shutdown")
+async def stop_izin_event_listener():
+    await izin_event_broker.stop()
 
 @app.get("/")
 def read_root():
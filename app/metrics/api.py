@@ -0,0 +1,42 @@
+# app/metrics/api.py
+
+from fastapi import APIRouter
+from app.core.config import settings
+from app.core.database import engine, async_engine, replica_engine, async_replica_engine, pool_budget
+from app.core.pool_metrics import pool_status, worker_pid
+from app.core.response_cache import response_cache_stats
+from app.core.collection_cache import collection_cache_stats
+
+router = APIRouter()
+
+@router.get("/db-pool")
+def read_db_pool_metrics():
+    """
+    Status pool koneksi di worker yang melayani request ini: koneksi yang dipinjam,
+    overflow, dan lama menunggu checkout. Setiap worker gunicorn memiliki pool sendiri.
+    """
+    metrics = {
+        "worker_pid": worker_pid(),
+        "config": {
+            "pool_budget": pool_budget(),
+            "pool_timeout_seconds": settings.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle_seconds": settings.DB_POOL_RECYCLE_SECONDS,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+        },
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.pool),
+    }
+    if replica_engine is not None:
+        metrics["replica_sync"] = pool_status(replica_engine.pool)
+        metrics["replica_async"] = pool_status(async_replica_engine.pool)
+    return metrics
+
+@router.get("/response-cache")
+def read_response_cache_metrics():
+    """
+    Statistik cache respons mikro per endpoint di worker ini: hits, misses (query dijalankan),
+    coalesced (request yang menumpang query yang sedang berjalan), dan rasio hit.
+    `collections` mencatat jumlah respons 304 per koleksi ber-ETag.
+    """
+    return {"worker_pid": worker_pid(), "caches": response_cache_stats(), "collections": collection_cache_stats()}
@@ -0,0 +1,64 @@
+# backend/app/outbox/crud.py
+
+from sqlalchemy.orm import Session
+from sqlalchemy import exists, func
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from app.outbox.models import NotificationOutbox as NotificationOutboxModel
+from app.outbox.schemas import NotificationCreate
+
+def add_notification(db: Session, notification: NotificationCreate, izin_no: Optional[int] = None) -> NotificationOutboxModel:
+    """
+    Menambahkan notifikasi ke outbox TANPA commit.
+    Baris ini ikut tersimpan (atau dibatalkan) bersama transaksi pemanggil.
+    """
+    data = notification.model_dump()
+    if izin_no is not None:
+        data["izin_no"] = izin_no
+    db_notification = NotificationOutboxModel(**data, status="Pending", attempts=0)
+    db.add(db_notification)
+    return db_notification
+
+def has_notification(db: Session, event: str, izin_no: int) -> bool:
+    """Apakah outbox sudah berisi notifikasi `event` untuk izin tersebut (status apa pun)."""
+    return db.query(
+        exists().where(
+            NotificationOutboxModel.event == event,
+            NotificationOutboxModel.izin_no == izin_no,
+        )
+    ).scalar()
+
+def claim_pending_notifications(db: Session, batch_size: int) -> List[NotificationOutboxModel]:
+    """
+    Mengunci sejumlah notifikasi yang siap dikirim dengan FOR UPDATE SKIP LOCKED,
+    sehingga beberapa dispatcher dapat berjalan bersamaan tanpa mengirim baris yang sama.
+    Kunci dilepas saat transaksi pemanggil di-commit.
+    """
+    return db.query(NotificationOutboxModel)\
+             .filter(
+                 NotificationOutboxModel.status == "Pending",
+                 NotificationOutboxModel.next_attempt_at <= func.now()
+             )\
+             .order_by(NotificationOutboxModel.id)\
+             .limit(batch_size)\
+             .with_for_update(skip_locked=True)\
+             .all()
+
+def mark_sent(notification: NotificationOutboxModel):
+    notification.status = "Sent"
+    notification.attempts += 1
+    notification.last_error = None
+
+def mark_retry(notification: NotificationOutboxModel, error: str, max_attempts: int, backoff_base_seconds: int, backoff_max_seconds: int):
+    """
+    Menjadwalkan ulang notifikasi dengan exponential backoff,
+    atau menandainya 'Failed' jika batas percobaan sudah tercapai.
+    """
+    notification.attempts += 1
+    notification.last_error = error[:1000]
+    if notification.attempts >= max_attempts:
+        notification.status = "Failed"
+        return
+
+    delay_seconds = min(backoff_base_seconds * (2 ** (notification.attempts - 1)), backoff_max_seconds)
+    notification.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
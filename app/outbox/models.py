@@ -0,0 +1,35 @@
+# backend/app/outbox/models.py
+
+from sqlalchemy import Column, Integer, String, DateTime, Index, func
+from app.core.database import Base
+
+class NotificationOutbox(Base):
+    """
+    Tabel outbox transaksional untuk notifikasi FCM.
+    Baris ditulis dalam transaksi yang sama dengan perubahan izin,
+    lalu dikirim oleh proses dispatcher terpisah (app.services.dispatcher).
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    event = Column(String, nullable=False)
+    izin_no = Column(Integer, nullable=True)
+    sender_uid = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    body = Column(String, nullable=False)
+    click_action_url = Column(String, nullable=False, default="/")
+
+    status = Column(String, nullable=False, default="Pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(String, nullable=True)
+
+    createOn = Column(DateTime(timezone=True), server_default=func.now())
+    modifiedOn = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, event='{self.event}', status='{self.status}')>"
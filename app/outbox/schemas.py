@@ -0,0 +1,12 @@
+# backend/app/outbox/schemas.py
+
+from pydantic import BaseModel
+from typing import Optional
+
+class NotificationCreate(BaseModel):
+    event: str
+    sender_uid: str
+    title: str
+    body: str
+    click_action_url: str = "/"
+    izin_no: Optional[int] = None
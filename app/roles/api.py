@@ -1,5 +1,5 @@
 # backend/app/roles/api.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -20,12 +20,13 @@ def create_new_role(role: RoleCreate, db: Session = Depends(get_db)):
     return role_crud.create_role(db=db, role=role)
 
 @router.get("/", response_model=List[Role])
-def read_roles(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_roles(request: Request, skip: int = 0, limit: int = 100):
     """
-    Mengambil daftar semua role.
+    Mengambil daftar semua role. Mendukung ETag/If-None-Match (304 tanpa query).
     """
-    roles = role_crud.get_roles(db, skip=skip, limit=limit)
-    return roles
+    return await role_crud.roles_collection_cache.respond(
+        request, List[Role], role_crud.get_roles, key=(skip, limit), skip=skip, limit=limit
+    )
 
 @router.get("/{role_id}", response_model=Role)
 def read_role(role_id: int, db: Session = Depends(get_db)):
@@ -2,8 +2,13 @@
 from sqlalchemy.orm import Session
 from app.roles.models import Role as RoleModel
 from app.roles.schemas import RoleCreate
+from app.autentikasi.principal_cache import principal_cache
+from app.core.collection_cache import CollectionCache, bump_collection_version
 from typing import List
 
+# Cache + ETag GET /api/roles/
+roles_collection_cache = CollectionCache("roles", (RoleModel.__tablename__,))
+
 def get_role_by_id(db: Session, role_id: int):
     """
     Mengambil role berdasarkan ID.
@@ -28,6 +33,7 @@ def create_role(db: Session, role: RoleCreate) -> RoleModel:
     """
     db_role = RoleModel(name=role.name, description=role.description)
     db.add(db_role)
+    bump_collection_version(db, RoleModel.__tablename__)
     db.commit()
     db.refresh(db_role)
     return db_role
@@ -40,8 +46,11 @@ def update_role(db: Session, role_id: int, role_data: RoleCreate) -> RoleModel:
     if db_role:
         db_role.name = role_data.name
         db_role.description = role_data.description
+        bump_collection_version(db, RoleModel.__tablename__)
         db.commit()
         db.refresh(db_role)
+        # Nama role tersimpan di snapshot principal semua user dengan role ini
+        principal_cache.clear()
     return db_role
 
 def delete_role(db: Session, role_id: int) -> bool:
@@ -51,6 +60,8 @@ def delete_role(db: Session, role_id: int) -> bool:
     db_role = get_role_by_id(db, role_id)
     if db_role:
         db.delete(db_role)
+        bump_collection_version(db, RoleModel.__tablename__)
         db.commit()
+        principal_cache.clear()
         return True
     return False
\ No newline at end of file
@@ -0,0 +1,130 @@
+# backend/app/services/dispatcher.py
+#
+# Proses terpisah yang mengirim notifikasi dari tabel outbox,
+# sekaligus mendeteksi izin yang lewat waktu tepat saat batasnya tercapai (app.services.overdue).
+# Jalankan dengan: python -m app.services.dispatcher
+
+import logging
+import signal
+import time
+
+import firebase_admin
+from firebase_admin import credentials
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.outbox import crud as outbox_crud
+from app.services.tasks import fan_out_izin_notification
+from app.services.overdue import OverdueScheduler
+
+# Pastikan semua model terdaftar agar relasi SQLAlchemy dapat dikonfigurasi
+from app.core.models import import_all as import_all_models
+import_all_models()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+_stop_requested = False
+
+def _request_stop(signum, frame):
+    global _stop_requested
+    logger.info(f"Sinyal {signum} diterima, dispatcher akan berhenti setelah batch saat ini.")
+    _stop_requested = True
+
+def dispatch_batch() -> int:
+    """
+    Mengklaim satu batch notifikasi (FOR UPDATE SKIP LOCKED), mengirimnya, lalu menyimpan statusnya.
+    Pengiriman memakai sesi terpisah agar commit saat menghapus token tidak melepas kunci batch.
+    Notifikasi yang tidak terkirim ke satu token pun (mis. FCM tidak tersedia) dijadwalkan ulang dengan backoff.
+    Mengembalikan jumlah notifikasi yang diproses.
+    """
+    db = SessionLocal()
+    try:
+        notifications = outbox_crud.claim_pending_notifications(db, batch_size=settings.OUTBOX_BATCH_SIZE)
+        for notification in notifications:
+            work_db = SessionLocal()
+            try:
+                summary = fan_out_izin_notification(
+                    work_db,
+                    sender_uid=notification.sender_uid,
+                    title=notification.title,
+                    body=notification.body,
+                    click_action_url=notification.click_action_url,
+                )
+                outbox_crud.mark_sent(notification)
+                logger.info(f"Outbox #{notification.id} ({notification.event}) terkirim: {summary}")
+            except Exception as e:
+                work_db.rollback()
+                outbox_crud.mark_retry(
+                    notification,
+                    error=str(e),
+                    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+                    backoff_base_seconds=settings.OUTBOX_BACKOFF_BASE_SECONDS,
+                    backoff_max_seconds=settings.OUTBOX_BACKOFF_MAX_SECONDS,
+                )
+                logger.error(f"Outbox #{notification.id} gagal dikirim (percobaan ke-{notification.attempts}): {e}")
+            finally:
+                work_db.close()
+        db.commit()
+        return len(notifications)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def check_overdue(scheduler: OverdueScheduler) -> tuple:
+    """
+    Menambahkan izin Pending baru ke heap lalu mencatat yang sudah lewat waktu.
+    Mengembalikan (jumlah notifikasi baru, detik hingga batas waktu berikutnya atau None).
+    """
+    db = SessionLocal()
+    try:
+        scheduler.refresh(db)
+        fired = scheduler.fire_due(db)
+        return fired, scheduler.seconds_until_next(db)
+    finally:
+        db.close()
+
+def run_forever():
+    scheduler = OverdueScheduler() if settings.OVERDUE_SCHEDULER_ENABLED else None
+    while not _stop_requested:
+        try:
+            processed = dispatch_batch()
+        except Exception as e:
+            logger.error(f"Dispatcher gagal memproses batch: {e}", exc_info=True)
+            processed = 0
+
+        fired, next_deadline = 0, None
+        if scheduler is not None:
+            try:
+                fired, next_deadline = check_overdue(scheduler)
+            except Exception as e:
+                logger.error(f"Pemeriksaan izin lewat waktu gagal: {e}", exc_info=True)
+
+        # Batch penuh atau notifikasi lewat waktu baru berarti ada antrean, langsung lanjut tanpa menunggu.
+        # Jika batas waktu izin berikutnya lebih dekat dari interval polling, bangun tepat pada saat itu.
+        if processed < settings.OUTBOX_BATCH_SIZE and not fired:
+            sleep_seconds = settings.OUTBOX_POLL_INTERVAL_SECONDS
+            if next_deadline is not None:
+                sleep_seconds = min(sleep_seconds, next_deadline)
+            time.sleep(sleep_seconds)
+
+def main():
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
+        firebase_admin.initialize_app(cred)
+        logger.info("Firebase Admin SDK berhasil diinisialisasi.")
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    logger.info("Dispatcher notifikasi berjalan.")
+    run_forever()
+    logger.info("Dispatcher notifikasi berhenti.")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@
 
 from firebase_admin import messaging
 import logging
+from typing import List, Tuple
+
+# Batas jumlah token per panggilan multicast dari FCM
+FCM_MULTICAST_LIMIT = 500
 
 def send_fcm_message(token: str, title: str, body: str, click_action_url: str) -> bool:
     """
@@ -28,6 +32,36 @@ def send_fcm_message(token: str, title: str, body: str, click_action_url: str) -
         logging.error(f"Gagal mengirim pesan ke '{token}': {e}")
         return False
 
+def send_fcm_multicast(tokens: List[str], title: str, body: str, click_action_url: str) -> Tuple[int, int, List[str]]:
+    """
+    Mengirim pesan FCM yang sama ke banyak token dalam satu panggilan batch (maksimal 500 token).
+    Mengembalikan tuple (jumlah berhasil, jumlah gagal, daftar token yang tidak terdaftar lagi).
+    """
+    if len(tokens) > FCM_MULTICAST_LIMIT:
+        raise ValueError(f"Maksimal {FCM_MULTICAST_LIMIT} token per batch, diberikan {len(tokens)}.")
+
+    message = messaging.MulticastMessage(
+        data={
+            "title": title,
+            "body": body,
+            "icon": "/vite.svg",
+            "url": click_action_url,
+        },
+        tokens=tokens,
+    )
+    batch_response = messaging.send_each_for_multicast(message)
+
+    invalid_tokens = []
+    for token, response in zip(tokens, batch_response.responses):
+        if response.success:
+            continue
+        if isinstance(response.exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+            invalid_tokens.append(token)
+        else:
+            logging.error(f"Gagal mengirim pesan ke '{token}': {response.exception}")
+
+    return batch_response.success_count, batch_response.failure_count, invalid_tokens
+
 def subscribe_to_topic(tokens: list, topic: str):
     try:
         response = messaging.subscribe_to_topic(tokens, topic)
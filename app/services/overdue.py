@@ -0,0 +1,108 @@
+# backend/app/services/overdue.py
+#
+# Deteksi izin lewat waktu secara real-time di proses dispatcher (app.services.dispatcher).
+# Izin Pending disimpan dalam min-heap berdasarkan jamKeluar. Semua izin Pending memakai aturan
+# aktif yang sama, sehingga urutan jamKeluar sama dengan urutan batas waktu
+# (jamKeluar + max_duration_seconds), dan perubahan aturan tidak memerlukan penyusunan ulang heap.
+# Saat batas waktu tercapai, notifikasi 'izin_overdue' ditulis ke outbox dan dikirim dispatcher.
+
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.dataizin import crud as izin_crud
+from app.izin_rules import crud as izin_rules_crud
+
+logger = logging.getLogger(__name__)
+
+def _timestamp(value: datetime) -> float:
+    # Kolom timestamptz; nilai naive diperlakukan sebagai UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class OverdueScheduler:
+    """
+    Min-heap (jamKeluar, no) untuk izin yang masih Pending.
+    Izin yang sudah kembali tidak dihapus dari heap (O(n)); statusnya diperiksa ulang
+    di database saat gilirannya tiba, jadi setiap operasi tetap O(log n).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int]] = []
+        self._queued: Set[int] = set()
+        self._refreshed_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _push(self, izin_no: int, jam_keluar: datetime):
+        if izin_no in self._queued:
+            return
+        heapq.heappush(self._heap, (_timestamp(jam_keluar), izin_no))
+        self._queued.add(izin_no)
+
+    def rebuild(self, db: Session):
+        """Mengisi ulang heap dari semua izin Pending dengan satu query (saat dispatcher mulai)."""
+        started = datetime.now(timezone.utc)
+        departures = izin_crud.get_pending_izin_departures(db)
+        db.rollback()
+        self._heap = [(_timestamp(jam_keluar), izin_no) for izin_no, jam_keluar in departures]
+        heapq.heapify(self._heap)
+        self._queued = {izin_no for _, izin_no in self._heap}
+        self._refreshed_at = started
+        logger.info(f"Heap izin lewat waktu dibangun ulang: {len(self._heap)} izin Pending")
+
+    def refresh(self, db: Session):
+        """
+        Menambahkan izin Pending yang dibuat sejak refresh terakhir. Jendela mundur
+        (OVERDUE_REFRESH_LOOKBACK_SECONDS) menangkap transaksi yang commit sedikit terlambat.
+        """
+        if self._refreshed_at is None:
+            self.rebuild(db)
+            return
+        started = datetime.now(timezone.utc)
+        since = self._refreshed_at - timedelta(seconds=settings.OVERDUE_REFRESH_LOOKBACK_SECONDS)
+        for izin_no, jam_keluar in izin_crud.get_pending_izin_departures(db, since=since):
+            self._push(izin_no, jam_keluar)
+        db.rollback()
+        self._refreshed_at = started
+
+    def _max_duration_seconds(self, db: Session) -> Optional[int]:
+        rule = izin_rules_crud.get_active_izin_rule(db)
+        if not rule or rule.max_duration_seconds <= 0:
+            return None
+        return rule.max_duration_seconds
+
+    def seconds_until_next(self, db: Session) -> Optional[float]:
+        """Detik hingga batas waktu terdekat; None jika heap kosong atau durasi tidak dibatasi."""
+        max_duration = self._max_duration_seconds(db) if self._heap else None
+        if max_duration is None:
+            return None
+        return max(self._heap[0][0] + max_duration - time.time(), 0.0)
+
+    def fire_due(self, db: Session) -> int:
+        """Memproses semua izin yang batas waktunya sudah lewat. Mengembalikan jumlah notifikasi baru."""
+        max_duration = self._max_duration_seconds(db)
+        if max_duration is None:
+            return 0
+
+        fired = 0
+        while self._heap and self._heap[0][0] + max_duration <= time.time():
+            jam_keluar, izin_no = heapq.heappop(self._heap)
+            self._queued.discard(izin_no)
+            try:
+                if izin_crud.record_izin_overdue(db, izin_no, max_duration):
+                    fired += 1
+                    logger.info(f"Izin #{izin_no} lewat waktu, notifikasi dijadwalkan.")
+            except Exception:
+                # Kembalikan ke heap; dicoba lagi setelah interval polling biasa, bukan langsung berulang
+                heapq.heappush(self._heap, (jam_keluar, izin_no))
+                self._queued.add(izin_no)
+                raise
+        return fired
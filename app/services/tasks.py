@@ -1,30 +1,62 @@
 # backend/app/services/tasks.py
 
 import logging
+import time
 from app.fcm import crud as fcm_crud
-from app.services.fcm import send_fcm_message
-from app.users import crud as crud_user
+from app.services.fcm import send_fcm_multicast, FCM_MULTICAST_LIMIT
 from sqlalchemy.orm import Session
 
-def send_izin_notification_async(db: Session, sender_uid: str, nama: str, title: str, body: str, click_action_url: str):
+class NotificationNotDeliveredError(RuntimeError):
+    """Tidak ada satu pun pesan yang terkirim karena kegagalan sementara (mis. FCM tidak tersedia)."""
+
+def fan_out_izin_notification(db: Session, sender_uid: str, title: str, body: str, click_action_url: str) -> dict:
     """
-    Fungsi ini akan dijalankan dalam thread terpisah untuk mengirim notifikasi FCM.
+    Mengirim notifikasi FCM ke semua pengguna selain pengirim.
+    Token dimuat dengan satu query, dikirim per batch (maksimal 500 token),
+    lalu semua token yang tidak terdaftar dihapus dengan satu statement DELETE.
+    Melempar NotificationNotDeliveredError jika ada token tetapi tidak satu pun pesan terkirim
+    dan kegagalannya bukan karena token tidak terdaftar, agar dispatcher menjadwalkan ulang.
     """
-    try:
-        all_users = crud_user.get_users(db)
-        target_users_uids = [user.uid for user in all_users if user.uid != sender_uid]
-        
-        for target_user_uid in target_users_uids:
-            target_fcm_tokens = fcm_crud.get_fcm_tokens_by_user(db, user_uid=target_user_uid)
-            for token in target_fcm_tokens:
-                is_sent = send_fcm_message(
-                    token=token, 
-                    title=title,
-                    body=body,
-                    click_action_url=click_action_url,  # ✨ Meneruskan URL di sini
-                )
-                if not is_sent:
-                    logging.warning(f"Menghapus token yang tidak valid dari database: {token}")
-                    fcm_crud.delete_fcm_token(db, fcm_token=token)
-    finally:
-        db.close()
\ No newline at end of file
+    tokens = fcm_crud.get_fcm_tokens_except_user(db, exclude_user_uid=sender_uid)
+
+    summary = {"tokens": len(tokens), "batches": 0, "success": 0, "failure": 0, "deleted": 0}
+    invalid_tokens = []
+    last_error = None
+
+    for start in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+        batch = tokens[start:start + FCM_MULTICAST_LIMIT]
+        batch_started = time.perf_counter()
+        try:
+            success_count, failure_count, batch_invalid = send_fcm_multicast(
+                tokens=batch,
+                title=title,
+                body=body,
+                click_action_url=click_action_url,
+            )
+        except Exception as e:
+            logging.error(f"Batch FCM #{summary['batches'] + 1} ({len(batch)} token) gagal dikirim: {e}")
+            last_error = e
+            success_count, failure_count, batch_invalid = 0, len(batch), []
+
+        elapsed_ms = (time.perf_counter() - batch_started) * 1000
+        summary["batches"] += 1
+        summary["success"] += success_count
+        summary["failure"] += failure_count
+        invalid_tokens.extend(batch_invalid)
+        logging.info(
+            f"Batch FCM #{summary['batches']}: {len(batch)} token, {success_count} berhasil, "
+            f"{failure_count} gagal, {len(batch_invalid)} tidak terdaftar ({elapsed_ms:.0f} ms)"
+        )
+
+    if invalid_tokens:
+        summary["deleted"] = fcm_crud.delete_fcm_tokens(db, fcm_tokens=invalid_tokens)
+        logging.warning(f"Menghapus {summary['deleted']} token yang tidak valid dari database.")
+
+    # Semua token gagal dan bukan hanya karena tidak terdaftar: notifikasi belum tersampaikan ke siapa pun
+    if summary["tokens"] and summary["success"] == 0 and summary["failure"] > len(invalid_tokens):
+        raise NotificationNotDeliveredError(
+            f"0 dari {summary['tokens']} token berhasil dikirim" + (f": {last_error}" if last_error else "")
+        )
+
+    return summary
+
@@ -1,7 +1,10 @@
 # app/statusLive/api.py
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.response_cache import ResponseCache
 from app.statusLive import models as backend_models
 from app.statusLive import schemas as backend_schemas
 from datetime import datetime
@@ -12,12 +15,11 @@ router = APIRouter()
 # Tentukan zona waktu untuk GMT+7
 JAKARTA_TZ = ZoneInfo("Asia/Jakarta") # Contoh zona waktu GMT+7
 
-@router.get("/status", response_model=backend_schemas.BackendStatus)
-def get_statusLive(db: Session = Depends(get_db)):
-    """
-    Mengambil status terakhir dari backend dari database.
-    """
-    status = db.query(backend_models.BackendStatus).first()
+# Cache respons GET /status; dikosongkan oleh PUT /update-active
+backend_status_cache = ResponseCache("status_live")
+
+def get_or_create_status(db: Session) -> backend_models.BackendStatus:
+    status = db.execute(select(backend_models.BackendStatus).limit(1)).scalars().first()
     if not status:
         new_status = backend_models.BackendStatus()
         db.add(new_status)
@@ -34,16 +36,25 @@ def get_statusLive(db: Session = Depends(get_db)):
 
     return status
 
+@router.get("/status", response_model=backend_schemas.BackendStatus)
+async def get_statusLive():
+    """
+    Mengambil status terakhir dari backend dari database.
+    Endpoint ini di-poll semua klien, jadi request serentak digabung dan hasilnya di-cache beberapa detik.
+    """
+    return await backend_status_cache.respond(backend_schemas.BackendStatus, get_or_create_status)
+
 @router.put("/update-active")
-def update_statusLive(db: Session = Depends(get_db)):
+async def update_statusLive(db: AsyncSession = Depends(get_async_db)):
     """
     Memperbarui timestamp `last_active` di database.
     """
-    status = db.query(backend_models.BackendStatus).first()
+    status = (await db.execute(select(backend_models.BackendStatus).limit(1))).scalars().first()
     if not status:
         raise HTTPException(status_code=404, detail="Status entry not found.")
     
     status.last_active = datetime.utcnow()
-    db.commit()
-    db.refresh(status)
+    await db.commit()
+    backend_status_cache.invalidate()
+    await db.refresh(status)
     return {"message": "Status updated successfully"}
\ No newline at end of file
@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.query_stats import query_budget
 from app.users.schemas import User, UserCreate, UserUpdate, UserCreateByAdmin, PasswordUpdate
 from app.users import crud as crud_user
 from app.fcm import crud as fcm_crud
@@ -19,9 +20,11 @@ def get_firebase_auth_instance():
     return get_firebase_auth()
 
 @router.get("/", response_model=List[User])
-def read_all_users(db: Session = Depends(get_db), skip: int = 0, limit: Optional[int] = None):
-    users = crud_user.get_users(db, skip=skip, limit=limit)
-    return users
+async def read_all_users(request: Request, skip: int = 0, limit: Optional[int] = None):
+    # Dimuat di setiap halaman panel admin: byte respons di-cache per versi tabel, If-None-Match dijawab 304
+    return await crud_user.users_collection_cache.respond(
+        request, List[User], crud_user.get_users, key=(skip, limit), skip=skip, limit=limit
+    )
 
 @router.get("/{user_uid}", response_model=User)
 def read_user_by_uid(user_uid: str, db: Session = Depends(get_db)):
@@ -102,7 +105,9 @@ def reset_user_password(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Gagal mereset kata sandi: {e}")
 
-@router.delete("/{user_id}")
+# db.delete memuat setiap koleksi relasi user (izin, telat, cuti, shift, ...) untuk melepas foreign key-nya,
+# sehingga batas router tidak berlaku untuk route admin yang jarang dipanggil ini
+@router.delete("/{user_id}", dependencies=[Depends(query_budget(30))])
 def delete_user_by_id(user_id: str, db: Session = Depends(get_db)):
     db_user = crud_user.get_user_by_uid(db, user_uid=user_id)
     if db_user is None:
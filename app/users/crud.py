@@ -3,13 +3,24 @@
 from sqlalchemy.orm import Session, joinedload
 from app.users.models import User as UserModel
 from app.users.schemas import UserCreate, UserUpdate
+from app.autentikasi.principal_cache import principal_cache
+from app.core.loaders import eager
+from app.core.collection_cache import CollectionCache, bump_collection_version
+from app.roles.models import Role as RoleModel
 from typing import List, Optional
 
+# Cache + ETag GET /api/users/; nama role ikut diserialisasi, jadi versi tabel roles juga dihitung
+users_collection_cache = CollectionCache("users", (UserModel.__tablename__, RoleModel.__tablename__))
+
+# Relasi yang dibutuhkan skema respons User
+def user_loaders():
+    return (joinedload(UserModel.role),)
+
 def get_user_by_uid(db: Session, user_uid: str):
     return db.query(UserModel).options(joinedload(UserModel.role)).filter(UserModel.uid == user_uid).first()
 
 def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(UserModel).options(joinedload(UserModel.role)).offset(skip).limit(limit).all()
+    return db.query(UserModel).options(*eager(*user_loaders())).offset(skip).limit(limit).all()
 
 def get_user_by_email(db: Session, email: str):
     return db.query(UserModel).options(joinedload(UserModel.role)).filter(UserModel.email == email).first()
@@ -18,6 +29,7 @@ def create_user_by_admin(db: Session, user_data: UserCreate):
     db_user = UserModel(**user_data.model_dump())
     
     db.add(db_user)
+    bump_collection_version(db, UserModel.__tablename__)
     db.commit()
     db.refresh(db_user)
     return db_user
@@ -28,11 +40,16 @@ def update_user(db: Session, db_user: UserModel, user_data: UserUpdate):
         setattr(db_user, key, value)
     
     db.add(db_user)
+    bump_collection_version(db, UserModel.__tablename__)
     db.commit()
     db.refresh(db_user)
+    principal_cache.evict(db_user.uid)
     return db_user
 
 def delete_user(db: Session, db_user: UserModel):
+    user_uid = db_user.uid
     db.delete(db_user)
+    bump_collection_version(db, UserModel.__tablename__)
     db.commit()
+    principal_cache.evict(user_uid)
     return
\ No newline at end of file
@@ -77,4 +77,12 @@ class User(UserBase):
     modifiedOn: datetime
     role: Optional[Role] = None
 
+    model_config = ConfigDict(from_attributes=True)
+
+class UserNormalized(UserBase):
+    """User untuk mode ?include=normalized: role dirujuk lewat role_id ke peta `roles`."""
+    role_id: int
+    createOn: date
+    modifiedOn: datetime
+
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
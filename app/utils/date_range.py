@@ -0,0 +1,60 @@
+# backend/app/utils/date_range.py
+#
+# Batas hari/bulan/tahun WIB sebagai rentang UTC setengah terbuka [awal, akhir).
+# Filter seperti `kolom >= awal AND kolom < akhir` dapat memakai indeks pada kolom timestamp,
+# berbeda dengan extract()/date()/timezone() pada kolom yang memaksa scan seluruh tabel.
+
+from datetime import date, datetime, time, timedelta
+from typing import Tuple
+
+import pytz
+from sqlalchemy import and_, func, literal_column
+
+WIB_TIMEZONE = pytz.timezone('Asia/Jakarta')
+
+def _wib_midnight_utc(day: date) -> datetime:
+    return WIB_TIMEZONE.localize(datetime.combine(day, time.min)).astimezone(pytz.utc)
+
+def wib_day_range_utc(day: date) -> Tuple[datetime, datetime]:
+    """Rentang UTC untuk satu tanggal WIB."""
+    return _wib_midnight_utc(day), _wib_midnight_utc(day + timedelta(days=1))
+
+def wib_days_range_utc(start_day: date, end_day: date) -> Tuple[datetime, datetime]:
+    """Rentang UTC untuk tanggal WIB [start_day, end_day)."""
+    return _wib_midnight_utc(start_day), _wib_midnight_utc(end_day)
+
+def wib_month_range_utc(year: int, month: int) -> Tuple[datetime, datetime]:
+    """Rentang UTC untuk satu bulan kalender WIB."""
+    next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return _wib_midnight_utc(date(year, month, 1)), _wib_midnight_utc(next_month)
+
+def wib_year_range_utc(year: int) -> Tuple[datetime, datetime]:
+    """Rentang UTC untuk satu tahun kalender WIB."""
+    return _wib_midnight_utc(date(year, 1, 1)), _wib_midnight_utc(date(year + 1, 1, 1))
+
+def wib_today() -> date:
+    return datetime.now(WIB_TIMEZONE).date()
+
+def wib_today_range_utc() -> Tuple[datetime, datetime]:
+    return wib_day_range_utc(wib_today())
+
+def year_date_range(year: int) -> Tuple[date, date]:
+    """Rentang setengah terbuka untuk kolom bertipe Date (tanpa zona waktu)."""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+def in_range(column, bounds: Tuple):
+    """Predikat sargable `awal <= kolom < akhir`."""
+    start, end = bounds
+    return and_(column >= start, column < end)
+
+# Konstanta ditulis literal agar ekspresi di SELECT dan GROUP BY identik (bukan parameter terpisah)
+def _wib_local(column):
+    return func.timezone(literal_column("'Asia/Jakarta'"), column)
+
+def wib_month_label(column):
+    """Ekspresi SQL 'YYYY-MM' bulan WIB dari kolom timestamp, untuk GROUP BY laporan bulanan."""
+    return func.to_char(_wib_local(column), literal_column("'YYYY-MM'"))
+
+def wib_date(column):
+    """Ekspresi SQL tanggal WIB dari kolom timestamp, untuk GROUP BY laporan harian."""
+    return func.date(_wib_local(column))
@@ -0,0 +1,131 @@
+# backend/app/utils/export.py
+#
+# Ekspor data besar sebagai NDJSON atau CSV yang di-stream.
+# Query dijalankan dengan server-side cursor (stream_results + yield_per) dan menghasilkan baris datar
+# (bukan objek ORM), sehingga memori worker tetap datar berapa pun jumlah barisnya.
+# Generator membuka session sendiri karena session dari dependency sudah ditutup saat body dikirim.
+
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Iterator, Sequence
+
+import pytz
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+logger = logging.getLogger(__name__)
+
+WIB_TIMEZONE = pytz.timezone('Asia/Jakarta')
+
+# Jumlah baris per fetch dari cursor server dan per potongan yang dikirim ke klien
+EXPORT_BATCH_SIZE = 1000
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+def export_value(value: Any) -> Any:
+    """Nilai kolom siap-serialisasi. Timestamp dikonversi ke WIB seperti respons JSON biasa."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(WIB_TIMEZONE)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _stream_rows(session_factory: Callable, statement: Select) -> Iterator[Sequence]:
+    db = session_factory()
+    try:
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        db.close()
+
+def _ndjson_chunks(columns: Sequence[str], rows: Iterator[Sequence]) -> Iterator[str]:
+    lines = []
+    # Baris pertama dikirim sendiri agar klien langsung menerima byte pertama
+    flush_at = 1
+    for row in rows:
+        lines.append(json.dumps({name: export_value(value) for name, value in zip(columns, row)}, ensure_ascii=False))
+        if len(lines) >= flush_at:
+            yield "\n".join(lines) + "\n"
+            lines = []
+            flush_at = EXPORT_BATCH_SIZE
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+def _csv_value(value: Any) -> Any:
+    value = export_value(value)
+    # Kolom JSON (mis. detail_mix_cuti) ditulis sebagai teks JSON di satu sel
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+def _csv_chunks(columns: Sequence[str], rows: Iterator[Sequence]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # Header dikirim sebelum query dijalankan agar byte pertama langsung sampai ke klien
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+def _guarded(chunks: Iterator[str], filename: str) -> Iterator[str]:
+    # Header respons sudah terkirim; kesalahan di tengah stream hanya bisa dicatat lalu koneksi diputus
+    try:
+        yield from chunks
+    except Exception as e:
+        logger.error(f"Ekspor {filename} terhenti di tengah jalan: {e}")
+        raise
+
+def stream_export(
+    session_factory: Callable,
+    statement: Select,
+    export_format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """
+    Membuat StreamingResponse dari statement SELECT berisi kolom datar.
+    Nama kolom hasil query dipakai sebagai kunci NDJSON / header CSV.
+    """
+    columns = [column.name for column in statement.selected_columns]
+    rows = _stream_rows(session_factory, statement)
+    if export_format == ExportFormat.csv:
+        chunks = _csv_chunks(columns, rows)
+    elif export_format == ExportFormat.ndjson:
+        chunks = _ndjson_chunks(columns, rows)
+    else:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Format ekspor tidak didukung.")
+
+    return StreamingResponse(
+        _guarded(chunks, filename),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'},
+    )
@@ -1,28 +1,155 @@
 # backend/app/utils/ip_utils.py
 
+import ipaddress
+import logging
+import threading
+import time
 import requests
-import os
+from typing import List, Optional
+from app.core.config import settings
 
-def get_public_ip():
-    """Mengambil alamat IP publik dari API eksternal."""
+logger = logging.getLogger(__name__)
+
+def _parse_networks(cidr_list: str) -> list:
+    networks = []
+    for cidr in cidr_list.split(','):
+        cidr = cidr.strip()
+        if not cidr:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(cidr, strict=False))
+        except ValueError:
+            logger.warning(f"CIDR proxy tepercaya tidak valid diabaikan: {cidr}")
+    return networks
+
+TRUSTED_PROXY_NETWORKS = _parse_networks(settings.TRUSTED_PROXIES)
+
+def _parse_ip(value: Optional[str]) -> Optional[str]:
+    """Menormalkan string IP (membuang tanda kutip, kurung siku IPv6, dan port). None jika tidak valid."""
+    if not value:
+        return None
+    value = value.strip().strip('"')
+    if value.startswith('['):
+        value = value[1:value.find(']')] if ']' in value else value[1:]
+    elif value.count(':') == 1:
+        value = value.split(':')[0]
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        return None
+
+def _is_trusted_proxy(ip: str) -> bool:
     try:
-        response = requests.get('https://api.ipify.org')
-        if response.status_code == 200:
-            return response.text
-    except requests.RequestException:
-        pass
-    return None
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXY_NETWORKS)
+
+def _forwarded_chain(headers) -> List[str]:
+    """
+    Mengambil rantai IP klien dari header 'Forwarded' (RFC 7239) atau 'X-Forwarded-For',
+    diurutkan dari klien asal hingga proxy terdekat.
+    """
+    chain = []
+    forwarded = headers.get("Forwarded")
+    if forwarded:
+        for element in forwarded.split(','):
+            for pair in element.split(';'):
+                key, _, value = pair.partition('=')
+                if key.strip().lower() == 'for':
+                    ip = _parse_ip(value)
+                    if ip:
+                        chain.append(ip)
+        if chain:
+            return chain
+
+    x_forwarded_for = headers.get("X-Forwarded-For")
+    if x_forwarded_for:
+        for value in x_forwarded_for.split(','):
+            ip = _parse_ip(value)
+            if ip:
+                chain.append(ip)
+    return chain
+
+class PublicIPCache:
+    """
+    Cache IP publik server. Diambil sekali saat startup lalu diperbarui oleh thread latar belakang,
+    sehingga request tidak pernah menunggu panggilan jaringan ke layanan eksternal.
+    """
+
+    def __init__(self, lookup_url: str, ttl_seconds: int, retry_seconds: int = 60):
+        self.lookup_url = lookup_url
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._value: Optional[str] = None
+        self._fetched_at: float = 0.0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self) -> Optional[str]:
+        """Mengembalikan IP publik yang tersimpan, atau None jika belum ada / sudah kedaluwarsa."""
+        with self._lock:
+            if self._value and time.monotonic() - self._fetched_at < self.ttl_seconds:
+                return self._value
+        return None
+
+    def refresh(self) -> bool:
+        try:
+            response = requests.get(self.lookup_url, timeout=5)
+            ip = _parse_ip(response.text) if response.status_code == 200 else None
+        except requests.RequestException as e:
+            logger.warning(f"Gagal mengambil IP publik server: {e}")
+            return False
+        if not ip:
+            return False
+        with self._lock:
+            self._value = ip
+            self._fetched_at = time.monotonic()
+        return True
+
+    def _run(self):
+        while True:
+            refreshed = self.refresh()
+            time.sleep(self.ttl_seconds * 0.8 if refreshed else self.retry_seconds)
+
+    def start_background_refresh(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="public-ip-refresh", daemon=True)
+        self._thread.start()
+
+public_ip_cache = PublicIPCache(settings.PUBLIC_IP_LOOKUP_URL, settings.PUBLIC_IP_TTL_SECONDS)
+
+def get_public_ip():
+    """Mengambil alamat IP publik server dari cache (tanpa panggilan jaringan)."""
+    return public_ip_cache.get()
 
 def get_request_ip(request):
-    """Mendapatkan alamat IP dari request."""
-    # Prioritaskan header 'X-Forwarded-For' jika ada (lingkungan produksi)
-    if "X-Forwarded-For" in request.headers:
-        return request.headers["X-Forwarded-For"].split(',')[0].strip()
+    """
+    Mendapatkan alamat IP klien dari request.
+    Header 'Forwarded', 'X-Forwarded-For', dan 'X-Real-IP' hanya dipercaya jika koneksi
+    datang dari proxy yang terdaftar di TRUSTED_PROXIES.
+    """
+    peer_ip = _parse_ip(request.client.host) if request.client else None
+
+    if peer_ip and _is_trusted_proxy(peer_ip):
+        chain = _forwarded_chain(request.headers)
+        # Telusuri dari proxy terdekat, IP pertama yang bukan proxy tepercaya adalah klien
+        for ip in reversed(chain):
+            if not _is_trusted_proxy(ip):
+                return ip
+        if chain:
+            return chain[0]
+
+        real_ip = _parse_ip(request.headers.get("X-Real-IP"))
+        if real_ip:
+            return real_ip
 
-    # Untuk lingkungan lokal, coba ambil IP publik secara langsung
-    ip_address = get_public_ip()
-    if ip_address:
-        return ip_address
+    # Untuk lingkungan lokal, gunakan IP publik server yang sudah di-cache
+    if peer_ip and ipaddress.ip_address(peer_ip).is_loopback:
+        public_ip = get_public_ip()
+        if public_ip:
+            return public_ip
 
     # Jika gagal, kembalikan IP client dari request
-    return request.client.host
\ No newline at end of file
+    return peer_ip or (request.client.host if request.client else None)
@@ -0,0 +1,97 @@
+# backend/app/utils/pagination.py
+#
+# Paginasi keyset (cursor) bersama untuk endpoint daftar.
+# Cursor berisi nilai kunci urut (sort_key, pk) dari baris terakhir halaman sebelumnya, sehingga
+# halaman berikutnya diambil dengan WHERE (sort_key, pk) > (...) LIMIT n, bukan OFFSET.
+# Biaya halaman ke-1000 sama dengan halaman pertama.
+#
+# Endpoint tetap menerima skip/limit. Mode cursor aktif jika parameter `cursor` dikirim
+# (kosong untuk halaman pertama); cursor halaman berikutnya dikirim lewat header X-Next-Cursor.
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class InvalidCursorError(ValueError):
+    """Cursor tidak dapat dibaca, dibuat untuk endpoint lain, atau dipakai dengan limit kurang dari 1."""
+
+class CursorPage(list):
+    """Hasil satu halaman. Tetap berupa list agar response_model List[...] tidak berubah."""
+
+    def __init__(self, items: Sequence = (), next_cursor: Optional[str] = None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise InvalidCursorError("Nilai cursor tidak dikenali.")
+    return value
+
+def encode_cursor(tag: str, values: Sequence[Any]) -> str:
+    payload = json.dumps({"t": tag, "k": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(tag: str, cursor: str, size: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_decode_value(v) for v in payload["k"]]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Cursor tidak valid.") from e
+    if payload.get("t") != tag or len(values) != size:
+        raise InvalidCursorError("Cursor bukan milik endpoint ini.")
+    return values
+
+def keyset_paginate(query: Query, tag: str, keys: Sequence, cursor: str, limit: int, descending: bool = False) -> CursorPage:
+    """
+    Menerapkan paginasi keyset pada query ORM. `keys` adalah kolom urut dengan kolom unik (pk) di akhir,
+    sebaiknya tercakup satu indeks. Urutan bawaan query diganti dengan urutan `keys`.
+    """
+    if limit < 1:
+        # Halaman kosong tidak punya baris terakhir untuk cursor berikutnya
+        raise InvalidCursorError("Limit harus minimal 1 dalam mode cursor.")
+    if cursor:
+        values = decode_cursor(tag, cursor, len(keys))
+        if len(keys) == 1:
+            condition = keys[0] < values[0] if descending else keys[0] > values[0]
+        else:
+            condition = tuple_(*keys) < tuple_(*values) if descending else tuple_(*keys) > tuple_(*values)
+        query = query.filter(condition)
+
+    query = query.order_by(None).order_by(*(key.desc() if descending else key.asc() for key in keys))
+    # Satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(tag, [getattr(rows[-1], key.key) for key in keys])
+    return CursorPage(rows, next_cursor)
+
+def set_next_cursor(response: Response, items) -> None:
+    """Menulis cursor halaman berikutnya ke header respons (jika ada)."""
+    next_cursor = getattr(items, "next_cursor", None)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+def invalid_cursor_exception(error: InvalidCursorError) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
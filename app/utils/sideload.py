@@ -0,0 +1,96 @@
+# backend/app/utils/sideload.py
+#
+# Mode respons `?include=normalized` untuk endpoint daftar yang menyematkan User (beserta Role) di setiap baris.
+# Baris hanya membawa uid/id, dan setiap entitas terkait diserialisasi SEKALI di peta tingkat atas:
+#
+#   {"items": [...], "users": {uid: ...}, "roles": {id: ...}, "categories": {id: ...}, "shifts": {no: ...}}
+#
+# Ukuran payload dan waktu serialisasi mengikuti jumlah entitas yang berbeda, bukan jumlah baris.
+# Relasi harus sudah dimuat oleh loader crud (app.core.loaders); modul ini tidak menjalankan query.
+
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional, Sequence
+
+from pydantic import TypeAdapter
+
+from app.core.encoding import NegotiatedResponse
+from app.datashift.schemas import ShiftNormalized
+from app.listjob.schemas import ListJobCategoryNormalized
+from app.roles.schemas import Role
+from app.users.schemas import UserNormalized
+
+# Nilai yang diterima parameter `include`; mode default (tanpa parameter) tetap menyematkan objek penuh
+IncludeMode = Literal["normalized"]
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+def _dump(schema, values) -> Any:
+    adapter = _adapter(schema)
+    return adapter.dump_python(adapter.validate_python(values, from_attributes=True), mode="json")
+
+def _resolve(obj, path: str):
+    """Mengikuti path relasi bertitik (mis. 'izin.user'); None jika salah satu langkahnya None."""
+    for name in path.split("."):
+        obj = getattr(obj, name, None)
+        if obj is None:
+            return None
+    return obj
+
+class Sideload:
+    """Mengumpulkan entitas terkait per kunci unik dari baris ORM."""
+
+    def __init__(self):
+        self.users: Dict[str, Any] = {}
+        self.categories: Dict[int, Any] = {}
+        self.shifts: Dict[int, Any] = {}
+
+    def add_user(self, user):
+        if user is not None and user.uid not in self.users:
+            self.users[user.uid] = user
+
+    def add_category(self, category):
+        if category.id not in self.categories:
+            self.categories[category.id] = category
+            self.add_user(category.created_by_user)
+            self.add_user(category.modified_by_user)
+
+    def add_shift(self, shift):
+        if shift is not None and shift.no not in self.shifts:
+            self.shifts[shift.no] = shift
+            self.add_user(shift.user)
+            self.add_user(shift.created_by_user)
+
+    def content(self) -> dict:
+        roles = {user.role.id: user.role for user in self.users.values() if user.role is not None}
+        return {
+            "users": _dump(Dict[str, UserNormalized], self.users),
+            "roles": _dump(Dict[int, Role], roles),
+            "categories": _dump(Dict[int, ListJobCategoryNormalized], self.categories),
+            "shifts": _dump(Dict[int, ShiftNormalized], self.shifts),
+        }
+
+def normalized_response(
+    rows: Sequence,
+    item_schema,
+    user_paths: Sequence[str] = (),
+    category_path: Optional[str] = None,
+    shift_path: Optional[str] = None,
+) -> NegotiatedResponse:
+    """
+    Respons ternormalisasi untuk `rows` (objek ORM). `item_schema` adalah skema baris tanpa relasi tersemat;
+    `user_paths` adalah relasi User per baris (boleh bertitik, mis. 'izin.user').
+    Header tambahan (mis. X-Next-Cursor) diset pemanggil pada respons yang dikembalikan.
+    """
+    sideload = Sideload()
+    for row in rows:
+        for path in user_paths:
+            sideload.add_user(_resolve(row, path))
+        if category_path:
+            for category in getattr(row, category_path):
+                sideload.add_category(category)
+        if shift_path:
+            sideload.add_shift(getattr(row, shift_path))
+
+    return NegotiatedResponse({"items": _dump(List[item_schema], list(rows)), **sideload.content()})
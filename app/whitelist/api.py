@@ -1,12 +1,13 @@
 # app/whitelist/api.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.database import AsyncSessionLocal, get_db
 from . import crud, schemas, models
 from app.autentikasi.security import get_current_active_user
-from app.users.models import User
+from app.autentikasi.principal_cache import Principal
 from fastapi import Body
+from app.utils.pagination import InvalidCursorError, invalid_cursor_exception, set_next_cursor
 
 router = APIRouter()
 
@@ -14,7 +15,7 @@ router = APIRouter()
 def create_new_ip(
     ip_address: str = Body(..., embed=True),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     db_ip = crud.get_ip_by_address(db, ip_address=ip_address)
     if db_ip:
@@ -28,12 +29,29 @@ def create_new_ip(
     return crud.create_ip(db=db, ip_data=ip_data)
 
 @router.get("/", response_model=List[schemas.WhitelistIP])
-def read_all_ips(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    # ⭐ PERBAIKAN: Gunakan .options(joinedload(...)) untuk memuat data creator dan editor
-    ips = db.query(models.WhitelistIP).options(
-        joinedload(models.WhitelistIP.creator),
-        joinedload(models.WhitelistIP.editor)
-    ).offset(skip).limit(limit).all()
+async def read_all_ips(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+):
+    # Tanpa cursor (panel admin): byte respons di-cache per versi tabel dan If-None-Match dijawab 304
+    if cursor is None:
+        return await crud.whitelist_collection_cache.respond(
+            request, List[schemas.WhitelistIP], crud.get_ips, key=(skip, limit), skip=skip, limit=limit
+        )
+
+    # Creator dan editor dimuat sekaligus lewat crud.whitelist_loaders
+    def load_page(db: Session):
+        return crud.get_ips(db, limit=limit, cursor=cursor)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            ips = await db.run_sync(load_page)
+    except InvalidCursorError as e:
+        raise invalid_cursor_exception(e)
+    set_next_cursor(response, ips)
     return ips
 
 @router.delete("/{ip_address}")
@@ -50,7 +68,7 @@ def update_existing_ip(
     ip_address: str, 
     ip_data: schemas.WhitelistIPUpdate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     db_ip = crud.get_ip_by_address(db, ip_address=ip_address)
     if db_ip is None:
@@ -1,17 +1,36 @@
 # app/whitelist/crud.py
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from . import models, schemas
 from typing import List, Optional
 from datetime import datetime, timezone
+from app.core.loaders import eager
+from app.utils.pagination import keyset_paginate
+from app.core.collection_cache import CollectionCache, bump_collection_version
+from app.users.models import User as UserModel
 
-def get_ips(db: Session, skip: int = 0, limit: int = 100) -> List[models.WhitelistIP]:
+# Cache + ETag GET /api/whitelist-ip/ (tanpa cursor); nama creator/editor ikut diserialisasi
+whitelist_collection_cache = CollectionCache("whitelist_ip", (models.WhitelistIP.__tablename__, UserModel.__tablename__))
+
+# Relasi yang dibutuhkan skema respons WhitelistIP
+def whitelist_loaders():
+    return (
+        joinedload(models.WhitelistIP.creator),
+        joinedload(models.WhitelistIP.editor),
+    )
+
+def get_ips(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[models.WhitelistIP]:
     """Mengambil daftar semua IP yang di-whitelist."""
-    return db.query(models.WhitelistIP).offset(skip).limit(limit).all()
+    query = db.query(models.WhitelistIP).options(*eager(*whitelist_loaders()))
+    if cursor is not None:
+        return keyset_paginate(query, "whitelist", [models.WhitelistIP.no], cursor, limit, descending=True)
+    return query.offset(skip).limit(limit).all()
 
 def get_ip_by_address(db: Session, ip_address: str) -> Optional[models.WhitelistIP]:
     """Mengambil satu IP berdasarkan alamatnya."""
-    return db.query(models.WhitelistIP).filter(models.WhitelistIP.ip_address == ip_address).first()
+    return db.query(models.WhitelistIP).options(
+        *eager(*whitelist_loaders())
+    ).filter(models.WhitelistIP.ip_address == ip_address).first()
 
 def create_ip(db: Session, ip_data: schemas.WhitelistIPCreate) -> models.WhitelistIP:
     """Menambahkan IP baru ke whitelist."""
@@ -22,6 +41,7 @@ def create_ip(db: Session, ip_data: schemas.WhitelistIPCreate) -> models.Whiteli
         tanggal=datetime.now(timezone.utc)
     )
     db.add(db_ip)
+    bump_collection_version(db, models.WhitelistIP.__tablename__)
     db.commit()
     db.refresh(db_ip)
     return db_ip
@@ -29,6 +49,7 @@ def create_ip(db: Session, ip_data: schemas.WhitelistIPCreate) -> models.Whiteli
 def delete_ip(db: Session, db_ip: models.WhitelistIP):
     """Menghapus IP dari whitelist."""
     db.delete(db_ip)
+    bump_collection_version(db, models.WhitelistIP.__tablename__)
     db.commit()
 
 def update_ip(db: Session, db_ip: models.WhitelistIP, ip_data: schemas.WhitelistIPUpdate) -> models.WhitelistIP:
@@ -38,6 +59,7 @@ def update_ip(db: Session, db_ip: models.WhitelistIP, ip_data: schemas.Whitelist
         setattr(db_ip, key, value)
     
     db.add(db_ip)
+    bump_collection_version(db, models.WhitelistIP.__tablename__)
     db.commit()
     db.refresh(db_ip)
     return db_ip
\ No newline at end of file
@@ -0,0 +1,76 @@
+# benchmarks/async_latency.py
+#
+# Membandingkan latensi endpoint di bawah banyak klien serentak (default 500).
+# Jalankan server terlebih dahulu (mis. gunicorn -k uvicorn.workers.UvicornWorker -w 4 app.main:app),
+# lalu bandingkan endpoint async dengan endpoint sync yang bebannya setara:
+#   python -m benchmarks.async_latency --base-url http://localhost:8000 \
+#       --path /api/status-live/status --path /api/izin_rules/ --clients 500 --duration 30
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+async def run_path(base_url: str, path: str, clients: int, duration: float, token: Optional[str]) -> Dict[str, float]:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(worker() for _ in range(clients)))
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.fmean(latencies) if latencies else 0.0,
+    }
+
+async def main(args):
+    print(f"{args.clients} klien serentak, {args.duration:.0f} detik per endpoint")
+    print(f"{'endpoint':40} {'req':>8} {'err':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for path in args.path:
+        result = await run_path(args.base_url, path, args.clients, args.duration, args.token)
+        print(
+            f"{path:40} {result['requests']:>8} {result['errors']:>6} {result['rps']:>8.1f} "
+            f"{result['p50']:>9.1f} {result['p95']:>9.1f} {result['p99']:>9.1f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", action="append", help="Endpoint yang diuji (boleh lebih dari satu)")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--token", help="Firebase ID token untuk endpoint yang membutuhkan autentikasi")
+    args = parser.parse_args()
+    if not args.path:
+        args.path = ["/api/status-live/status", "/api/izin_rules/"]
+    asyncio.run(main(args))
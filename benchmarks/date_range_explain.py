@@ -0,0 +1,166 @@
+# benchmarks/date_range_explain.py
+#
+# Membandingkan rencana eksekusi filter tanggal lama (extract/date/timezone pada kolom)
+# dengan filter rentang UTC yang sargable, sebelum dan sesudah indeks komposit dibuat.
+# Data dibuat di schema terpisah `bench` (tabel "dataIzin" dan "dataTelat" dengan struktur yang sama),
+# dan search_path diarahkan ke sana sehingga query dari crud dijalankan apa adanya tanpa menyentuh data asli.
+# Membutuhkan PostgreSQL (DATABASE_URL). Jalankan dengan:
+#   python -m benchmarks.date_range_explain --rows 5000000
+#   python -m benchmarks.date_range_explain --drop   # hapus schema bench
+
+import argparse
+import json
+import time
+from datetime import date
+
+from sqlalchemy import and_, create_engine, extract, func, select, text
+
+from app.core.config import settings
+from app.core.migrations import ensure_indexes, managed_indexes
+from app.dataizin import crud as izin_crud
+from app.dataizin.models import Izin
+from app.datatelat import crud as telat_crud
+from app.datatelat.models import DataTelat
+from app.utils.date_range import in_range, wib_day_range_utc
+
+SCHEMA = "bench"
+
+def bench_engine():
+    return create_engine(settings.DATABASE_URL, connect_args={"options": f"-c search_path={SCHEMA},public"})
+
+def seed(engine, rows: int, users: int, telat_ratio: float):
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        # LIKE tanpa INCLUDING INDEXES: indeks dibuat belakangan untuk perbandingan
+        conn.execute(text(f'CREATE TABLE {SCHEMA}."dataIzin" (LIKE public."dataIzin" INCLUDING DEFAULTS)'))
+        conn.execute(text(f'CREATE TABLE {SCHEMA}."dataTelat" (LIKE public."dataTelat" INCLUDING DEFAULTS)'))
+
+        started = time.perf_counter()
+        conn.execute(text(f"""
+            INSERT INTO {SCHEMA}."dataIzin" (no, user_uid, tanggal, "jamKeluar", "jamKembali", durasi, status, "createOn", "modifiedOn")
+            SELECT g,
+                   'bench-user-' || (g % :users),
+                   t,
+                   t,
+                   t + interval '12 minutes',
+                   '00:12:00',
+                   (ARRAY['Selesai', 'Selesai', 'Selesai', 'Lewat Waktu', 'Pending'])[1 + g % 5],
+                   t,
+                   t
+            FROM generate_series(1, :rows) AS g,
+                 LATERAL (SELECT timestamptz '2021-01-01 00:00+07' + (random() * interval '5 years') AS t) AS r
+        """), {"rows": rows, "users": users})
+        conn.execute(text(f'ALTER TABLE {SCHEMA}."dataIzin" ADD PRIMARY KEY (no)'))
+        conn.execute(text(f"""
+            INSERT INTO {SCHEMA}."dataTelat" (no, izin_no, user_uid, sanksi, denda, status)
+            SELECT row_number() OVER (), no, user_uid, 'Kutip sampah', '0', 'Pending'
+            FROM {SCHEMA}."dataIzin" WHERE random() < :ratio
+        """), {"ratio": telat_ratio})
+        conn.execute(text(f'ALTER TABLE {SCHEMA}."dataTelat" ADD PRIMARY KEY (no)'))
+        print(f"Seed {rows} baris izin selesai dalam {time.perf_counter() - started:.0f} detik")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f'VACUUM ANALYZE {SCHEMA}."dataIzin"'))
+        conn.execute(text(f'VACUUM ANALYZE {SCHEMA}."dataTelat"'))
+
+def drop_indexes(engine):
+    with engine.begin() as conn:
+        for index in managed_indexes():
+            conn.execute(text(f'DROP INDEX IF EXISTS {SCHEMA}."{index.name}"'))
+
+def scenarios(year: int, month: int, day: date, user_uid: str):
+    """Pasangan (nama, query lama, query baru) untuk dibandingkan."""
+    tz_tanggal = func.timezone('Asia/Jakarta', Izin.tanggal)
+    return [
+        (
+            "izin per tahun",
+            select(Izin.no).where(func.extract('year', tz_tanggal) == year),
+            select(Izin.no).where(and_(*izin_crud._year_and_date_conditions(year))),
+        ),
+        (
+            "izin per tanggal",
+            select(Izin.no).where(
+                func.extract('year', tz_tanggal) == year,
+                func.date(tz_tanggal) == day,
+            ),
+            select(Izin.no).where(and_(*izin_crud._year_and_date_conditions(year, day.isoformat()))),
+        ),
+        (
+            "izin user per tahun",
+            select(Izin.no).where(Izin.user_uid == user_uid, func.extract('year', tz_tanggal) == year),
+            select(Izin.no).where(Izin.user_uid == user_uid, *izin_crud._year_and_date_conditions(year)),
+        ),
+        (
+            "izin lewat waktu per tanggal",
+            select(Izin.no).where(Izin.status == "Lewat Waktu", func.date(tz_tanggal) == day),
+            select(Izin.no).where(Izin.status == "Lewat Waktu", in_range(Izin.tanggal, wib_day_range_utc(day))),
+        ),
+        (
+            "telat per bulan",
+            select(DataTelat.no).join(Izin, DataTelat.izin_no == Izin.no).where(
+                extract('month', Izin.tanggal) == month, extract('year', Izin.tanggal) == year
+            ),
+            select(DataTelat.no).join(Izin, DataTelat.izin_no == Izin.no).where(
+                *telat_crud._month_year_conditions(month, year)
+            ),
+        ),
+    ]
+
+def explain(conn, statement) -> dict:
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]
+
+def node_types(node: dict) -> list:
+    types = [node["Node Type"] + (f" ({node['Index Name']})" if "Index Name" in node else "")]
+    for child in node.get("Plans", []):
+        types.extend(node_types(child))
+    return types
+
+def report(engine, label: str, year: int, month: int, day: date, user_uid: str):
+    print(f"\n== {label} ==")
+    print(f"{'skenario':30} {'versi':6} {'ms':>9} {'buffers':>9}  rencana")
+    with engine.connect() as conn:
+        for name, legacy, sargable in scenarios(year, month, day, user_uid):
+            for version, statement in (("lama", legacy), ("baru", sargable)):
+                result = explain(conn, statement)
+                root = result["Plan"]
+                buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+                plan = " > ".join(dict.fromkeys(node_types(root)))
+                print(f"{name:30} {version:6} {result['Execution Time']:>9.1f} {buffers:>9}  {plan}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--telat-ratio", type=float, default=0.05)
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--month", type=int, default=6)
+    parser.add_argument("--skip-seed", action="store_true", help="Pakai data schema bench yang sudah ada")
+    parser.add_argument("--drop", action="store_true", help="Hapus schema bench lalu keluar")
+    args = parser.parse_args()
+
+    engine = bench_engine()
+    if args.drop:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        raise SystemExit(0)
+
+    if not args.skip_seed:
+        seed(engine, args.rows, args.users, args.telat_ratio)
+
+    day = date(args.year, args.month, 15)
+    drop_indexes(engine)
+    report(engine, "tanpa indeks komposit", args.year, args.month, day, "bench-user-7")
+
+    started = time.perf_counter()
+    ensure_indexes(engine)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f'ANALYZE {SCHEMA}."dataIzin"'))
+        conn.execute(text(f'ANALYZE {SCHEMA}."dataTelat"'))
+    print(f"\nIndeks dibuat dalam {time.perf_counter() - started:.0f} detik")
+    report(engine, "dengan indeks komposit", args.year, args.month, day, "bench-user-7")
+    engine.dispose()
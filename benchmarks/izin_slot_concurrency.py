@@ -0,0 +1,75 @@
+# benchmarks/izin_slot_concurrency.py
+#
+# Uji beban pemesanan slot izin: banyak thread memesan slot pada saat yang sama
+# dan jumlah yang berhasil harus tepat sama dengan batasnya.
+# Membutuhkan PostgreSQL (DATABASE_URL). Jalankan dengan:
+#   python -m benchmarks.izin_slot_concurrency --workers 200 --limit 5
+
+import argparse
+import threading
+import time
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.dataizin import crud as izin_crud
+from app.dataizin.models import IzinSlot
+
+def run(workers: int, limit: int, scope: str) -> int:
+    engine = create_engine(settings.DATABASE_URL, pool_size=workers, max_overflow=0)
+    Base.metadata.create_all(bind=engine, tables=[IzinSlot.__table__])
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as db:
+        db.execute(delete(IzinSlot).where(IzinSlot.scope == scope))
+        db.commit()
+
+    barrier = threading.Barrier(workers)
+    results = []
+    results_lock = threading.Lock()
+
+    def worker():
+        db = Session()
+        try:
+            barrier.wait()
+            izin_crud.reserve_izin_slots(db, {scope: limit})
+            db.commit()
+            ok = True
+        except izin_crud.IzinSlotUnavailableError:
+            db.rollback()
+            ok = False
+        finally:
+            db.close()
+        with results_lock:
+            results.append(ok)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with Session() as db:
+        used = db.get(IzinSlot, scope).used
+        db.execute(delete(IzinSlot).where(IzinSlot.scope == scope))
+        db.commit()
+    engine.dispose()
+
+    successes = sum(results)
+    print(f"{workers} request serentak, batas {limit}: {successes} berhasil, "
+          f"{len(results) - successes} ditolak, slot terpakai {used} ({elapsed * 1000:.0f} ms)")
+    assert successes == limit, f"Jumlah izin yang lolos ({successes}) tidak sama dengan batas ({limit})"
+    assert used == limit, f"Penghitung slot ({used}) tidak sama dengan batas ({limit})"
+    return successes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--scope", default="benchmark:izin-slot")
+    args = parser.parse_args()
+    run(args.workers, args.limit, args.scope)
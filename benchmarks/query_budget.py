@@ -0,0 +1,73 @@
+# benchmarks/query_budget.py
+#
+# Memeriksa jumlah query endpoint daftar/detail terhadap query_budget router-nya.
+# Aplikasi dijalankan di proses yang sama (TestClient) agar assert_query_budget dapat menghitung
+# setiap statement, termasuk dari engine async. Batas diambil dari dependency query_budget pada route,
+# dan statement yang sama lebih dari --max-repeats kali dianggap N+1. Hanya mengirim GET ke DATABASE_URL.
+#   python -m benchmarks.query_budget --token <firebase-id-token>
+#   python -m benchmarks.query_budget --path /api/izin/ --path "/api/datashift/?limit=500" --max-repeats 2
+
+import argparse
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.query_stats import QueryBudgetExceeded, assert_query_budget
+from app.main import app
+
+DEFAULT_PATHS = [
+    "/api/izin/",
+    "/api/datatelat/",
+    "/api/datajobdesk/",
+    "/api/datacuti/",
+    "/api/datashift/",
+    "/api/listjob/",
+    "/api/users/",
+    "/api/whitelist-ip/",
+    "/api/logs/",
+]
+
+def route_budget(path: str) -> Optional[int]:
+    """Batas query_budget milik route GET yang cocok; dependency terakhir (level route) yang berlaku."""
+    path = path.split("?", 1)[0]
+    for route in app.routes:
+        if isinstance(route, APIRoute) and "GET" in route.methods and route.path_regex.match(path):
+            budgets = [
+                dependency.dependency.max_queries
+                for dependency in route.dependencies
+                if hasattr(dependency.dependency, "max_queries")
+            ]
+            return budgets[-1] if budgets else None
+    return None
+
+def main(args) -> int:
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    failures = 0
+    print(f"{'endpoint':40} {'status':>6} {'query':>6} {'batas':>6} {'ms db':>8}  hasil")
+    with TestClient(app, headers=headers) as client:
+        for path in args.path:
+            budget = route_budget(path)
+            response, result = None, "ok"
+            try:
+                with assert_query_budget(max_queries=budget, max_repeats=args.max_repeats) as stats:
+                    response = client.get(path)
+            except QueryBudgetExceeded as error:
+                # Diperiksa setelah blok selesai, jadi respons tetap tersedia
+                failures += 1
+                result = str(error)
+            status = response.status_code if response is not None else "-"
+            print(f"{path:40} {status:>6} {stats.count:>6} {budget if budget is not None else '-':>6} {stats.total_ms:>8.1f}  {result}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", action="append", help="Endpoint GET yang diperiksa (boleh lebih dari satu)")
+    parser.add_argument("--max-repeats", type=int, default=settings.QUERY_REPEAT_THRESHOLD,
+                        help="Jumlah maksimum statement yang sama per request")
+    parser.add_argument("--token", help="Firebase ID token untuk endpoint yang membutuhkan autentikasi")
+    args = parser.parse_args()
+    if not args.path:
+        args.path = DEFAULT_PATHS
+    raise SystemExit(main(args))
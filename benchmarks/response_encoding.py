@@ -0,0 +1,120 @@
+# benchmarks/response_encoding.py
+#
+# Membandingkan waktu encode dan ukuran payload untuk endpoint list terbesar
+# (/api/datajobdesk/, /api/izin/by_year_and_date, /api/users/) dengan data sintetis:
+#   - jsonable_encoder + json.dumps   (jalur FastAPI untuk endpoint tanpa response_model)
+#   - pydantic dump_python + json.dumps (jalur FastAPI lama dengan JSONResponse)
+#   - pydantic dump_python + orjson     (NegotiatedResponse, default)
+#   - pydantic dump_python + msgpack    (NegotiatedResponse, Accept: application/msgpack)
+#   - pydantic dump_json                (cache respons, app.core.response_cache)
+# Tidak membutuhkan database. Jalankan dengan:
+#   python -m benchmarks.response_encoding --rows 2000 --repeat 20
+
+import argparse
+import gzip
+import json
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.encoding import encode_json, encode_msgpack
+from app.dataizin.schemas import Izin
+from app.datajobdesk.schemas import JobdeskInDB
+from app.users.schemas import User
+
+NOW = datetime(2025, 6, 2, 8, 30, tzinfo=timezone.utc)
+JABATAN = ["Operator", "Kapten", "Kasir", "Kasir Lokal"]
+
+def _role(i: int) -> dict:
+    return {"id": i % 4 + 1, "name": ["Admin", "SPV", "Staff", "Kasir"][i % 4], "description": None,
+            "createOn": NOW, "modifiedOn": NOW}
+
+def _user(i: int) -> dict:
+    return {
+        "uid": f"uid-{i:06d}-abcdefghijklmnop", "fullname": f"Karyawan Nomor {i}", "nickname": f"K{i}",
+        "gender": "L" if i % 2 else "P", "jabatan": JABATAN[i % 4], "imageUrl": f"https://cdn.example.com/u/{i}.jpg",
+        "email": f"karyawan{i}@example.com", "status": "Aktif", "joinDate": date(2022, 1, 1),
+        "grupDate": date(2022, 2, 1), "tanggalAkhirCuti": None, "no_passport": f"X{i:07d}",
+        "createOn": date(2022, 1, 1), "modifiedOn": NOW, "role": _role(i),
+    }
+
+def _category(i: int) -> dict:
+    return {"id": i, "nama": f"Kategori {i}", "deskripsi": "Deskripsi tugas harian yang cukup panjang",
+            "createdBy_uid": "uid-000001", "modifiedBy_uid": None, "createOn": NOW, "modifiedOn": None,
+            "created_by_user": _user(1), "modified_by_user": None}
+
+def jobdesk_rows(rows: int) -> List[dict]:
+    return [
+        {
+            "no": i, "tanggal": date(2025, 6, 2), "user_uid": f"uid-{i:06d}", "createdBy_uid": "uid-000001",
+            "modifiedBy_uid": "uid-000002", "createdOn": NOW, "modifiedOn": NOW,
+            "user": _user(i), "created_by_user": _user(1), "modified_by_user": _user(2),
+            "categories": [_category(c) for c in range(1, 4)],
+            "shift": {"no": i, "user_uid": f"uid-{i:06d}", "tanggalMulai": date(2025, 6, 1),
+                      "tanggalAkhir": date(2025, 6, 30), "jamMasuk": "08:00", "jamPulang": "17:00",
+                      "createdBy_uid": "uid-000001", "createOn": date(2025, 6, 1)},
+        }
+        for i in range(rows)
+    ]
+
+def izin_rows(rows: int) -> List[dict]:
+    return [
+        {"no": i, "user_uid": f"uid-{i:06d}", "tanggal": NOW, "jamKeluar": NOW, "ipKeluar": "10.0.0.1",
+         "jamKembali": NOW + timedelta(minutes=12), "ipKembali": "10.0.0.1", "durasi": "0 jam 12 menit 0 detik",
+         "duration_seconds": 720, "status": "Kembali", "createOn": NOW, "modifiedOn": NOW, "user": _user(i)}
+        for i in range(rows)
+    ]
+
+def user_rows(rows: int) -> List[dict]:
+    return [_user(i) for i in range(rows)]
+
+def _stdlib_dumps(content) -> bytes:
+    # Sama dengan starlette JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def encoders(adapter: TypeAdapter) -> Dict[str, Callable]:
+    return {
+        "jsonable_encoder+json": lambda value: _stdlib_dumps(jsonable_encoder(value)),
+        "pydantic+json": lambda value: _stdlib_dumps(adapter.dump_python(value, mode="json")),
+        "pydantic+orjson": lambda value: encode_json(adapter.dump_python(value, mode="json")),
+        "pydantic+msgpack": lambda value: encode_msgpack(adapter.dump_python(value, mode="json")),
+        "pydantic dump_json": lambda value: adapter.dump_json(value),
+    }
+
+def measure(encode: Callable, value, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = encode(value)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": statistics.median(timings), "bytes": len(body), "gzip_bytes": len(gzip.compress(body, 6))}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = [
+        ("/api/datajobdesk/ (JobdeskInDB)", List[JobdeskInDB], jobdesk_rows),
+        ("/api/izin/by_year_and_date (Izin)", List[Izin], izin_rows),
+        ("/api/users/ (User)", List[User], user_rows),
+    ]
+    for title, response_type, make_rows in cases:
+        adapter = TypeAdapter(response_type)
+        value = adapter.validate_python(make_rows(args.rows))
+        print(f"\n{title}, {args.rows} baris")
+        print(f"{'encoder':<24}{'median ms':>12}{'bytes':>12}{'gzip bytes':>12}")
+        baseline = None
+        for name, encode in encoders(adapter).items():
+            result = measure(encode, value, args.repeat)
+            baseline = baseline or result["median_ms"]
+            print(f"{name:<24}{result['median_ms']:>12.2f}{result['bytes']:>12}{result['gzip_bytes']:>12}"
+                  f"   x{baseline / result['median_ms']:.1f}")
+
+if __name__ == "__main__":
+    main()